@@ -54,10 +54,134 @@ GUI_SETTINGS = {
     'STATS_OVERLAY_HEIGHT': 100,
     'MIN_WINDOW_WIDTH': 800,
     'MIN_WINDOW_HEIGHT': 600,
+    'DISPLAY_REFRESH_MS': 15,  # Video panelinin yeni kare kontrol aralığı
 }
 
 # Video işleme ayarları
 VIDEO_SETTINGS = {
     'TARGET_FPS': 240,
     'NMS_THRESHOLD': 0.5,
+    'DEBUG_VIEW_FPS': 10,  # Maske/kontur hata ayıklama görünümünün yenilenme hızı
+}
+
+# YOLO çıkarım ayarları
+YOLO_SETTINGS = {
+    'TEST_BATCH_SIZE': 8,  # Test modunda tek model çağrısındaki kare sayısı
+    'LIVE_BATCH_SIZE': 4,  # Canlı YOLO modunda batch boyutu
+    'LIVE_MAX_BATCH_LATENCY_MS': 40,  # Canlı modda batch'in dolmasını en fazla bu kadar bekle
+    'PREFETCH_QUEUE_SIZE': 16,  # Önden okunan kare kuyruğunun boyutu
+    'CONFIDENCE': 0.25,  # Model çağrısında uygulanan en düşük güven
+    'CLASSES': None,  # Sadece bu sınıf indeksleri (None: hepsi), model çağrısında uygulanır
+    'PROFILE_FILE': 'yolo_profiles.json',  # Otomatik ayar sonuçları (model + makine başına)
+    'AUTO_APPLY_PROFILE': True,  # YOLO modu açılırken kayıtlı profil uygulansın mı
+    'AUTOTUNE_MAX_LATENCY_MS': 100,  # Profil seçiminde izin verilen p95 batch gecikmesi
+    'AUTOTUNE_MIN_AGREEMENT': 0.9,  # Profil seçiminde referans çıktıyla en düşük uyum
+    'MODEL_CACHE_BUDGET_MB': 1024,  # Bellekte tutulan YOLO modellerinin toplam boyut sınırı
+    'BACKEND': 'torch',  # Çıkarım arka ucu: 'torch' (PyTorch) veya 'onnx' (ONNX Runtime CPU), 'onnx-int8' (nicelenmiş), 'torchscript' (önbellekli TorchScript)
+    'ONNX_IMGSZ': 640,  # ONNX dışa aktarımında ve ön işlemede kullanılan giriş boyutu
+    'ONNX_INTRA_OP_THREADS': 0,  # ONNX Runtime operatör içi thread sayısı (0: otomatik)
+    'INT8_CALIBRATION_FRAMES': 64,  # Statik int8 niceleme için videodan alınan kare sayısı
+    'INT8_REPORT_FRAMES': 32,  # Test modunda int8/float karşılaştırması için kare sayısı
+    'TORCHSCRIPT_IMGSZ': 640,  # TorchScript kopyasının varsayılan (sabit) giriş boyutu
+    'PREWARM_MODEL': None,  # Uygulama açılışında arka planda yüklenip ısıtılacak model (.pt yolu)
+}
+
+# Paralel test modu ayarları (aralık parçalara bölünüp süreç havuzunda işlenir)
+PARALLEL_TEST_SETTINGS = {
+    'WORKERS': None,  # Süreç sayısı (None: çekirdek sayısı, 1: sıralı işleme)
+    'CHUNK_FRAMES': 500,  # Parça boyutu (işçi sayısından bağımsız, sonuçlar buna göre belirlenir)
+    'WARMUP_FRAMES': 30,  # OpenCV/Hibrit: lazer modu geçmişi için parça başından önce işlenen kare
+}
+
+# Test kontrol noktaları (iptal edilen uzun testler aynı ayarlarla kaldığı yerden sürer)
+CHECKPOINT_SETTINGS = {
+    'ENABLED': True,
+    'DIRECTORY': 'test_checkpoints',  # Yapılandırma özetine göre adlandırılan .ckpt dosyaları
+    'INTERVAL_SECONDS': 30.0,  # Çalışma sırasında en fazla bu sıklıkta kaydedilir
+}
+
+# Kare başına sonuç önbelleği (aynı video + ayarlarla tekrar eden testlerde yalnızca eksik kareler hesaplanır)
+RESULT_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'PATH': 'result_cache/results.sqlite',
+    'MAX_BYTES': 512 * 1024 * 1024,  # Aşılınca en uzun süredir kullanılmayan kareler silinir
+    'COMMIT_FRAMES': 200,  # Bu kadar yeni kare yazılınca diske işlenir
+}
+
+# Test sırasında akışlı dışa aktarma (CSV/Parquet)
+STREAM_EXPORT_SETTINGS = {
+    'CHUNK_ROWS': 5000,  # Bu kadar yeni satır birikince yazıcı thread'ine verilir
+    'MAX_PENDING_CHUNKS': 4,  # Yazılmayı bekleyen en fazla parça (dolunca test bekler)
+}
+
+# Etiketli videolarda değerlendirme ayarları (bkz. core/evaluation.py)
+EVALUATION_SETTINGS = {
+    'IOU_THRESHOLD': 0.5,  # Tespitin etiketle eşleşmesi için en düşük IoU (kesinlik/duyarlılık/F1 ve karışıklık)
+    'CONFIDENCE_THRESHOLD': 0.0,  # Kesinlik/duyarlılık/F1 için bunun altındaki tespitler yok sayılır (mAP hepsini kullanır)
+    'MAP_IOU_THRESHOLDS': [round(0.5 + 0.05 * i, 2) for i in range(10)],  # mAP@[.5:.95]
+    'LABEL_CLASSES': {0: 'red', 1: 'blue'},  # YOLO etiket dosyalarındaki sınıf indeksi -> renk
+}
+
+# Örneklemeli test ayarları (tüm kareler yerine temsilî bir alt küme, bkz. core/sampling.py)
+SAMPLING_SETTINGS = {
+    'STRIDE': 10,  # 'stride' modu: her N. kare
+    'RANDOM_FRACTION': 0.1,  # 'random' modu: aralıktaki karelerin bu oranı
+    'SEED': 0,  # 'random' modu: aynı tohum aynı kareleri seçer
+    'BUDGET_SECONDS': 30.0,  # 'budget' modu: toplam süre sınırı (kareler aralığa eşit yayılır)
+    'GRAB_MAX_GAP': 120,  # Bu kadar kareden kısa atlamalar çözmeden grab() ile, daha uzunları konumlanarak yapılır
+    'CONFIDENCE_LEVEL': 0.95,  # Raporlanan güven aralıkları
+}
+
+# Test istatistik raporu ayarları (bkz. core/test_report.py)
+REPORT_SETTINGS = {
+    'TIMELINE_BINS': 300,  # Kırmızı/mavi zaman çizelgesindeki en fazla nokta (kareler bu kadar kutuya toplanır)
+    'MIN_DROPOUT_FRAMES': 5,  # Tespitin bu kadar ardışık karede kaybolması kesinti sayılır
+    'MAX_LISTED_INTERVALS': 50,  # Raporda listelenen en uzun kesinti / lazer aralığı sayısı
+    'PERCENTILES': [5, 25, 50, 75, 95, 99],
+}
+
+# OpenCV / YOLO yan yana karşılaştırma ayarları (bkz. core/comparison.py)
+COMPARISON_SETTINGS = {
+    'IOU_THRESHOLD': 0.5,  # İki dedektörün kutusu bu IoU ile örtüşürse aynı balon sayılır
+    'YOLO_QUEUE_BATCHES': 2,  # YOLO thread'ini bekleyen en fazla kare (batch sayısı cinsinden; dolunca OpenCV bekler)
+}
+
+# Kademeli çözünürlük ayarları (önce küçük giriş, belirsiz karelerde tam boyut)
+CASCADE_SETTINGS = {
+    'SMALL_IMGSZ': 320,  # İlk (ucuz) geçişin giriş boyutu
+    'MIN_MAX_CONFIDENCE': 0.5,  # Karedeki en yüksek güven bunun altındaysa tam boyutta tekrarla
+    'MIN_BOX_SIDE': 12,  # Küçük girişte kısa kenarı bu pikselden küçük kutu varsa tam boyutta tekrarla
+    'STATS_WINDOW': 100,  # Yükseltme oranının hesaplandığı son kare sayısı
+}
+
+# Ana kare modu ayarları (YOLO her K karede bir, arada optik akışla kutu taşıma)
+KEYFRAME_SETTINGS = {
+    'MIN_INTERVAL': 1,  # K'nın alt sınırı (1: her kare YOLO)
+    'MAX_INTERVAL': 10,  # K'nın üst sınırı; hedef FPS'e göre bu aralıkta uyarlanır
+    'SCENE_CHANGE_THRESHOLD': 18.0,  # Ana kareye göre ortalama gri fark (0-255) bunu aşarsa yeni ana kare
+    'MAX_POINTS_PER_BOX': 12,  # Kutu başına izlenen köşe noktası
+    'MIN_TRACKED_POINTS': 3,  # Kutuyu optik akışla taşımak için gereken en az izlenen nokta
+    'MAX_LOST_RATIO': 0.5,  # Kutuların bu orandan fazlası izlenemezse yeni ana kare
+}
+
+# Hibrit mod ayarları (HSV adayları + YOLO kırpıntı doğrulaması)
+HYBRID_SETTINGS = {
+    'CROP_PADDING': 0.5,  # Aday kutusu her yönde kenarının bu oranı kadar genişletilir
+    'MIN_CROP_SIZE': 48,  # En küçük kırpıntı kenarı (piksel)
+    'CROP_IMGSZ': 160,  # Kırpıntıların YOLO'ya verildiği giriş boyutu
+    'MAX_PROPOSALS': 16,  # Karede doğrulanacak en fazla aday
+    'VERIFY_CONFIDENCE': 0.25,  # YOLO onayı için en düşük güven
+    'FULL_FRAME_INTERVAL': 15,  # Kaçırılan balonlar için her N karede bir tam kare YOLO
+    'MATCH_IOU': 0.3,  # Tam kare tespiti bu IoU ile bir adaya denk geliyorsa eklenmez
+}
+
+# Telemetri ayarları (kare bazlı yapılandırılmış kayıtlar, bkz. utils/telemetry.py)
+TELEMETRY_SETTINGS = {
+    'ENABLED': False,  # Açıkken her kare kaydı diske yazılır; yalnızca analiz için açın
+    'FILE': 'telemetry.jsonl',  # Çevrimdışı analiz için JSON satırları (göreli ise DIRECTORY altında)
+    'DIRECTORY': None,  # None: kullanıcının log dizini (bkz. utils/telemetry.py user_log_directory)
+    'MAX_BYTES': 50 * 1024 * 1024,  # Dosya bu boyuta ulaşınca .1 uzantısıyla döndürülür (0 = sınırsız)
+    'MAX_EVENTS_PER_SEC': 30,  # Olay türü başına saniyelik üst sınır
+    'SAMPLE_EVERY': 1,  # Her N. kaydı al (1 = hepsi)
+    'QUEUE_SIZE': 4096,  # Yazıcı kuyruğu dolarsa kayıt atılır, işlem beklemez
 } 
\ No newline at end of file
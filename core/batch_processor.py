@@ -0,0 +1,217 @@
+import os
+import time
+import json
+import logging
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+from .detector import BalloonDetector
+from .test_processor import (resolve_frame_range, append_yolo_result, export_rows_to_csv,
+                             ULTRALYTICS_AVAILABLE, YOLO_DEVICE_TEST, YOLO_CLASS_MAP_TEST)
+from .results_store import ResultsStore
+from .model_registry import get_model_registry
+from .hybrid_detector import HybridDetector
+from .yolo_results import predict_filter_kwargs
+from .parallel_test import limit_library_threads
+
+# --- Süreç içi önbellek ---
+# Her işçi süreci kendi dedektörünü bir kez oluşturur ve sonraki işlerde
+# tekrar kullanır. YOLO modelleri süreç başına model kayıt defterinde tutulur.
+_worker_cv_detector = None
+_worker_loaded_models = set() # Bu işçide ilk kez alınan kayıt defteri anahtarları
+
+
+def _init_batch_worker():
+    """Havuzdaki her süreç başlarken bir kez çağrılır."""
+    _worker_loaded_models.clear()
+    limit_library_threads()
+
+
+def _get_cv_detector():
+    global _worker_cv_detector
+    if _worker_cv_detector is None:
+        _worker_cv_detector = BalloonDetector()
+    _worker_cv_detector.reset() # Önceki işin lazer/mavi geçmişi taşınmasın
+    return _worker_cv_detector
+
+
+def _get_yolo_model(model_path, backend='torch', calibration_video=None):
+    """Modeli süreç içinde bir kez yükler; (model, yükleme+ısınma_süresi_ms) döndürür.
+
+    Süre, modelin bu işçide ilk alınışında ölçülen süredir; sonraki işlerde
+    0'dır. Kayıt defterindeki kullanım sayısına bakılmaz, çünkü girdiyi
+    başka bir kullanıcı (örn. ön ısıtma) da tutuyor olabilir.
+    """
+    if not ULTRALYTICS_AVAILABLE:
+        raise RuntimeError("Ultralytics kütüphanesi bulunamadı.")
+    start = time.perf_counter()
+    model = get_model_registry().get(model_path, YOLO_DEVICE_TEST, backend=backend,
+                                     calibration_video=calibration_video)
+    if model.key in _worker_loaded_models:
+        return model, 0.0 # Önceki bir işte yüklendi
+    _worker_loaded_models.add(model.key)
+    return model, (time.perf_counter() - start) * 1000
+
+
+def run_batch_job(job):
+    """Tek bir toplu işi çalıştırır ve özet sözlüğü döndürür.
+
+    Hatalar burada yakalanır ve özette 'failed' olarak raporlanır; böylece
+    bir işin çökmesi diğer işleri etkilemez.
+    """
+    summary = {
+        'job_id': job.get('job_id'),
+        'video_path': job['video_path'],
+        'detector_type': job['detector_type'],
+        'output_path': job.get('output_path'),
+        'status': 'ok',
+        'error': None,
+        'pid': os.getpid(),
+        'frames_processed': 0,
+        'detection_count': 0,
+        'color_counts': {},
+        'model_load_ms': 0.0,
+        'decode_ms': 0.0,
+        'detect_ms': 0.0,
+        'wall_ms': 0.0,
+        'fps': 0.0,
+    }
+    wall_start = time.perf_counter()
+    cap = None
+    try:
+        is_hybrid = "Hibrit" in job['detector_type']
+        is_yolo = "YOLO" in job['detector_type'] and not is_hybrid
+        if is_yolo or is_hybrid:
+            model, summary['model_load_ms'] = _get_yolo_model(job['yolo_model_path'],
+                                                              job.get('backend', 'torch'), job['video_path'])
+        if is_hybrid:
+            detector = HybridDetector(model, YOLO_CLASS_MAP_TEST, device=YOLO_DEVICE_TEST)
+        elif not is_yolo:
+            detector = _get_cv_detector()
+
+        cap = cv2.VideoCapture(job['video_path'])
+        if not cap.isOpened():
+            raise IOError(f"Video açılamadı: {job['video_path']}")
+
+        total_frames_video = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        start_frame, end_frame = resolve_frame_range(
+            total_frames_video, job.get('start_frame', 0), job.get('end_frame', 0),
+            job.get('use_full_video', True))
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+        results = ResultsStore()
+        decode_s = 0.0
+        detect_s = 0.0
+        for frame_num in range(start_frame, end_frame):
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            t1 = time.perf_counter()
+            if not ret or frame is None:
+                break
+            if is_yolo:
+                yolo_results = model(frame, device=YOLO_DEVICE_TEST, verbose=False, **predict_filter_kwargs())
+                append_yolo_result(results, frame_num, yolo_results[0])
+            else:
+                cv_detections, _ = detector.detect(frame, job['hsv_values'])
+                results.append_detections(frame_num, cv_detections, detector='hybrid' if is_hybrid else 'opencv')
+            decode_s += t1 - t0
+            detect_s += time.perf_counter() - t1
+            summary['frames_processed'] += 1
+
+        if job.get('output_path'):
+            # Tespit olmasa da yalnızca başlık satırı yazılır ("balon yok" ile "çalışmadı" ayrılsın)
+            export_rows_to_csv(results, job['output_path'])
+
+        summary['detection_count'] = len(results)
+        summary['color_counts'] = results.color_counts()
+        summary['decode_ms'] = round(decode_s * 1000, 2)
+        summary['detect_ms'] = round(detect_s * 1000, 2)
+    except Exception as e:
+        summary['status'] = 'failed'
+        summary['error'] = f"{type(e).__name__}: {e}"
+        summary['traceback'] = traceback.format_exc()
+    finally:
+        if cap is not None:
+            cap.release()
+
+    wall_s = time.perf_counter() - wall_start
+    summary['wall_ms'] = round(wall_s * 1000, 2)
+    if summary['frames_processed'] and wall_s > 0:
+        summary['fps'] = round(summary['frames_processed'] / wall_s, 2)
+    return summary
+
+
+class BatchProcessor:
+    """Birden fazla video/konfigürasyon işini bir süreç havuzunda çalıştırır."""
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger('BatchProcessor')
+
+    def run(self, jobs, report_path=None):
+        """İşleri zamanlar ve biten her işin özetini sırayla (yield) döndürür.
+
+        report_path verilirse toplu rapor her iş bitiminde yeniden yazılır;
+        gece çalışması yarıda kesilse bile o ana kadarki sonuçlar kaybolmaz.
+        """
+        jobs = list(jobs)
+        for idx, job in enumerate(jobs):
+            job.setdefault('job_id', idx)
+
+        report = {
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'workers': min(self.max_workers, max(1, len(jobs))),
+            'job_count': len(jobs),
+            'jobs': [],
+            'totals': {},
+        }
+        batch_start = time.perf_counter()
+        self.logger.info(f"Toplu işlem başlıyor: {len(jobs)} iş, {report['workers']} süreç")
+
+        # Qt/torch thread'leri olan süreçten fork güvenli değil; spawn kullanılır (bkz. parallel_test)
+        with ProcessPoolExecutor(max_workers=report['workers'], mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_batch_worker) as executor:
+            futures = {executor.submit(run_batch_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    # İşçi sürecinin kendisi çöktüyse (örn. BrokenProcessPool) buraya düşer
+                    summary = {
+                        'job_id': job['job_id'],
+                        'video_path': job['video_path'],
+                        'detector_type': job['detector_type'],
+                        'status': 'failed',
+                        'error': f"{type(e).__name__}: {e}",
+                    }
+                if summary['status'] == 'ok':
+                    self.logger.info(f"İş {summary['job_id']} bitti: {summary['frames_processed']} kare, "
+                                     f"{summary['detection_count']} tespit, {summary['fps']} FPS")
+                else:
+                    self.logger.error(f"İş {summary['job_id']} başarısız: {summary['error']}")
+
+                report['jobs'].append(summary)
+                report['totals'] = self._aggregate(report['jobs'], time.perf_counter() - batch_start)
+                if report_path:
+                    self._write_report(report, report_path)
+                yield summary
+
+    def _aggregate(self, summaries, elapsed_s):
+        ok = [s for s in summaries if s['status'] == 'ok']
+        frames = sum(s['frames_processed'] for s in ok)
+        return {
+            'completed': len(ok),
+            'failed': len(summaries) - len(ok),
+            'frames_processed': frames,
+            'detection_count': sum(s['detection_count'] for s in ok),
+            'elapsed_ms': round(elapsed_s * 1000, 2),
+            'throughput_fps': round(frames / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        }
+
+    def _write_report(self, report, report_path):
+        tmp_path = f"{report_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=4)
+        os.replace(tmp_path, report_path)
@@ -0,0 +1,85 @@
+import time
+from collections import deque
+import numpy as np
+from .yolo_results import result_arrays
+from ..config import CASCADE_SETTINGS
+
+
+class CascadeDetector:
+    """İki kademeli YOLO: önce küçük giriş boyutu, belirsiz karelerde tam boyut.
+
+    Kareler önce SMALL_IMGSZ ile tek batch halinde işlenir. Bir karenin
+    sonucu belirsizse (en yüksek güven düşük, tespit sayısı bir önceki
+    kareden farklı veya küçük geçişin algılama sınırına yakın küçük kutu
+    var) o kareler tam boyutta tekrar işlenir ve küçük sonucun yerine geçer.
+    Model çağrısı gibi kare listesi alır, kare sırasıyla sonuç listesi döndürür.
+    """
+
+    def __init__(self, model, device='cpu', predict_kwargs=None, settings=None):
+        self.model = model
+        self.device = device
+        self.settings = dict(CASCADE_SETTINGS, **(settings or {}))
+        self.full_kwargs = dict(predict_kwargs or {})
+        self.small_kwargs = dict(self.full_kwargs, imgsz=self.settings['SMALL_IMGSZ'])
+        self.prev_count = None
+        self.escalations = deque(maxlen=self.settings['STATS_WINDOW']) # Son karelerde yükseltme (bool)
+        self.small_ms = None # Kare başı küçük geçiş süresi (üstel ortalama)
+        self.full_ms = None  # Yükseltilen kare başı tam geçiş süresi (üstel ortalama)
+        self.last_reasons = []
+
+    def reset(self):
+        self.prev_count = None
+
+    def __call__(self, frames):
+        small_start = time.perf_counter()
+        results = list(self.model(frames, device=self.device, verbose=False, **self.small_kwargs))
+        self.small_ms = self._ema(self.small_ms, (time.perf_counter() - small_start) * 1000 / len(frames))
+
+        reasons = []
+        for frame, result in zip(frames, results):
+            reason = self._uncertainty(frame, result)
+            reasons.append(reason)
+            # Sonraki karenin sayı karşılaştırması için bu karenin (nihai) sayısı;
+            # yükseltilen karelerde küçük geçiş sayısı yaklaşık olarak kullanılır
+            self.prev_count = len(result.boxes)
+        escalate = [i for i, reason in enumerate(reasons) if reason]
+        self.escalations.extend(bool(reason) for reason in reasons)
+        self.last_reasons = [reason for reason in reasons if reason]
+
+        if escalate:
+            full_start = time.perf_counter()
+            full_results = self.model([frames[i] for i in escalate], device=self.device, verbose=False,
+                                      **self.full_kwargs)
+            self.full_ms = self._ema(self.full_ms, (time.perf_counter() - full_start) * 1000 / len(escalate))
+            for i, result in zip(escalate, full_results):
+                results[i] = result
+            self.prev_count = len(results[-1].boxes)
+        return results
+
+    def _uncertainty(self, frame, result):
+        """Küçük geçiş sonucu belirsizse nedenini, değilse None döndürür."""
+        xyxy, conf, _ = result_arrays(result)
+        if self.prev_count is not None and len(conf) != self.prev_count:
+            return 'sayı değişti'
+        if len(conf) == 0:
+            return None
+        if conf.max() < self.settings['MIN_MAX_CONFIDENCE']:
+            return 'düşük güven'
+        # Kutunun küçük girişteki kenarı (piksel) algılama sınırına yakınsa
+        scale = self.settings['SMALL_IMGSZ'] / max(frame.shape[:2])
+        sides = np.minimum(xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]) * scale
+        if sides.min() < self.settings['MIN_BOX_SIDE']:
+            return 'küçük kutu'
+        return None
+
+    def stats(self):
+        """Son STATS_WINDOW karedeki yükseltme oranı ve kademe başı gecikmeler."""
+        return {
+            'escalation_rate': float(np.mean(self.escalations)) if self.escalations else 0.0,
+            'small_ms': self.small_ms or 0.0,
+            'full_ms': self.full_ms or 0.0,
+        }
+
+    @staticmethod
+    def _ema(previous, value, alpha=0.2):
+        return value if previous is None else previous + alpha * (value - previous)
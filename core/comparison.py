@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+import cv2
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from .detector import BalloonDetector
+from .evaluation import box_iou, match_detections
+from .model_registry import get_model_registry
+from .results_store import ResultsStore, BBOX_COLUMNS
+from .test_report import frame_runs, interval_summary, percentile_summary
+from .yolo_batching import FramePrefetcher, BatchedYoloInference
+from .yolo_results import predict_filter_kwargs
+from .test_processor import (append_yolo_result, detect_into_store, export_rows_to_csv, resolve_frame_range,
+                             YOLO_DEVICE_TEST)
+from ..config import COMPARISON_SETTINGS, YOLO_SETTINGS
+
+logger = logging.getLogger('Comparison')
+
+# Kare durumu: uyum (aynı balonlar, aynı renk), renk_farki (kutular eşleşti, renk farklı),
+# fazla_opencv / fazla_yolo (yalnızca birinin bulduğu balon var), karisik (her ikisinde de fazla)
+CASES = ['uyum', 'renk_farki', 'fazla_opencv', 'fazla_yolo', 'karisik']
+
+
+def _yolo_loop(model, feed, store, batch_size, is_cancelled, errors):
+    """YOLO thread'i: kuyruktaki kareleri batch'ler halinde işleyip sonuçları ve kare başı süreyi kaydeder."""
+    batcher = BatchedYoloInference(model, batch_size=batch_size, device=YOLO_DEVICE_TEST, **predict_filter_kwargs())
+    try:
+        while not is_cancelled():
+            items = batcher.collect(feed)
+            if not items:
+                return
+            start = time.perf_counter()
+            inferred = batcher.infer(items)
+            frame_ms = (time.perf_counter() - start) * 1000 / len(items) # Batch süresi karelere eşit bölünür
+            for frame_num, _, result in inferred:
+                append_yolo_result(store, frame_num, result)
+                store.append_frame(frame_num, detect_ms=frame_ms)
+    except Exception as e:
+        errors.append(e)
+
+
+def _feed(feed, item, thread):
+    """Kareyi YOLO kuyruğuna koyar; thread durduysa (hata) beklemeden False döner."""
+    while thread.is_alive():
+        try:
+            feed.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_comparison(video_path, hsv_values, model_path, backend='torch', start_frame=0, end_frame=0,
+                   use_full_video=True, batch_size=None, iou_threshold=None, progress=None, is_cancelled=None):
+    """OpenCV (HSV) ve YOLO'yu aynı çözülmüş karelerde yan yana çalıştırır.
+
+    Video bir kez çözülür; OpenCV bu thread'de, YOLO ayrı bir thread'de
+    çalışır ve kareleri sınırlı bir kuyruktan batch'ler halinde alır, böylece
+    iki dedektör zamanda örtüşür. {'results': {'opencv', 'yolo'}, 'table':
+    compare_frames çıktısı, 'wall_s', 'decode_wait_ms', ...} döndürür.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    start_frame, end_frame = resolve_frame_range(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), start_frame, end_frame,
+                                                 use_full_video)
+    frames_to_process = max(0, end_frame - start_frame)
+    is_cancelled = is_cancelled or (lambda: False)
+
+    detector = BalloonDetector()
+    model = get_model_registry().get(model_path, YOLO_DEVICE_TEST, backend=backend, calibration_video=video_path)
+    batch_size = batch_size or YOLO_SETTINGS['TEST_BATCH_SIZE']
+    opencv_results, yolo_results = ResultsStore(), ResultsStore()
+    feed = queue.Queue(maxsize=batch_size * COMPARISON_SETTINGS['YOLO_QUEUE_BATCHES'])
+    errors = []
+    yolo_thread = threading.Thread(target=_yolo_loop, name='ComparisonYolo', daemon=True,
+                                   args=(model, feed, yolo_results, batch_size, is_cancelled, errors))
+
+    prefetcher = FramePrefetcher(cap, start_frame, end_frame, queue_size=YOLO_SETTINGS['PREFETCH_QUEUE_SIZE'])
+    wall_start = time.perf_counter()
+    wait_s = 0.0 # Ana thread'in kare beklediği süre (çözme darboğazı)
+    prefetcher.start()
+    yolo_thread.start()
+    try:
+        while not is_cancelled():
+            t0 = time.perf_counter()
+            item = prefetcher.get()
+            wait_s += time.perf_counter() - t0
+            if item is None:
+                break
+            if not _feed(feed, item, yolo_thread):
+                break # YOLO thread'i hatayla durdu
+            frame_num, frame = item
+            detect_into_store(opencv_results, detector, frame_num, frame, hsv_values)
+            if progress:
+                progress(min(opencv_results.frame_count, yolo_results.frame_count), frames_to_process)
+    finally:
+        _feed(feed, None, yolo_thread) # Akış sonu; YOLO kalan batch'i işleyip çıkar
+        yolo_thread.join()
+        prefetcher.stop()
+        cap.release()
+    if errors:
+        raise errors[0]
+
+    return {
+        'video_path': video_path,
+        'model_path': model_path,
+        'backend': backend,
+        'start_frame': start_frame,
+        'end_frame': end_frame,
+        'results': {'opencv': opencv_results, 'yolo': yolo_results},
+        'table': compare_frames(opencv_results, yolo_results, iou_threshold),
+        'wall_s': time.perf_counter() - wall_start,
+        'decode_wait_ms': wait_s * 1000,
+    }
+
+
+def compare_frames(opencv_results, yolo_results, iou_threshold=None):
+    """İki dedektörün sonuçlarını ikisinin de işlediği karelerde kare başına birleştirir.
+
+    Kutular renkten bağımsız eşleştirilir (evaluation.match_detections; YOLO
+    kutuları etiket yerine geçer), eşleşen çiftlerdeki renk farkı ayrıca
+    sayılır. Sütunlar: frame, laser, opencv_count, yolo_count, matched,
+    color_mismatch, opencv_only, yolo_only, mean_iou, opencv_ms, yolo_ms,
+    agree, case (bkz. CASES).
+    """
+    iou_threshold = COMPARISON_SETTINGS['IOU_THRESHOLD'] if iou_threshold is None else iou_threshold
+    opencv_log = opencv_results.frame_log().rename(columns={'detect_ms': 'opencv_ms'})
+    yolo_log = yolo_results.frame_log()[['frame', 'detect_ms']].rename(columns={'detect_ms': 'yolo_ms'})
+    joined = opencv_log.merge(yolo_log, on='frame').sort_values('frame', kind='stable')
+    frames = joined['frame'].to_numpy()
+    count = len(frames)
+
+    columns = ['frame', 'color', 'confidence'] + BBOX_COLUMNS
+    opencv = opencv_results.to_dataframe(columns)
+    yolo = yolo_results.to_dataframe(columns)
+    opencv = opencv[opencv['frame'].isin(frames)].reset_index(drop=True)
+    yolo = yolo[yolo['frame'].isin(frames)].reset_index(drop=True)
+    opencv_pos = np.searchsorted(frames, opencv['frame'].to_numpy())
+    yolo_pos = np.searchsorted(frames, yolo['frame'].to_numpy())
+
+    match = match_detections(opencv, yolo, iou_threshold, class_aware=False)
+    opencv_idx = np.flatnonzero(match >= 0)
+    yolo_idx = match[opencv_idx]
+    iou = box_iou(opencv[BBOX_COLUMNS].to_numpy(dtype=np.float64)[opencv_idx],
+                  yolo[BBOX_COLUMNS].to_numpy(dtype=np.float64)[yolo_idx])
+    color_differs = (np.asarray(opencv['color'].astype(str))[opencv_idx]
+                     != np.asarray(yolo['color'].astype(str))[yolo_idx])
+
+    matched_pos = opencv_pos[opencv_idx]
+    opencv_count = np.bincount(opencv_pos, minlength=count)
+    yolo_count = np.bincount(yolo_pos, minlength=count)
+    matched = np.bincount(matched_pos, minlength=count)
+    color_mismatch = np.bincount(matched_pos[color_differs], minlength=count)
+    iou_sum = np.bincount(matched_pos, weights=iou, minlength=count)
+    opencv_only = opencv_count - matched
+    yolo_only = yolo_count - matched
+    agree = (opencv_only == 0) & (yolo_only == 0) & (color_mismatch == 0)
+    case = np.select([agree, (opencv_only == 0) & (yolo_only == 0), yolo_only == 0, opencv_only == 0],
+                     CASES[:4], CASES[4])
+
+    return pd.DataFrame({
+        'frame': frames,
+        'laser': joined['laser'].to_numpy(),
+        'opencv_count': opencv_count,
+        'yolo_count': yolo_count,
+        'matched': matched,
+        'color_mismatch': color_mismatch,
+        'opencv_only': opencv_only,
+        'yolo_only': yolo_only,
+        'mean_iou': np.divide(iou_sum, matched, out=np.full(count, np.nan), where=matched > 0),
+        'opencv_ms': joined['opencv_ms'].to_numpy(),
+        'yolo_ms': joined['yolo_ms'].to_numpy(),
+        'agree': agree,
+        'case': case,
+    })
+
+
+def comparison_summary(comparison):
+    """Uyum oranı, durum sayıları, uyumsuzluk aralıkları ve dedektör başı süre dağılımları (JSON'a yazılabilir).
+
+    Uyumsuzluk aralıkları ardışık kareler üzerinden bulunur (karşılaştırma
+    aralığı kesintisiz okunur).
+    """
+    table = comparison['table']
+    frames = len(table)
+    agree = table['agree'].to_numpy()
+    matched = table['matched'].to_numpy()
+    cases = table['case'].value_counts()
+    offset = int(table['frame'].iloc[0]) if frames else 0
+    wall_s = comparison['wall_s']
+    busy_s = float(table['opencv_ms'].sum() + table['yolo_ms'].sum()) / 1000
+    return {
+        'frames': frames,
+        'agreement_rate': float(agree.mean()) if frames else 0.0,
+        'cases': {case: int(cases.get(case, 0)) for case in CASES},
+        'detections': {'opencv': int(table['opencv_count'].sum()), 'yolo': int(table['yolo_count'].sum())},
+        'matched': int(matched.sum()),
+        'color_mismatch': int(table['color_mismatch'].sum()),
+        'mean_iou': float(np.nansum(table['mean_iou'].to_numpy() * matched) / matched.sum()) if matched.sum() else None,
+        'disagreements': interval_summary(*frame_runs(~agree, offset)),
+        'latency_ms': {'opencv': percentile_summary(table['opencv_ms']),
+                       'yolo': percentile_summary(table['yolo_ms'])},
+        'wall_s': wall_s,
+        'fps': frames / wall_s if wall_s > 0 else 0.0,
+        'overlap': busy_s / wall_s if wall_s > 0 else 0.0, # > 1: iki dedektör zamanda örtüştü
+        'decode_wait_ms': float(comparison['decode_wait_ms']),
+    }
+
+
+def format_comparison(summary):
+    """Özetin kısa metni (karşılaştırma bitiş mesajı için)."""
+    cases = ', '.join(f"{case} {count}" for case, count in summary['cases'].items())
+    mean_iou = f"{summary['mean_iou']:.3f}" if summary['mean_iou'] is not None else '-'
+    lines = [
+        f"{summary['frames']} kare, video bir kez çözüldü. Uyum: %{summary['agreement_rate'] * 100:.1f}",
+        f"Durumlar: {cases}",
+        f"Tespit: OpenCV {summary['detections']['opencv']}, YOLO {summary['detections']['yolo']}, "
+        f"eşleşen {summary['matched']} (ort. IoU {mean_iou}), renk farkı {summary['color_mismatch']}",
+        f"Uyumsuzluk: {summary['disagreements']['count']} aralık, en uzun {summary['disagreements']['longest']} kare",
+    ]
+    for name, stats in summary['latency_ms'].items():
+        if stats['count']:
+            lines.append(f"{name} ms/kare: ort. {stats['mean']:.2f}, p50 {stats.get('p50', float('nan')):.2f}, "
+                         f"p95 {stats.get('p95', float('nan')):.2f}, en fazla {stats['max']:.2f}")
+    lines.append(f"Toplam {summary['wall_s']:.1f} s ({summary['fps']:.1f} kare/s), örtüşme x{summary['overlap']:.2f}")
+    return '\n'.join(lines)
+
+
+def export_comparison(comparison, directory):
+    """Birleşik kare tablosunu, özeti (JSON) ve her dedektörün sonuçlarını (test CSV formatı) klasöre yazar."""
+    os.makedirs(directory, exist_ok=True)
+    comparison['table'].to_csv(os.path.join(directory, 'comparison_frames.csv'), index=False, float_format='%.3f')
+    summary = comparison_summary(comparison)
+    with open(os.path.join(directory, 'comparison_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    for name, store in comparison['results'].items():
+        export_rows_to_csv(store, os.path.join(directory, f"{name}.csv"))
+    return summary
+
+
+class ComparisonWorker(QObject):
+    """OpenCV / YOLO karşılaştırmasını ayrı thread'de çalıştırır."""
+    finished = pyqtSignal(object) # run_comparison çıktısı (iptalde kısmi, hatada None)
+    progress = pyqtSignal(int, int, str)
+    error = pyqtSignal(str)
+
+    def __init__(self, video_path, hsv_values, model_path, backend, start_frame, end_frame, use_full_video):
+        super().__init__()
+        self.video_path = video_path
+        self.hsv_values = hsv_values
+        self.model_path = model_path
+        self.backend = backend
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.use_full_video = use_full_video
+        self.is_cancelled = False
+
+    @pyqtSlot()
+    def run_comparison(self):
+        last_reported = [0]
+
+        def on_progress(processed, total):
+            if processed - last_reported[0] >= 25 or processed == total:
+                last_reported[0] = processed
+                percentage = int(processed / max(1, total) * 100)
+                self.progress.emit(percentage, processed, f"OpenCV / YOLO: {processed}/{total} (%{percentage})")
+
+        try:
+            comparison = run_comparison(self.video_path, self.hsv_values, self.model_path, self.backend,
+                                        self.start_frame, self.end_frame, self.use_full_video,
+                                        progress=on_progress, is_cancelled=lambda: self.is_cancelled)
+            comparison['cancelled'] = self.is_cancelled
+        except Exception as e:
+            logger.error(f"Karşılaştırma hatası: {e}", exc_info=True)
+            self.error.emit(f"Karşılaştırma Hatası: {e}")
+            comparison = None
+        status = "Karşılaştırma Tamamlandı." if not self.is_cancelled else "Karşılaştırma İptal Edildi."
+        self.progress.emit(100, last_reported[0], status)
+        self.finished.emit(comparison)
+
+    def cancel(self):
+        self.is_cancelled = True
@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import logging
+import threading
+import torch
+from .onnx_backend import ExportedYoloModel
+
+logger = logging.getLogger('CompiledCache')
+
+
+def torchscript_artifact_path(model_path, file_hash, imgsz):
+    """TorchScript kopyasının yolu: model özeti, giriş boyutu ve torch sürümüyle etiketli.
+
+    TorchScript modeli sabit giriş boyutuyla izlendiği için her imgsz ayrı bir
+    kopyadır; torch sürümü değişince kopyalar yeniden üretilir.
+    """
+    stem = os.path.splitext(os.path.abspath(model_path))[0]
+    return f"{stem}.{file_hash[:12]}.{imgsz}.torch-{torch.__version__}.torchscript"
+
+
+def export_torchscript(model_path, artifact_path, imgsz=640):
+    """.pt modelini katmanları birleştirilmiş (Conv+BN) TorchScript olarak dışa aktarır (bir kez)."""
+    from ultralytics import YOLO
+    logger.info(f"TorchScript dışa aktarımı: {model_path} -> {artifact_path}")
+    exported = YOLO(model_path).export(format='torchscript', imgsz=imgsz, verbose=False)
+    os.replace(exported, artifact_path)
+    return artifact_path
+
+
+class TorchScriptYoloModel(ExportedYoloModel):
+    """Önbellekteki TorchScript kopyalarıyla çalışan YOLO modeli.
+
+    Ultralytics predictor'ı kurulmadığı için ilk çıkarım çok daha hızlıdır.
+    Kopyalar sabit boyutlu olduğundan girişler imgsz x imgsz kareye
+    doldurulur; modelin hiç kullanılmamış bir imgsz ile çağrılması o boyutun
+    kopyasını (gerekirse dışa aktararak) bir kez yükler.
+    """
+    dynamic_shape = False
+
+    def __init__(self, model_path, file_hash, imgsz=640, device='cpu'):
+        self.model_path = model_path
+        self.file_hash = file_hash
+        self.imgsz = imgsz
+        self.device = device
+        self.names = {}
+        self.size_bytes = 0
+        self._modules = {} # imgsz -> ScriptModule
+        self._lock = threading.Lock()
+        self._module(imgsz)
+
+    def _module(self, imgsz):
+        with self._lock:
+            module = self._modules.get(imgsz)
+            if module is None:
+                artifact_path = torchscript_artifact_path(self.model_path, self.file_hash, imgsz)
+                if not os.path.exists(artifact_path):
+                    export_torchscript(self.model_path, artifact_path, imgsz)
+                extra_files = {'config.txt': ''} # Ultralytics meta verisi (sınıf adları)
+                module = torch.jit.load(artifact_path, _extra_files=extra_files, map_location=self.device)
+                module.eval()
+                if extra_files['config.txt']:
+                    names = json.loads(extra_files['config.txt']).get('names', {})
+                    self.names = {int(k): v for k, v in names.items()}
+                self.size_bytes += os.path.getsize(artifact_path)
+                self._modules[imgsz] = module
+            return module
+
+    def _forward(self, blob, imgsz):
+        module = self._module(imgsz)
+        with torch.inference_mode():
+            return module(torch.from_numpy(blob).to(self.device)).cpu().numpy()
+
+
+def load_torchscript_model(model_path, file_hash, imgsz=640, device='cpu'):
+    """TorchScript kopyası yoksa bir kez oluşturur ve yükler; (model, süre_ms) döndürür."""
+    load_start = time.perf_counter()
+    model = TorchScriptYoloModel(model_path, file_hash, imgsz=imgsz, device=device)
+    return model, (time.perf_counter() - load_start) * 1000
@@ -1,3 +1,4 @@
+import time
 import cv2
 import numpy as np
 from ..config import DETECTION_SETTINGS
@@ -8,17 +9,57 @@ class BalloonDetector:
         self.laser_frame_count = 0
         self.use_laser_mode = False
         self.auto_mode = True
+        # Son karenin ara çıktıları (hata ayıklama görünümü için, kopyalanmaz)
+        self.last_masks = None
+        self.last_contours = ()
+        self.last_candidate_count = 0
+        # Sözlük verilirse her karede aşama süreleri (ms) buraya yazılır (benchmark için)
+        self.stage_times = None
     
-    def detect(self, frame, hsv_values):
-        """Ana tespit metodu"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    def reset(self):
+        """Kareler arası durumu (lazer modu, mavi sayı geçmişi) sıfırlar."""
+        self.last_blue_counts = []
+        self.laser_frame_count = 0
+        self.use_laser_mode = False
+
+    def get_state(self):
+        """Kareler arası durumu (kontrol noktası için) sözlük olarak döndürür."""
+        return {
+            'last_blue_counts': list(self.last_blue_counts),
+            'laser_frame_count': self.laser_frame_count,
+            'use_laser_mode': self.use_laser_mode,
+        }
+
+    def set_state(self, state):
+        self.last_blue_counts = list(state['last_blue_counts'])
+        self.laser_frame_count = state['laser_frame_count']
+        self.use_laser_mode = state['use_laser_mode']
+    
+    def detect(self, frame, hsv_values, hsv=None):
+        """Ana tespit metodu (hsv verilirse aynı karenin hazır HSV dönüşümü kullanılır)"""
+        timed = self.stage_times is not None
+        if timed:
+            start = time.perf_counter()
+        if hsv is None:
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        if timed:
+            start = self._stage_done('hsv', start)
         masks = self._create_masks(hsv, frame.shape, hsv_values)
+        if timed:
+            self._stage_done('masks', start)
+        self.last_masks = masks
         detections = self._detect_objects(hsv, masks)
         
         if self.auto_mode:
             self._check_mode_switch(detections)
         
         return detections, masks['combined']
+
+    def _stage_done(self, stage, start):
+        """Aşama süresini stage_times'a yazar, sonraki aşamanın başlangıcını döndürür."""
+        now = time.perf_counter()
+        self.stage_times[stage] = (now - start) * 1000
+        return now
     
     def _create_masks(self, hsv, shape, hsv_values):
         """HSV değerlerine göre maskeleri oluşturur"""
@@ -50,9 +91,15 @@ class BalloonDetector:
     
     def _detect_objects(self, hsv, masks):
         """Maskeleri kullanarak balonları tespit eder"""
+        timed = self.stage_times is not None
+        if timed:
+            start = time.perf_counter()
         contours, _ = cv2.findContours(masks['combined'], 
                                      cv2.RETR_EXTERNAL, 
                                      cv2.CHAIN_APPROX_SIMPLE)
+        self.last_contours = contours
+        if timed:
+            start = self._stage_done('contours', start)
         
         detections = []
         for contour in contours:
@@ -62,8 +109,14 @@ class BalloonDetector:
                 detection = self._process_contour(contour, hsv, masks)
                 if detection:
                     detections.append(detection)
-        
-        return self._apply_nms(detections)
+        self.last_candidate_count = len(detections)
+        if timed:
+            start = self._stage_done('per_contour', start)
+        
+        detections = self._apply_nms(detections)
+        if timed:
+            self._stage_done('nms', start)
+        return detections
     
     def _process_contour(self, contour, hsv, masks):
         """Kontur bilgilerini işler ve tespit nesnesini oluşturur"""
@@ -0,0 +1,43 @@
+import threading
+
+
+class DisplayMailbox:
+    """İşlem thread'inden GUI'ye giden, kanal başına tek kare tutan posta kutusu.
+
+    İşlemci yeni bir kare hazırlamadan önce wants_frame() ile GUI'nin bir önceki
+    kareyi alıp almadığını sorar; almadıysa o kare için görselleştirme hiç
+    yapılmaz. GUI tarafı kendi hızında take() ile en son kareyi çeker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}         # kanal -> (kare, istatistikler)
+        self._target_sizes = {}  # kanal -> (genişlik, yükseklik)
+
+    def set_target_size(self, width, height, channel='main'):
+        """Kanalın gösterileceği widget boyutunu bildirir (GUI thread'i)."""
+        with self._lock:
+            self._target_sizes[channel] = (int(width), int(height))
+
+    def target_size(self, channel='main'):
+        with self._lock:
+            return self._target_sizes.get(channel, (0, 0))
+
+    def wants_frame(self, channel='main'):
+        """Kanal boşsa (GUI son kareyi aldıysa) True döner."""
+        with self._lock:
+            return channel not in self._slots
+
+    def post(self, frame, stats, channel='main'):
+        """Kanaldaki kareyi yenisiyle değiştirir; alınmamış eski kare atılır."""
+        with self._lock:
+            self._slots[channel] = (frame, stats)
+
+    def take(self, channel='main'):
+        """Kanaldaki kareyi alır ve kanalı boşaltır; kare yoksa None döner."""
+        with self._lock:
+            return self._slots.pop(channel, None)
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
@@ -0,0 +1,320 @@
+import io
+import os
+import re
+import cv2
+import numpy as np
+import pandas as pd
+from .results_store import BBOX_COLUMNS, EXPORT_COLUMNS, ResultsStore
+from ..config import EVALUATION_SETTINGS
+
+BACKGROUND = 'arka_plan' # Karışıklık tablosunda eşleşmeyen tespit/etiket satırı ve sütunu
+
+# Etiket CSV'lerinde kabul edilen alternatif sütun adları
+_GT_COLUMN_ALIASES = {'class': 'color', 'label': 'color', 'x1': 'bbox_x1', 'y1': 'bbox_y1', 'x2': 'bbox_x2',
+                      'y2': 'bbox_y2'}
+
+
+def _empty_ground_truth():
+    return pd.DataFrame({'frame': pd.Series(dtype=np.int64), 'color': pd.Series(dtype=object),
+                         **{name: pd.Series(dtype=np.float64) for name in BBOX_COLUMNS}})
+
+
+def load_ground_truth_csv(path):
+    """Etiket CSV'sini okur: frame, color, bbox_x1, bbox_y1, bbox_x2, bbox_y2 (piksel).
+
+    Renk ve kutusu boş satırlar yalnızca karenin etiketlendiğini (balon
+    yok) belirtir. (etiketler, etiketli_kareler) döndürür.
+    """
+    df = pd.read_csv(path).rename(columns=_GT_COLUMN_ALIASES)
+    missing = [name for name in ['frame', 'color'] + BBOX_COLUMNS if name not in df.columns]
+    if missing:
+        raise ValueError(f"Etiket dosyasında eksik sütunlar: {missing}")
+    frames = np.unique(df['frame'].to_numpy(dtype=np.int64))
+    df = df.dropna(subset=['color'] + BBOX_COLUMNS)
+    boxes = df[['frame', 'color'] + BBOX_COLUMNS].reset_index(drop=True)
+    return boxes.astype({'frame': np.int64, 'color': str}), frames
+
+
+def load_ground_truth_yolo(label_dir, image_size, label_classes=None):
+    """YOLO formatındaki etiket klasörünü okur (kare başına bir .txt).
+
+    Kare numarası dosya adının sonundaki sayıdır (örn. 'video_000123.txt').
+    Satırlar 'sınıf cx cy w h' (0-1 arası normalize); image_size (genişlik,
+    yükseklik) ile piksele çevrilir. Boş dosya, balonsuz etiketli karedir.
+    """
+    label_classes = label_classes or EVALUATION_SETTINGS['LABEL_CLASSES']
+    frames, chunks = [], []
+    for name in os.listdir(label_dir):
+        match = re.search(r'(\d+)$', os.path.splitext(name)[0])
+        if not name.endswith('.txt') or not match:
+            continue
+        frame_num = int(match.group(1))
+        frames.append(frame_num)
+        with open(os.path.join(label_dir, name)) as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        chunks.extend(f"{frame_num} {line}" for line in lines)
+    frames = np.unique(np.asarray(frames, dtype=np.int64))
+    if not chunks:
+        return _empty_ground_truth(), frames
+
+    # Tüm satırlar tek seferde ayrıştırılır
+    table = pd.read_csv(io.StringIO('\n'.join(chunks)), sep=r'\s+', header=None,
+                        usecols=range(6), names=['frame', 'cls', 'cx', 'cy', 'w', 'h'])
+    width, height = image_size
+    cx, cy = table['cx'].to_numpy() * width, table['cy'].to_numpy() * height
+    half_w, half_h = table['w'].to_numpy() * width / 2, table['h'].to_numpy() * height / 2
+    cls = table['cls'].to_numpy(dtype=np.int64)
+    boxes = pd.DataFrame({
+        'frame': table['frame'].to_numpy(dtype=np.int64),
+        'color': [label_classes.get(c, f"class_{c}") for c in cls.tolist()],
+        'bbox_x1': cx - half_w, 'bbox_y1': cy - half_h, 'bbox_x2': cx + half_w, 'bbox_y2': cy + half_h,
+    })
+    return boxes, frames
+
+
+def video_size(video_path):
+    """Videonun (genişlik, yükseklik) değeri (YOLO etiketlerini piksele çevirmek için)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return size
+
+
+def load_ground_truth(path, image_size=None, label_classes=None):
+    """Klasör ise YOLO etiketleri, değilse etiket CSV'si olarak okur."""
+    if os.path.isdir(path):
+        if image_size is None:
+            raise ValueError("YOLO etiketleri için görüntü boyutu (veya video) gerekli.")
+        return load_ground_truth_yolo(path, image_size, label_classes)
+    return load_ground_truth_csv(path)
+
+
+def load_detections(source):
+    """ResultsStore, DataFrame veya dışa aktarılmış CSV/Parquet dosyasından tespit tablosu."""
+    if isinstance(source, ResultsStore):
+        df = source.to_dataframe(EXPORT_COLUMNS)
+    elif isinstance(source, pd.DataFrame):
+        df = source
+    elif str(source).lower().endswith('.parquet'):
+        df = pd.read_parquet(source)
+    else:
+        df = pd.read_csv(source)
+    if 'detector' not in df.columns:
+        df = df.assign(detector='opencv')
+    return df.astype({'frame': np.int64, 'color': str, 'detector': str})
+
+
+def box_iou(boxes_a, boxes_b):
+    """Eşleşen satır çiftlerinin IoU'su: (N, 4) ve (N, 4) -> (N,)."""
+    ix1 = np.maximum(boxes_a[:, 0], boxes_b[:, 0])
+    iy1 = np.maximum(boxes_a[:, 1], boxes_b[:, 1])
+    ix2 = np.minimum(boxes_a[:, 2], boxes_b[:, 2])
+    iy2 = np.minimum(boxes_a[:, 3], boxes_b[:, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a + area_b - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def candidate_pairs(detections, ground_truth, class_aware=True):
+    """Aynı karedeki (class_aware ise aynı renkteki) tüm tespit-etiket çiftleri ve IoU'ları.
+
+    Çiftler kare birleştirmesiyle (merge) bulunur, IoU hepsi için tek
+    seferde hesaplanır. Kare, azalan güven ve azalan IoU sırasıyla
+    (tespit indeksi, etiket indeksi, IoU, kare) dizileri döndürülür; sıra
+    eşikten bağımsız olduğundan farklı eşikler aynı çiftleri süzerek kullanır.
+    """
+    keys = ['frame', 'color'] if class_aware else ['frame']
+    det_keys = detections[keys].assign(det=np.arange(len(detections)))
+    gt_keys = ground_truth[keys].assign(gt=np.arange(len(ground_truth)))
+    pairs = det_keys.merge(gt_keys, on=keys)
+    det_idx = pairs['det'].to_numpy()
+    gt_idx = pairs['gt'].to_numpy()
+    det_boxes = detections[BBOX_COLUMNS].to_numpy(dtype=np.float64)
+    gt_boxes = ground_truth[BBOX_COLUMNS].to_numpy(dtype=np.float64)
+    iou = box_iou(det_boxes[det_idx], gt_boxes[gt_idx])
+    keep = iou > 0
+    det_idx, gt_idx, iou = det_idx[keep], gt_idx[keep], iou[keep]
+    frames = pairs['frame'].to_numpy()[keep]
+    confidence = detections['confidence'].to_numpy(dtype=np.float64)[det_idx]
+    order = np.lexsort((-iou, det_idx, -confidence, frames))
+    return det_idx[order], gt_idx[order], iou[order], frames[order]
+
+
+def greedy_match(pairs, det_count, gt_count, iou_threshold, det_mask=None):
+    """candidate_pairs çıktısını açgözlü eşleştirir (COCO ile aynı kural).
+
+    Her turda her karenin en yüksek güvenli eşleşmemiş tespiti, kalan en
+    yüksek IoU'lu etiketi alır; tur sayısı karedeki en fazla tespit
+    kadardır, kare sayısından bağımsızdır. det_mask verilirse yalnızca
+    seçili tespitler eşleşir. Tespit başına eşleşen etiket indeksi (yoksa
+    -1) döndürür.
+    """
+    det_idx, gt_idx, iou, frames = pairs
+    matched = np.full(det_count, -1, dtype=np.int64)
+    det_taken = np.zeros(det_count, dtype=bool)
+    gt_taken = np.zeros(gt_count, dtype=bool)
+    usable = iou >= iou_threshold
+    if det_mask is not None:
+        usable &= det_mask[det_idx]
+    alive = np.flatnonzero(usable)
+    while len(alive):
+        alive_frames = frames[alive]
+        chosen = alive[np.flatnonzero(np.r_[True, alive_frames[1:] != alive_frames[:-1]])]
+        matched[det_idx[chosen]] = gt_idx[chosen]
+        det_taken[det_idx[chosen]] = True
+        gt_taken[gt_idx[chosen]] = True
+        alive = alive[~det_taken[det_idx[alive]] & ~gt_taken[gt_idx[alive]]]
+    return matched
+
+
+def match_detections(detections, ground_truth, iou_threshold, class_aware=True):
+    """Tespitleri etiketlerle kare içinde güven sırasıyla eşleştirir; tespit başına etiket indeksi veya -1."""
+    pairs = candidate_pairs(detections, ground_truth, class_aware)
+    return greedy_match(pairs, len(detections), len(ground_truth), iou_threshold)
+
+
+def _prf(tp, fp, fn):
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'tp': int(tp), 'fp': int(fp), 'fn': int(fn), 'precision': precision, 'recall': recall, 'f1': f1}
+
+
+def average_precision(confidence, is_tp, gt_count):
+    """101 noktalı (COCO) ara değerlenmiş AP; etiket yoksa NaN."""
+    if gt_count == 0:
+        return float('nan')
+    if not len(confidence):
+        return 0.0
+    order = np.argsort(-confidence, kind='stable')
+    tp = np.cumsum(is_tp[order])
+    fp = np.cumsum(~is_tp[order])
+    recall = tp / gt_count
+    precision = tp / (tp + fp)
+    envelope = np.maximum.accumulate(precision[::-1])[::-1]
+    idx = np.searchsorted(recall, np.linspace(0, 1, 101), side='left')
+    sampled = np.where(idx < len(envelope), envelope[np.minimum(idx, len(envelope) - 1)], 0.0)
+    return float(sampled.mean())
+
+
+def evaluate_detections(detections, ground_truth, frames=None, iou_threshold=None, confidence_threshold=None,
+                        map_iou_thresholds=None):
+    """Tek bir dedektörün tespitlerini etiketlerle karşılaştırır.
+
+    frames verilirse yalnızca bu (etiketli) karelerdeki tespitler sayılır.
+    Kesinlik/duyarlılık/F1 ve karışıklık tablosu iou_threshold'da,
+    confidence_threshold üstündeki tespitlerle; AP her renk ve
+    map_iou_thresholds'taki her eşik için tüm tespitlerle hesaplanır.
+    """
+    iou_threshold = EVALUATION_SETTINGS['IOU_THRESHOLD'] if iou_threshold is None else iou_threshold
+    if confidence_threshold is None:
+        confidence_threshold = EVALUATION_SETTINGS['CONFIDENCE_THRESHOLD']
+    map_iou_thresholds = map_iou_thresholds or EVALUATION_SETTINGS['MAP_IOU_THRESHOLDS']
+    if frames is not None:
+        detections = detections[detections['frame'].isin(frames)]
+        ground_truth = ground_truth[ground_truth['frame'].isin(frames)]
+
+    # Renkler tamsayı koda çevrilir; sonraki tüm karşılaştırmalar sayısaldır
+    det_count, gt_count = len(detections), len(ground_truth)
+    codes, colors = pd.factorize(pd.concat([detections['color'], ground_truth['color']], ignore_index=True),
+                                 sort=True)
+    colors = [str(color) for color in colors]
+    background = len(colors)
+    det_codes, gt_codes = codes[:det_count], codes[det_count:]
+    detections = pd.DataFrame({'frame': detections['frame'].to_numpy(), 'color': det_codes,
+                               'confidence': detections['confidence'].to_numpy(dtype=np.float64),
+                               **{name: detections[name].to_numpy() for name in BBOX_COLUMNS}})
+    ground_truth = pd.DataFrame({'frame': ground_truth['frame'].to_numpy(), 'color': gt_codes,
+                                 **{name: ground_truth[name].to_numpy() for name in BBOX_COLUMNS}})
+    confidence = detections['confidence'].to_numpy()
+    confident = confidence >= confidence_threshold
+    det_per_color = np.bincount(det_codes[confident], minlength=background)
+    gt_per_color = np.bincount(gt_codes, minlength=background)
+
+    # Güven eşiği üstündeki tespitlerle kesinlik / duyarlılık / F1
+    pairs = candidate_pairs(detections, ground_truth)
+    is_tp = greedy_match(pairs, det_count, gt_count, iou_threshold, confident) >= 0
+    tp_per_color = np.bincount(det_codes[is_tp], minlength=background)
+    per_color = {color: _prf(tp_per_color[i], det_per_color[i] - tp_per_color[i], gt_per_color[i] - tp_per_color[i])
+                 for i, color in enumerate(colors)}
+    tp = int(tp_per_color.sum())
+    overall = _prf(tp, int(confident.sum()) - tp, gt_count - tp)
+
+    # Karışıklık: renkten bağımsız eşleşme; eşleşmeyenler arka plan satır/sütununa
+    agnostic = greedy_match(candidate_pairs(detections, ground_truth, class_aware=False), det_count, gt_count,
+                            iou_threshold, confident)
+    hits = agnostic >= 0
+    gt_unmatched = np.ones(gt_count, dtype=bool)
+    gt_unmatched[agnostic[hits]] = False
+    truth = np.where(hits, gt_codes[np.maximum(agnostic, 0)] if gt_count else background, background)[confident]
+    truth = np.concatenate([truth, gt_codes[gt_unmatched]])
+    predicted = np.concatenate([det_codes[confident], np.full(int(gt_unmatched.sum()), background)])
+    size = background + 1
+    counts = np.bincount(truth * size + predicted, minlength=size * size).reshape(size, size)
+    labels = colors + [BACKGROUND]
+    confusion = pd.DataFrame(counts, index=pd.Index(labels, name='etiket'), columns=pd.Index(labels, name='tespit'))
+
+    # mAP: çiftler bir kez bulunur, her eşikte yalnızca eşleştirme tekrarlanır
+    by_color = [np.flatnonzero(det_codes == i) for i in range(background)]
+    ap = {color: {} for color in colors}
+    for threshold in map_iou_thresholds:
+        tp_at = greedy_match(pairs, det_count, gt_count, threshold) >= 0
+        for i, color in enumerate(colors):
+            ap[color][threshold] = average_precision(confidence[by_color[i]], tp_at[by_color[i]], int(gt_per_color[i]))
+    ap_table = pd.DataFrame(ap, dtype=np.float64).T
+    labelled = ap_table[gt_per_color > 0] if len(ap_table) else ap_table
+    return {
+        'frames': int(len(frames)) if frames is not None else int(ground_truth['frame'].nunique()),
+        'detections': det_count,
+        'ground_truth': gt_count,
+        'iou_threshold': iou_threshold,
+        'confidence_threshold': confidence_threshold,
+        'overall': overall,
+        'per_color': per_color,
+        'confusion': confusion,
+        'ap': {color: {threshold: float(value) for threshold, value in row.items()} for color, row in ap_table.iterrows()},
+        'map50': float(labelled[0.5].mean()) if 0.5 in labelled.columns and len(labelled) else float('nan'),
+        'map': float(np.nanmean(labelled.to_numpy())) if len(labelled) else float('nan'),
+    }
+
+
+def evaluate(detections, ground_truth, frames=None, **thresholds):
+    """Tespitleri dedektör sütununa göre ayrı ayrı değerlendirir: {dedektör: rapor}."""
+    detections = load_detections(detections)
+    if not len(detections):
+        return {'-': evaluate_detections(detections, ground_truth, frames, **thresholds)}
+    return {detector: evaluate_detections(group, ground_truth, frames, **thresholds)
+            for detector, group in detections.groupby('detector', sort=True)}
+
+
+def report_to_dict(report):
+    """Raporu JSON'a yazılabilir hale getirir (karışıklık tablosu iç içe sözlük olur)."""
+    result = dict(report)
+    result['confusion'] = {str(truth): {str(pred): int(count) for pred, count in row.items()}
+                           for truth, row in report['confusion'].iterrows()}
+    result['ap'] = {color: {str(threshold): value for threshold, value in values.items()}
+                    for color, values in report['ap'].items()}
+    return result
+
+
+def format_report(detector, report):
+    """Raporun okunabilir metin özeti."""
+    overall = report['overall']
+    lines = [
+        f"[{detector}] {report['frames']} kare, {report['ground_truth']} etiket, {report['detections']} tespit "
+        f"(IoU>={report['iou_threshold']}, güven>={report['confidence_threshold']})",
+        f"  Kesinlik {overall['precision']:.3f}  Duyarlılık {overall['recall']:.3f}  F1 {overall['f1']:.3f}  "
+        f"(TP {overall['tp']}, FP {overall['fp']}, FN {overall['fn']})",
+        f"  mAP@0.5 {report['map50']:.3f}  mAP@[.5:.95] {report['map']:.3f}",
+    ]
+    for color, stats in report['per_color'].items():
+        ap50 = report['ap'].get(color, {}).get(0.5, float('nan'))
+        lines.append(f"  {color:<10} K {stats['precision']:.3f}  D {stats['recall']:.3f}  F1 {stats['f1']:.3f}  "
+                     f"AP50 {ap50:.3f}")
+    lines.append("  Karışıklık (satır: etiket, sütun: tespit):")
+    lines.extend("    " + line for line in report['confusion'].to_string().splitlines())
+    return '\n'.join(lines)
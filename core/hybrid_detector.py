@@ -0,0 +1,158 @@
+import time
+import cv2
+import numpy as np
+from .detector import BalloonDetector
+from .yolo_results import result_arrays, predict_filter_kwargs
+from ..config import HYBRID_SETTINGS
+
+
+def _box_iou(box, boxes):
+    """Bir kutunun kutu dizisiyle IoU değerleri."""
+    if len(boxes) == 0:
+        return np.zeros(0)
+    boxes = np.asarray(boxes, dtype=np.float32)
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / np.maximum(area + areas - inter, 1e-9)
+
+
+class HybridDetector:
+    """HSV adaylarını bölge önerisi olarak kullanıp YOLO ile doğrulayan dedektör.
+
+    BalloonDetector'ın her karede bulduğu adayların etrafından küçük, dolgulu
+    kırpıntılar alınır ve tek bir batch halinde düşük çözünürlükte YOLO'ya
+    verilir; YOLO'nun onaylamadığı adaylar atılır. HSV'nin hiç göremediği
+    balonları yakalamak için her FULL_FRAME_INTERVAL karede bir tam kare YOLO
+    çalıştırılır. Çıktı BalloonDetector ile aynı tespit formatındadır.
+    """
+
+    def __init__(self, model, class_map, device='cpu', settings=None):
+        self.model = model
+        self.class_map = class_map
+        self.device = device
+        self.settings = dict(HYBRID_SETTINGS, **(settings or {}))
+        self.cv_detector = BalloonDetector()
+        self.frame_index = 0
+        self.last_stats = {}
+        # Sınıf filtresi genel YOLO ayarından, güven eşiği hibrit ayarından
+        self.predict_kwargs = dict(predict_filter_kwargs(), conf=self.settings['VERIFY_CONFIDENCE'])
+
+    @property
+    def use_laser_mode(self):
+        return self.cv_detector.use_laser_mode
+
+    def reset(self):
+        self.cv_detector.reset()
+        self.frame_index = 0
+
+    def get_state(self):
+        return {'frame_index': self.frame_index, 'hsv': self.cv_detector.get_state()}
+
+    def set_state(self, state):
+        self.frame_index = state['frame_index']
+        self.cv_detector.set_state(state['hsv'])
+
+    def detect(self, frame, hsv_values):
+        """(tespitler, birleşik_maske) döndürür; istatistikler last_stats içinde."""
+        hsv_start = time.perf_counter()
+        proposals, combined_mask = self.cv_detector.detect(frame, hsv_values)
+        proposals = sorted(proposals, key=lambda d: d['color_ratio'], reverse=True)
+        proposals = proposals[:self.settings['MAX_PROPOSALS']]
+        hsv_end = time.perf_counter()
+
+        detections = self._verify_proposals(frame, proposals)
+        crop_end = time.perf_counter()
+
+        full_frame = self.frame_index % max(1, self.settings['FULL_FRAME_INTERVAL']) == 0
+        added = 0
+        if full_frame:
+            added = self._add_full_frame_misses(frame, detections)
+        self.frame_index += 1
+
+        self.last_stats = {
+            'proposals': len(proposals),
+            'verified': len(detections) - added,
+            'full_frame': full_frame,
+            'full_frame_added': added,
+            'hsv_ms': (hsv_end - hsv_start) * 1000,
+            'crop_ms': (crop_end - hsv_end) * 1000,
+            'full_ms': (time.perf_counter() - crop_end) * 1000,
+        }
+        return detections, combined_mask
+
+    def _crop_box(self, bbox, shape):
+        """Aday kutusunu dolgu ekleyip kareye yakın bir kırpma bölgesine genişletir."""
+        x1, y1, x2, y2 = bbox
+        side = max(x2 - x1, y2 - y1)
+        side = max(self.settings['MIN_CROP_SIZE'], int(side * (1 + 2 * self.settings['CROP_PADDING'])))
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        h, w = shape[:2]
+        cx1, cy1 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+        cx2, cy2 = int(min(w, cx + side / 2)), int(min(h, cy + side / 2))
+        return cx1, cy1, cx2, cy2
+
+    def _verify_proposals(self, frame, proposals):
+        if not proposals:
+            return []
+        regions = [self._crop_box(p['bbox'], frame.shape) for p in proposals]
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+        results = self.model(crops, imgsz=self.settings['CROP_IMGSZ'], device=self.device,
+                             verbose=False, **self.predict_kwargs)
+
+        detections = []
+        for proposal, (ox, oy, _, _), result in zip(proposals, regions, results):
+            xyxy, confs, classes = result_arrays(result)
+            if len(confs) == 0:
+                continue # YOLO bu adayı onaylamadı
+            # Kırpıntıda birden fazla kutu varsa adayın merkezine en yakın/en güveni al
+            local = np.asarray(proposal['bbox'], dtype=np.float32) - [ox, oy, ox, oy]
+            best = int(np.argmax(confs * (0.5 + _box_iou(local, xyxy))))
+            detection = dict(proposal)
+            detection['confidence'] = float(confs[best])
+            yolo_color = self.class_map.get(int(classes[best]))
+            if yolo_color in ('red', 'blue'):
+                detection['color'] = yolo_color # Model renk sınıfı veriyorsa o geçerli
+            detection['source'] = 'hsv+yolo'
+            detections.append(detection)
+        return detections
+
+    def _add_full_frame_misses(self, frame, detections):
+        """Tam kare YOLO ile HSV'nin kaçırdığı balonları ekler; eklenen sayıyı döndürür."""
+        result = self.model(frame, device=self.device, verbose=False, **self.predict_kwargs)[0]
+        xyxy, confs, classes = result_arrays(result)
+        if len(confs) == 0:
+            return 0
+        known = [d['bbox'] for d in detections]
+        masks = self.cv_detector.last_masks
+        added = 0
+        for box, conf, cls_id in zip(xyxy.tolist(), confs.tolist(), classes.tolist()):
+            if len(known) and _box_iou(box, known).max() >= self.settings['MATCH_IOU']:
+                continue
+            x1, y1, x2, y2 = box
+            color = self.class_map.get(cls_id, "unknown")
+            color_ratio = conf
+            if color not in ('red', 'blue') and masks is not None:
+                # Sınıf renk belirtmiyorsa kutu içindeki HSV maskelerine bak
+                area = max(1, (x2 - x1) * (y2 - y1))
+                red_ratio = cv2.countNonZero(masks['red'][y1:y2, x1:x2]) / area
+                blue_ratio = cv2.countNonZero(masks['blue'][y1:y2, x1:x2]) / area
+                if max(red_ratio, blue_ratio) > 0:
+                    color = "red" if red_ratio > blue_ratio else "blue"
+                    color_ratio = max(red_ratio, blue_ratio)
+            detections.append({
+                "bbox": [x1, y1, x2, y2],
+                "confidence": conf,
+                "color": color,
+                "is_laser_mode": self.cv_detector.use_laser_mode,
+                "color_ratio": color_ratio,
+                "ellipse": None,
+                "source": 'yolo',
+            })
+            known.append([x1, y1, x2, y2])
+            added += 1
+        return added
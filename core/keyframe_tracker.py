@@ -0,0 +1,159 @@
+import time
+import cv2
+import numpy as np
+from ..config import KEYFRAME_SETTINGS
+
+
+class KeyframePropagator:
+    """YOLO'yu yalnızca ana karelerde çalıştırıp aradaki karelerde kutuları taşır.
+
+    Ana kareler arasında her kutunun içindeki köşe noktaları seyrek optik
+    akışla (Lucas-Kanade) izlenir; kutu, noktaların medyan kaymasıyla
+    ötelenir ve aralarındaki mesafe oranıyla ölçeklenir. Yeterli nokta
+    izlenemezse son bilinen hızla (sabit hız) tahmin edilir. K karede bir,
+    ya da sahne değişimi / izleme kaybı olduğunda yeni ana kare istenir.
+    K, ölçülen çıkarım ve taşıma sürelerine göre hedef FPS'i tutturacak
+    şekilde uyarlanır.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = dict(KEYFRAME_SETTINGS, **(settings or {}))
+        self.interval = self.settings['MIN_INTERVAL']
+        self.reset()
+
+    def reset(self):
+        self.prev_gray = None
+        self.key_thumb = None
+        self.tracks = [] # (tespit, nokta_dizisi, hız)
+        self.frames_since_key = 0
+        self.inference_ms = None # Ana kare süresinin üstel ortalaması
+        self.propagate_ms = None # Taşıma süresinin üstel ortalaması
+        self.last_stats = {}
+
+    def process(self, frame, detect_fn, target_fps=None):
+        """Kare için tespitleri döndürür; gerekirse detect_fn(frame) ile YOLO çalıştırır.
+
+        Taşınan tespitlerde 'propagated' True'dur; last_stats karenin
+        ana kare olup olmadığını ve güncel K değerini içerir.
+        """
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        thumb = cv2.resize(gray, (64, 36), interpolation=cv2.INTER_AREA)
+
+        reason = self._keyframe_reason(thumb)
+        detections = None
+        if reason is None:
+            detections = self._propagate(gray)
+            if detections is None:
+                reason = 'izleme kaybı'
+
+        if reason is not None:
+            detections = [dict(d, propagated=False) for d in detect_fn(frame)]
+            self._start_tracks(gray, detections)
+            self.key_thumb = thumb
+            self.frames_since_key = 0
+            self.inference_ms = self._ema(self.inference_ms, (time.perf_counter() - start) * 1000)
+        else:
+            self.frames_since_key += 1
+            self.propagate_ms = self._ema(self.propagate_ms, (time.perf_counter() - start) * 1000)
+        self.prev_gray = gray
+
+        if target_fps:
+            self._adapt_interval(target_fps)
+        self.last_stats = {
+            'keyframe': reason is not None,
+            'reason': reason,
+            'interval': self.interval,
+            'inference_ms': self.inference_ms or 0.0,
+            'propagate_ms': self.propagate_ms or 0.0,
+        }
+        return detections
+
+    def _keyframe_reason(self, thumb):
+        if self.prev_gray is None or self.key_thumb is None:
+            return 'ilk kare'
+        if self.frames_since_key + 1 >= self.interval:
+            return 'aralık'
+        motion = float(np.mean(cv2.absdiff(thumb, self.key_thumb)))
+        if motion > self.settings['SCENE_CHANGE_THRESHOLD']:
+            return 'sahne değişimi'
+        return None
+
+    def _start_tracks(self, gray, detections):
+        self.tracks = []
+        h, w = gray.shape[:2]
+        for detection in detections:
+            x1, y1, x2, y2 = [int(v) for v in detection['bbox']]
+            x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+            points = None
+            if x2 - x1 >= 4 and y2 - y1 >= 4:
+                points = cv2.goodFeaturesToTrack(gray[y1:y2, x1:x2], self.settings['MAX_POINTS_PER_BOX'],
+                                                  0.01, 3)
+            if points is None:
+                # Dokusuz kutu: köşeler ve merkez
+                points = np.array([[0, 0], [x2 - x1, 0], [0, y2 - y1], [x2 - x1, y2 - y1],
+                                   [(x2 - x1) / 2, (y2 - y1) / 2]], dtype=np.float32)
+            points = points.reshape(-1, 2).astype(np.float32) + np.array([x1, y1], dtype=np.float32)
+            self.tracks.append((detection, points, np.zeros(2, dtype=np.float32)))
+
+    def _propagate(self, gray):
+        """Tüm kutuları bir önceki kareden taşır; izleme kaybedildiyse None döner."""
+        if not self.tracks:
+            return []
+        all_points = np.concatenate([points for _, points, _ in self.tracks]).reshape(-1, 1, 2)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, all_points, None,
+                                                    winSize=(15, 15), maxLevel=2)
+        moved = moved.reshape(-1, 2)
+        status = status.reshape(-1).astype(bool)
+
+        detections, tracks, lost = [], [], 0
+        offset = 0
+        for detection, points, velocity in self.tracks:
+            n = len(points)
+            ok = status[offset:offset + n]
+            new_points = moved[offset:offset + n]
+            offset += n
+            x1, y1, x2, y2 = detection['bbox']
+            scale = 1.0
+            if ok.sum() >= self.settings['MIN_TRACKED_POINTS']:
+                old, new = points[ok], new_points[ok]
+                velocity = np.median(new - old, axis=0)
+                if len(old) >= 2:
+                    old_spread = np.linalg.norm(old - old.mean(axis=0), axis=1).mean()
+                    new_spread = np.linalg.norm(new - new.mean(axis=0), axis=1).mean()
+                    if old_spread > 1e-3:
+                        scale = float(np.clip(new_spread / old_spread, 0.8, 1.25))
+                points = new
+            else:
+                lost += 1 # Sabit hız tahmini
+                points = points + velocity
+            cx, cy = (x1 + x2) / 2 + velocity[0], (y1 + y2) / 2 + velocity[1]
+            half_w, half_h = (x2 - x1) * scale / 2, (y2 - y1) * scale / 2
+            moved_detection = dict(detection, propagated=True,
+                                   bbox=[int(cx - half_w), int(cy - half_h), int(cx + half_w), int(cy + half_h)])
+            detections.append(moved_detection)
+            tracks.append((moved_detection, points.astype(np.float32), velocity))
+
+        if lost > len(self.tracks) * self.settings['MAX_LOST_RATIO']:
+            return None
+        self.tracks = tracks
+        return detections
+
+    def _adapt_interval(self, target_fps):
+        """Ortalama kare süresi 1000/target_fps altında kalacak en küçük K'yı seçer."""
+        if self.inference_ms is None:
+            return
+        budget = 1000.0 / max(1, target_fps)
+        propagate = self.propagate_ms or 0.0
+        if self.inference_ms <= budget:
+            interval = self.settings['MIN_INTERVAL']
+        elif propagate >= budget:
+            interval = self.settings['MAX_INTERVAL']
+        else:
+            # (çıkarım + (K-1) * taşıma) / K <= bütçe
+            interval = int(np.ceil((self.inference_ms - propagate) / (budget - propagate)))
+        self.interval = int(np.clip(interval, self.settings['MIN_INTERVAL'], self.settings['MAX_INTERVAL']))
+
+    @staticmethod
+    def _ema(previous, value, alpha=0.2):
+        return value if previous is None else previous + alpha * (value - previous)
@@ -0,0 +1,234 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+from ..config import YOLO_SETTINGS
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    """Dosyanın SHA1 özetini döndürür."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def estimate_model_bytes(model):
+    """Modelin parametre + buffer boyutunu bayt olarak tahmin eder."""
+    if hasattr(model, 'size_bytes'): # ONNX: dosya boyutu
+        return model.size_bytes
+    inner = getattr(model, 'model', None)
+    if inner is None or not hasattr(inner, 'parameters'):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in inner.parameters())
+    total += sum(b.numel() * b.element_size() for b in inner.buffers())
+    return total
+
+
+class SharedYoloModel:
+    """Kayıt defterinde tutulan, thread'ler arasında paylaşılan bir YOLO modeli.
+
+    Ultralytics predictor'ı çağrılar arasında durum tuttuğu için model
+    çağrıları bir kilitle sıraya sokulur. Nesne modelin kendisi gibi
+    çağrılabilir: shared(frames, verbose=False, device=...).
+    """
+
+    def __init__(self, key, model, load_ms, warmup_ms, size_bytes):
+        self.key = key  # (mutlak_yol, sha1, cihaz, arka_uç, onnx_thread_sayısı, kalibrasyon_videosu)
+        self.model = model
+        self.load_ms = load_ms
+        self.warmup_ms = warmup_ms
+        self.size_bytes = size_bytes
+        self.use_count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.key[0]
+
+    @property
+    def device(self):
+        return self.key[2]
+
+    @property
+    def backend(self):
+        return self.key[3]
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+
+class ModelRegistry:
+    """Süreç genelinde YOLO model önbelleği.
+
+    Modeller (yol, dosya özeti, cihaz, arka uç) anahtarıyla bir kez yüklenip ısıtılır;
+    aynı anahtar tekrar istendiğinde diskten okunmadan paylaşılır. Toplam
+    boyut bütçeyi aşarsa en uzun süredir kullanılmayan modeller bırakılır
+    (hâlâ kullanan işlemciler kendi referanslarıyla çalışmaya devam eder).
+    """
+
+    def __init__(self, memory_budget_mb=1024):
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self._entries = OrderedDict()  # anahtar -> SharedYoloModel (LRU sırası)
+        self._hash_cache = {}          # mutlak_yol -> (mtime, boyut, sha1)
+        self._lock = threading.RLock()
+        self._loading = {}             # anahtar -> threading.Lock (aynı modeli iki kez yükleme)
+        self.logger = logging.getLogger('ModelRegistry')
+
+    def file_hash(self, model_path):
+        """Model dosyasının SHA1 özeti; dosya değişmediyse (mtime/boyut) tekrar okunmaz."""
+        path = os.path.abspath(model_path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._hash_cache.get(path)
+            if cached is None or cached[:2] != (stat.st_mtime, stat.st_size):
+                cached = (stat.st_mtime, stat.st_size, file_sha1(path))
+                self._hash_cache[path] = cached
+            return cached[2]
+
+    def _file_key(self, model_path, device, backend, intra_op_threads, calibration_video):
+        return (os.path.abspath(model_path), self.file_hash(model_path), device, backend, intra_op_threads,
+                calibration_video)
+
+    def get(self, model_path, device='cpu', backend='torch', intra_op_threads=None, calibration_video=None):
+        """Modeli döndürür; önbellekte yoksa yükler ve ısıtır.
+
+        backend 'onnx' ise .pt modelinin ONNX kopyası (gerekirse bir kez
+        dışa aktarılarak) ONNX Runtime CPU sağlayıcısında çalıştırılır;
+        intra_op_threads verilmezse YOLO_SETTINGS'teki değer kullanılır.
+        'onnx-int8' bu kopyanın int8 nicelenmiş halidir; calibration_video
+        verilirse o videodan alınan karelerle statik olarak kalibre edilir.
+        'torchscript', model özeti + torch sürümüyle diskte önbelleklenen
+        TorchScript kopyasını Ultralytics predictor'ı kurmadan çalıştırır.
+        """
+        if backend.startswith('onnx'):
+            device = 'cpu'
+            if intra_op_threads is None:
+                intra_op_threads = YOLO_SETTINGS.get('ONNX_INTRA_OP_THREADS', 0)
+        else:
+            intra_op_threads = None # PyTorch thread sayısı süreç geneli, anahtara girmez
+        if backend != 'onnx-int8':
+            calibration_video = None
+        elif calibration_video:
+            calibration_video = os.path.abspath(calibration_video)
+        with self._lock:
+            key = self._file_key(model_path, device, backend, intra_op_threads, calibration_video)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.use_count += 1
+                return entry
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Yükleme kilit dışında yapılır; aynı anahtarı isteyen diğer thread beklesin
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.use_count += 1
+                    return entry
+            entry = self._load(key)
+            with self._lock:
+                self._entries[key] = entry
+                self._loading.pop(key, None)
+                entry.use_count += 1
+                self._evict(keep=key)
+        return entry
+
+    def _load(self, key):
+        path, file_hash, device, backend, intra_op_threads, calibration_video = key
+        if backend.startswith('onnx'):
+            from .onnx_backend import load_onnx_model
+            model, load_ms = load_onnx_model(
+                path, file_hash, imgsz=YOLO_SETTINGS.get('ONNX_IMGSZ', 640),
+                intra_op_threads=intra_op_threads, quantized=backend == 'onnx-int8',
+                calibration_video=calibration_video,
+                calibration_frames=YOLO_SETTINGS.get('INT8_CALIBRATION_FRAMES', 64))
+        elif backend == 'torchscript':
+            from .compiled_cache import load_torchscript_model
+            model, load_ms = load_torchscript_model(
+                path, file_hash, imgsz=YOLO_SETTINGS.get('TORCHSCRIPT_IMGSZ', 640), device=device)
+        else:
+            from ultralytics import YOLO
+            load_start = time.perf_counter()
+            model = YOLO(path)
+            load_ms = (time.perf_counter() - load_start) * 1000
+
+        # İlk çıkarım ağırlıkları cihaza taşır ve predictor'ı kurar
+        warmup_start = time.perf_counter()
+        model(np.zeros((64, 64, 3), dtype=np.uint8), device=device, verbose=False)
+        warmup_ms = (time.perf_counter() - warmup_start) * 1000
+
+        entry = SharedYoloModel(key, model, load_ms, warmup_ms, estimate_model_bytes(model))
+        self.logger.info(f"Model yüklendi: {path} ({backend}, {device}) - yükleme {load_ms:.1f} ms, "
+                         f"ısınma {warmup_ms:.1f} ms, {entry.size_bytes / 1e6:.1f} MB")
+        return entry
+
+    def _evict(self, keep):
+        total = sum(e.size_bytes for e in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            if key == keep:
+                continue
+            evicted = self._entries.pop(key)
+            total -= evicted.size_bytes
+            self.logger.info(f"Model önbellekten çıkarıldı: {evicted.path} ({evicted.backend}, {evicted.device})")
+
+    def prewarm(self, model_path, device='cpu', backend='torch', intra_op_threads=None):
+        """Modeli arka plan thread'inde yükleyip ısıtır; thread'i döndürür.
+
+        Aynı modeli daha sonra isteyen get() çağrısı yükleme bitene kadar
+        bekler ve hazır modeli alır.
+        """
+        def _run():
+            try:
+                entry = self.get(model_path, device, backend=backend, intra_op_threads=intra_op_threads)
+                with self._lock:
+                    entry.use_count -= 1 # Ön ısıtma bir kullanım sayılmaz
+            except Exception as e:
+                self.logger.warning(f"Model ön ısıtması başarısız ({model_path}): {e}")
+
+        thread = threading.Thread(target=_run, name='ModelPrewarm', daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Önbellekteki modellerin yükleme/ısınma sürelerini ve boyutlarını döndürür."""
+        with self._lock:
+            return [{
+                'path': entry.path,
+                'device': entry.device,
+                'backend': entry.backend,
+                'sha1': entry.key[1],
+                'load_ms': round(entry.load_ms, 3),
+                'warmup_ms': round(entry.warmup_ms, 3),
+                'size_mb': round(entry.size_bytes / 1e6, 3),
+                'use_count': entry.use_count,
+            } for entry in self._entries.values()]
+
+
+def get_model_registry():
+    """Süreç genelinde paylaşılan model kayıt defterini döndürür."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(YOLO_SETTINGS.get('MODEL_CACHE_BUDGET_MB', 1024))
+        return _registry
@@ -0,0 +1,244 @@
+import os
+import ast
+import time
+import hashlib
+import logging
+import cv2
+import numpy as np
+
+# --- ONNX Runtime gerektirir ---
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    CalibrationDataReader = object
+    ONNXRUNTIME_AVAILABLE = False
+# --- ---
+
+LETTERBOX_COLOR = (114, 114, 114) # Ultralytics ile aynı dolgu rengi
+
+logger = logging.getLogger('OnnxBackend')
+
+
+def onnx_artifact_path(model_path, file_hash):
+    """.pt modelinin ONNX kopyasının yolu: model ile aynı klasörde, özetle etiketli."""
+    stem = os.path.splitext(os.path.abspath(model_path))[0]
+    return f"{stem}.{file_hash[:12]}.onnx"
+
+
+def video_tag(video_path):
+    """Kalibrasyon videosu için kısa etiket (dosya adı + boyut özeti)."""
+    identity = f"{os.path.basename(video_path)}|{os.path.getsize(video_path)}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:8]
+
+
+def int8_artifact_path(model_path, file_hash, calibration_video=None):
+    """int8 kopyanın yolu; videoyla kalibre edilmiş (statik) kopyalar video etiketini taşır."""
+    stem = os.path.splitext(os.path.abspath(model_path))[0]
+    suffix = f"int8-{video_tag(calibration_video)}" if calibration_video else "int8"
+    return f"{stem}.{file_hash[:12]}.{suffix}.onnx"
+
+
+def export_onnx(model_path, artifact_path, imgsz=640):
+    """.pt modelini dinamik batch destekli ONNX olarak dışa aktarır (bir kez)."""
+    from ultralytics import YOLO
+    logger.info(f"ONNX dışa aktarımı: {model_path} -> {artifact_path}")
+    exported = YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=True,
+                                       simplify=False, verbose=False)
+    os.replace(exported, artifact_path)
+    return artifact_path
+
+
+def letterbox(frame, imgsz, stride=32, auto=True):
+    """Kareyi oranı koruyarak en uzun kenarı imgsz olacak şekilde ölçekler.
+
+    auto=True ise kenarlar stride katına tamamlanır (Ultralytics'in dikdörtgen
+    çıkarımı gibi), böylece 16:9 karelerde boş dolgu satırlarına çıkarım
+    yapılmaz; False ise imgsz x imgsz kareye doldurulur (farklı boyutlu
+    girişleri aynı batch'e koymak için). (görüntü, ölçek, (sol, üst)) döndürür.
+    """
+    h, w = frame.shape[:2]
+    gain = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    if auto:
+        pad_x, pad_y = (-new_w % stride) / 2, (-new_h % stride) / 2
+    else:
+        pad_x, pad_y = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return frame, gain, (left, top)
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """Statik niceleme için kareleri çıkarımla aynı ön işlemeden geçirip tek tek verir."""
+
+    def __init__(self, input_name, frames, imgsz):
+        self._inputs = iter(
+            {input_name: cv2.dnn.blobFromImage(letterbox(frame, imgsz)[0], scalefactor=1.0 / 255, swapRB=True)}
+            for frame in frames)
+
+    def get_next(self):
+        return next(self._inputs, None)
+
+
+def _detect_head_nodes(float_path):
+    """Çıkışı üreten modülün (Detect başlığı) düğüm adları.
+
+    Kutu koordinatları ve sınıf skorları tek bir tensörde birleştiği için
+    başlık nicelenirse düşük skorlar sıfıra yuvarlanır; başlık float kalır.
+    """
+    try:
+        import onnx
+    except ImportError:
+        raise ImportError("int8 niceleme için onnx gerekli.") from None
+    graph = onnx.load(float_path).graph
+    outputs = {o.name for o in graph.output}
+    producer = next(n.name for n in graph.node if outputs.intersection(n.output))
+    prefix = '/'.join(producer.split('/')[:2]) + '/' # örn. '/model.22/'
+    return [n.name for n in graph.node if n.name.startswith(prefix)]
+
+
+def quantize_onnx(float_path, int8_path, calibration_frames=None, imgsz=640):
+    """Float ONNX modelinden int8 kopya üretir.
+
+    Kalibrasyon kareleri verilirse statik niceleme (QDQ, kanal bazında ağırlık,
+    aktivasyon aralıkları karelerden), verilmezse yalnızca ağırlıkların
+    nicelendiği dinamik niceleme yapılır. Detect başlığı her iki durumda da
+    float kalır.
+    """
+    from onnxruntime.quantization import quantize_dynamic, quantize_static, QuantFormat, QuantType
+    tmp_path = int8_path + '.tmp'
+    head_nodes = _detect_head_nodes(float_path)
+    if calibration_frames:
+        logger.info(f"Statik int8 niceleme ({len(calibration_frames)} kalibrasyon karesi): {int8_path}")
+        input_name = ort.InferenceSession(float_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        quantize_static(float_path, tmp_path, FrameCalibrationReader(input_name, calibration_frames, imgsz),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                        nodes_to_exclude=head_nodes)
+    else:
+        logger.info(f"Dinamik int8 niceleme: {int8_path}")
+        quantize_dynamic(float_path, tmp_path, weight_type=QuantType.QUInt8, nodes_to_exclude=head_nodes)
+    os.replace(tmp_path, int8_path)
+    return int8_path
+
+
+class OnnxBoxes:
+    """Ultralytics Boxes nesnesinin kullandığımız kısmı (data, xyxy, conf, cls), NumPy dizileri."""
+
+    def __init__(self, xyxy, conf, cls):
+        self.data = np.concatenate([xyxy, conf[:, None], cls[:, None]], axis=1).astype(np.float32)
+        self.xyxy = self.data[:, :4]
+        self.conf = self.data[:, 4]
+        self.cls = self.data[:, 5]
+
+    def __len__(self):
+        return len(self.conf)
+
+
+class OnnxResult:
+    def __init__(self, boxes, names, orig_shape):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+
+
+class ExportedYoloModel:
+    """Dışa aktarılmış (ONNX, TorchScript) YOLO modelleri için ortak ön/son işleme.
+
+    Ultralytics modeli gibi çağrılır (tek kare veya kare listesi) ve aynı
+    ayrıştırma kodunun kullanabileceği .boxes alanlı sonuçlar döndürür.
+    Alt sınıflar _forward(blob, imgsz) ile ham çıktıyı (B, 4 + sınıf, aday) üretir.
+    """
+    dynamic_shape = True # False: girişler her zaman imgsz x imgsz kareye doldurulur
+
+    def __call__(self, source, conf=0.25, iou=0.7, classes=None, max_det=300, imgsz=None, **kwargs):
+        # device/verbose gibi Ultralytics argümanları burada anlamsız, yok sayılır
+        frames = source if isinstance(source, (list, tuple)) else [source]
+        imgsz = imgsz or self.imgsz
+        same_shape = self.dynamic_shape and len({frame.shape for frame in frames}) == 1
+        prepared = [letterbox(frame, imgsz, auto=same_shape) for frame in frames]
+        blob = cv2.dnn.blobFromImages([p[0] for p in prepared], scalefactor=1.0 / 255, swapRB=True)
+        output = self._forward(blob, imgsz) # (B, 4 + sınıf, aday)
+        return [self._postprocess(pred.T, frame.shape, gain, pad, conf, iou, classes, max_det)
+                for pred, frame, (_, gain, pad) in zip(output, frames, prepared)]
+
+    def _forward(self, blob, imgsz):
+        raise NotImplementedError
+
+    def _postprocess(self, pred, orig_shape, gain, pad, conf, iou, classes, max_det):
+        scores_all = pred[:, 4:]
+        cls_ids = scores_all.argmax(axis=1)
+        scores = scores_all[np.arange(len(pred)), cls_ids]
+        keep = scores > conf
+        if classes is not None:
+            keep &= np.isin(cls_ids, classes)
+        boxes, scores, cls_ids = pred[keep, :4], scores[keep], cls_ids[keep]
+
+        if len(scores):
+            # cx, cy, w, h -> x, y, w, h (NMS için) ve sınıf bazında NMS
+            xywh = boxes.copy()
+            xywh[:, :2] -= xywh[:, 2:] / 2
+            idx = cv2.dnn.NMSBoxesBatched(xywh.tolist(), scores.tolist(), cls_ids.tolist(), conf, iou)
+            idx = np.asarray(idx, dtype=np.int64).reshape(-1)[:max_det]
+            xywh, scores, cls_ids = xywh[idx], scores[idx], cls_ids[idx]
+            xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+            # Letterbox koordinatlarından orijinal kareye
+            xyxy -= np.array([pad[0], pad[1], pad[0], pad[1]], dtype=np.float32)
+            xyxy /= gain
+            xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, orig_shape[1])
+            xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, orig_shape[0])
+        else:
+            xyxy = np.zeros((0, 4), dtype=np.float32)
+        return OnnxResult(OnnxBoxes(xyxy, scores.astype(np.float32), cls_ids.astype(np.float32)),
+                          self.names, orig_shape[:2])
+
+
+class OnnxYoloModel(ExportedYoloModel):
+    """ONNX Runtime CPU sağlayıcısıyla çalışan YOLO modeli."""
+
+    def __init__(self, onnx_path, imgsz=640, intra_op_threads=0):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise RuntimeError("onnxruntime kütüphanesi bulunamadı.")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads # 0: ONNX Runtime varsayılanı
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.onnx_path = onnx_path
+        self.imgsz = imgsz
+        self.size_bytes = os.path.getsize(onnx_path)
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+
+    def _forward(self, blob, imgsz):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+def load_onnx_model(model_path, file_hash, imgsz=640, intra_op_threads=0, quantized=False,
+                    calibration_video=None, calibration_frames=64):
+    """ONNX kopyası yoksa bir kez oluşturur ve oturumu açar; (model, süre_ms) döndürür.
+
+    quantized=True ise int8 kopya kullanılır; diskte yoksa calibration_video
+    üzerinden eşit aralıklı calibration_frames kareyle (video yoksa dinamik)
+    bir kez üretilir.
+    """
+    load_start = time.perf_counter()
+    artifact_path = onnx_artifact_path(model_path, file_hash)
+    if not os.path.exists(artifact_path):
+        export_onnx(model_path, artifact_path, imgsz)
+    if quantized:
+        float_path = artifact_path
+        artifact_path = int8_artifact_path(model_path, file_hash, calibration_video)
+        if not os.path.exists(artifact_path):
+            from .yolo_batching import sample_frames
+            frames = sample_frames(calibration_video, calibration_frames) if calibration_video else None
+            quantize_onnx(float_path, artifact_path, frames, imgsz)
+    model = OnnxYoloModel(artifact_path, imgsz=imgsz, intra_op_threads=intra_op_threads)
+    return model, (time.perf_counter() - load_start) * 1000
@@ -0,0 +1,232 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import cv2
+from .results_store import ResultsStore
+from ..config import PARALLEL_TEST_SETTINGS, YOLO_SETTINGS
+
+logger = logging.getLogger('ParallelTest')
+
+# --- İşçi süreci durumu (initializer ile kurulur) ---
+_chunk_progress = None # Parça başına işlenen kare sayısı (paylaşılan dizi)
+_cancel_event = None
+
+
+def limit_library_threads():
+    """OpenCV ve torch thread havuzlarını tek thread'e indirir.
+
+    Süreç havuzlarında işçiler zaten paralel çalışır; aksi halde N süreç x
+    M thread çekirdekler için yarışır.
+    """
+    cv2.setNumThreads(1)
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _init_chunk_worker(progress, cancel_event):
+    """Havuzdaki her süreç başlarken bir kez çağrılır."""
+    global _chunk_progress, _cancel_event
+    _chunk_progress = progress
+    _cancel_event = cancel_event
+    limit_library_threads()
+
+
+def split_chunks(start_frame, end_frame, chunk_frames=None):
+    """[start_frame, end_frame) aralığını sabit boyutlu ardışık parçalara böler.
+
+    Parça boyutu işçi sayısından bağımsızdır; böylece aynı aralık her
+    makinede aynı parçalara bölünür ve sonuçlar işçi sayısına bağlı olmaz.
+    """
+    chunk_frames = max(1, chunk_frames or PARALLEL_TEST_SETTINGS['CHUNK_FRAMES'])
+    return [(s, min(s + chunk_frames, end_frame)) for s in range(start_frame, end_frame, chunk_frames)]
+
+
+def run_test_chunk(task):
+    """Tek parçayı kendi VideoCapture'ı ile işler.
+
+    (parça_no, ResultsStore, işlenen_kare, tamamlandı) döndürür; iptalle
+    yarıda kalan parçada tamamlandı False'tur.
+
+    Durumlu dedektörlerde (OpenCV, Hibrit) lazer modu geçmişinin oluşması
+    için parça başından WARMUP_FRAMES kare önce başlanır; bu ısınma
+    karelerinin tespitleri atılır. Hibrit dedektörün tam kare aralığı test
+    aralığının başına göre hizalanır. task['cache_config'] verilirse kare
+    sonuçları sonuç önbelleğinden okunur/yazılır.
+    """
+    # Döngüsel içe aktarmayı önlemek için süreç içinde
+    from .test_processor import timed_yolo_stores, detect_into_store, YOLO_DEVICE_TEST, YOLO_CLASS_MAP_TEST
+    from .result_cache import open_cache_session, detect_frame_cached, infer_batch_cached
+    from .detector import BalloonDetector
+    from .hybrid_detector import HybridDetector
+    from .model_registry import get_model_registry
+    from .yolo_results import predict_filter_kwargs
+
+    index = task['index']
+    chunk_start, chunk_end = task['chunk']
+    detector_type = task['detector_type']
+    is_hybrid = "Hibrit" in detector_type
+    is_yolo = "YOLO" in detector_type and not is_hybrid
+
+    def load_model():
+        return get_model_registry().get(task['yolo_model_path'], YOLO_DEVICE_TEST, backend=task['backend'],
+                                        calibration_video=task['video_path'])
+
+    model = detector = None # YOLO modeli önbellekte olmayan ilk karede yüklenir
+    if is_hybrid:
+        model = load_model()
+        detector = HybridDetector(model, YOLO_CLASS_MAP_TEST, device=YOLO_DEVICE_TEST)
+    elif not is_yolo:
+        detector = BalloonDetector()
+
+    decode_start = chunk_start if is_yolo else max(task['range_start'], chunk_start - task['warmup_frames'])
+    if is_hybrid:
+        detector.frame_index = decode_start - task['range_start']
+
+    store = ResultsStore()
+    processed = 0
+    session = open_cache_session(task['video_path'], task['cache_config']) if task.get('cache_config') else None
+    if session:
+        # Önbellekte kesintisiz duran kareler video çözülmeden alınır
+        cached, decode_start, state = session.prefix(decode_start, chunk_end,
+                                                     detector.get_state() if detector else None)
+        if detector is not None and cached:
+            detector.set_state(state)
+        for frame_num, frame_results in cached:
+            if frame_num >= chunk_start: # Isınma karelerinin sonuçları atılır
+                store.extend(frame_results)
+                processed += 1
+
+    cap = cv2.VideoCapture(task['video_path'])
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {task['video_path']}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, decode_start)
+
+    batch = []
+    predict_kwargs = predict_filter_kwargs()
+    detector_name = 'hybrid' if is_hybrid else 'opencv'
+
+    def infer(items):
+        nonlocal model
+        if model is None:
+            model = load_model()
+        return timed_yolo_stores(items, lambda batch_items: model([f for _, f in batch_items], device=YOLO_DEVICE_TEST,
+                                                                  verbose=False, **predict_kwargs))
+
+    complete = True
+    try:
+        for frame_num in range(decode_start, chunk_end):
+            if _cancel_event is not None and _cancel_event.is_set():
+                complete = False
+                break
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                break
+            if is_yolo:
+                batch.append((frame_num, frame))
+                if len(batch) < task['batch_size'] and frame_num + 1 < chunk_end:
+                    continue
+                for frame_results in infer_batch_cached(session, batch, infer):
+                    store.extend(frame_results)
+                processed += len(batch)
+                batch = []
+            else:
+                frame_results = detect_frame_cached(
+                    session, detector, frame_num,
+                    lambda out: detect_into_store(out, detector, frame_num, frame, task['hsv_values'], detector_name))
+                if frame_num < chunk_start:
+                    continue # Isınma karesi: sadece dedektör durumu için
+                store.extend(frame_results)
+                processed += 1
+            if _chunk_progress is not None:
+                _chunk_progress[index] = processed
+    finally:
+        cap.release()
+        if session:
+            session.close()
+    return index, store, processed, complete
+
+
+def effective_workers(frame_count):
+    """Aralık için kullanılacak süreç sayısı (1: sıralı işleme)."""
+    workers = PARALLEL_TEST_SETTINGS.get('WORKERS') or os.cpu_count() or 1
+    chunks = -(-frame_count // max(1, PARALLEL_TEST_SETTINGS['CHUNK_FRAMES']))
+    return max(1, min(workers, chunks))
+
+
+class ParallelTestRunner:
+    """Test aralığını parçalara bölüp bir süreç havuzunda işler.
+
+    Her parça kendi VideoCapture'ı ile kendi başlangıcına konumlanır; sonuçlar
+    parça sırasıyla (dolayısıyla kare sırasıyla) birleştirilir. İlerleme tüm
+    parçaların işlenen kare sayısının toplamıdır; iptal tüm süreçlere
+    paylaşılan bir olayla iletilir.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        # Qt/torch thread'leri olan süreçten fork güvenli değil; spawn kullanılır
+        self._context = multiprocessing.get_context('spawn')
+        self._cancel_event = self._context.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def run(self, base_task, start_frame, end_frame, progress_callback=None, chunk_callback=None,
+            done_chunks=None, chunk_done_callback=None, poll_interval=0.2):
+        """Tüm parçaları işler; kare sırasıyla birleşik ResultsStore döndürür.
+
+        progress_callback(işlenen_kare) periyodik olarak ana tarafta çağrılır.
+        chunk_callback(parça_sonuçları), önündeki parçalar bittiği anda parça
+        sırasıyla çağrılır (akışlı dışa aktarma için). done_chunks
+        {parça_no: (sonuçlar, işlenen_kare)} önceden bitmiş parçalardır ve
+        tekrar işlenmez; chunk_done_callback(parça_no, sonuçlar, işlenen_kare)
+        her parça tamamlandığında çağrılır (kontrol noktası için).
+        """
+        chunks = split_chunks(start_frame, end_frame)
+        done_chunks = done_chunks or {}
+        progress = self._context.Array('i', len(chunks), lock=False)
+        tasks = [dict(base_task, index=i, chunk=chunk, range_start=start_frame,
+                      warmup_frames=PARALLEL_TEST_SETTINGS['WARMUP_FRAMES'],
+                      batch_size=base_task.get('batch_size') or YOLO_SETTINGS['TEST_BATCH_SIZE'])
+                 for i, chunk in enumerate(chunks) if i not in done_chunks]
+        logger.info(f"Paralel test: {len(chunks)} parça ({len(done_chunks)} önceden bitmiş), {self.workers} süreç")
+
+        chunk_rows = {}
+        for index, (store, processed) in done_chunks.items():
+            chunk_rows[index] = store
+            progress[index] = processed
+        next_chunk = 0 # chunk_callback'e verilecek sıradaki parça
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                 initializer=_init_chunk_worker,
+                                 initargs=(progress, self._cancel_event)) as executor:
+            pending = {executor.submit(run_test_chunk, task) for task in tasks}
+            while True:
+                done = set()
+                if pending:
+                    done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    index, store, processed, complete = future.result()
+                    chunk_rows[index] = store
+                    progress[index] = processed
+                    if complete and chunk_done_callback:
+                        chunk_done_callback(index, store, processed)
+                while chunk_callback and next_chunk in chunk_rows:
+                    chunk_callback(chunk_rows[next_chunk])
+                    next_chunk += 1
+                if progress_callback:
+                    progress_callback(sum(progress))
+                if not pending:
+                    break
+                if self._cancel_event.is_set():
+                    for future in pending:
+                        future.cancel() # Henüz başlamamış parçalar hiç çalışmasın
+        results = ResultsStore(capacity=max(1, sum(len(store) for store in chunk_rows.values())))
+        for index in sorted(chunk_rows):
+            results.extend(chunk_rows[index])
+        return results
@@ -0,0 +1,354 @@
+import io
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import numpy as np
+from .model_registry import file_sha1
+from .results_store import ResultsStore
+from ..config import RESULT_CACHE_SETTINGS
+
+logger = logging.getLogger('ResultCache')
+
+CACHE_VERSION = 3 # Girdi biçimi değişince artırılır; eski girdiler eşleşmez ve zamanla silinir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    path TEXT PRIMARY KEY, mtime REAL, size INTEGER, sha1 TEXT);
+CREATE TABLE IF NOT EXISTS configs (
+    config_key TEXT PRIMARY KEY, video_sha1 TEXT, video_path TEXT, detector_type TEXT,
+    description TEXT, created REAL);
+CREATE TABLE IF NOT EXISTS frames (
+    config_key TEXT, frame INTEGER, state_hash TEXT, data BLOB, size INTEGER, last_used REAL,
+    PRIMARY KEY (config_key, frame, state_hash));
+CREATE INDEX IF NOT EXISTS frames_last_used ON frames (last_used);
+"""
+
+
+def state_hash(state):
+    """Dedektör durumunun özeti (durumsuz dedektörde boş metin)."""
+    if state is None:
+        return ''
+    return hashlib.sha1(json.dumps(state, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _pack(arrays, names):
+    """Aynı uzunluktaki sütunları tek bir yapılı diziye toplar (npz'de üye başına ek yük olmasın)."""
+    packed = np.empty(len(arrays[names[0]]), dtype=[(name, arrays[name].dtype) for name in names])
+    for name in names:
+        packed[name] = arrays[name]
+    return packed
+
+
+def _encode_entry(frame_results, state_after):
+    """Kare sonucunu npz baytlarına çevirir; ad listeleri ve sonraki durum JSON olarak eklenir."""
+    arrays = frame_results.to_arrays()
+    log_names = [name for name in arrays if name.startswith('log_')]
+    meta = {'color_names': frame_results.color_names, 'detector_names': frame_results.detector_names,
+            'integer_boxes': frame_results.integer_boxes, 'state_after': state_after}
+    buffer = io.BytesIO()
+    np.savez(buffer, meta=np.array(json.dumps(meta)),
+             rows=_pack(arrays, [name for name in arrays if name not in log_names]),
+             frames=_pack(arrays, log_names))
+    return buffer.getvalue()
+
+
+def _decode_entry(data):
+    """_encode_entry'nin tersi; (kare_sonuçları, sonraki_durum) döndürür."""
+    with np.load(io.BytesIO(data), allow_pickle=False) as entry:
+        meta = json.loads(str(entry['meta']))
+        arrays = {}
+        for key in ('rows', 'frames'):
+            packed = entry[key]
+            arrays.update((name, packed[name]) for name in packed.dtype.names)
+    frame_results = ResultsStore.from_arrays(arrays, meta['color_names'], meta['detector_names'],
+                                             meta['integer_boxes'])
+    return frame_results, meta['state_after']
+
+
+class ResultCache:
+    """Kare başına tespit sonuçlarını içerik adresli olarak saklayan kalıcı önbellek (SQLite).
+
+    Anahtar: video içeriğinin SHA1'i + yapılandırma özeti (dedektör türü,
+    HSV değerleri veya model özeti, ilgili ayarlar) + kare numarası +
+    karenin başındaki dedektör durumunun özeti. Durumlu dedektörlerde (lazer
+    modu geçmişi) aynı kare farklı durumla başka bir girdi olur; böylece
+    önbellekten okunan her sonuç hesaplansaydı çıkacak sonuçla aynıdır.
+    Toplam boyut MAX_BYTES'ı aşınca en uzun süredir kullanılmayan kareler
+    silinir. Bağlantı, onu oluşturan thread'de kullanılmalıdır.
+
+    Paralel testte her parça süreci aynı dosyaya yazar; WAL kipinde okuyucular
+    yazarı beklemez. Okuma/yazma hatasında (örn. kilit zaman aşımı) önbellek
+    bu bağlantı için devre dışı kalır, test önbelleksiz sürer.
+
+    Girdiler pickle yerine sütun dizileri (npz) ve JSON olarak saklanır;
+    başka makineden kopyalanan bir önbellek dosyası okunurken kod çalıştırmaz
+    ve biçim ResultsStore'un iç alanlarına bağlı değildir.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or RESULT_CACHE_SETTINGS['PATH']
+        self.max_bytes = max_bytes or RESULT_CACHE_SETTINGS['MAX_BYTES']
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._touched = [] # (last_used, config_key, frame, state_hash), commit'te yazılır
+        self.disabled = False # Bir okuma/yazma hatasından sonra True (önbelleksiz devam)
+
+    def _disable(self, error):
+        """Önbelleği bu bağlantı için kapatır; hata bir kez loglanır."""
+        if self.disabled:
+            return
+        logger.warning(f"Sonuç önbelleği devre dışı bırakıldı, test önbelleksiz sürüyor: {error}")
+        self.disabled = True
+        self._touched = []
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        self.commit()
+        if not self.disabled:
+            try:
+                self.evict()
+            except sqlite3.Error as e:
+                self._disable(e)
+        self._conn.close()
+
+    def commit(self):
+        if self.disabled:
+            return
+        try:
+            if self._touched:
+                self._conn.executemany("UPDATE frames SET last_used = ? WHERE config_key = ? AND frame = ? "
+                                       "AND state_hash = ?", self._touched)
+                self._touched = []
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def video_hash(self, video_path):
+        """Video dosyasının SHA1'i; dosya değişmediyse (mtime/boyut) tekrar okunmaz."""
+        path = os.path.abspath(video_path)
+        stat = os.stat(path)
+        row = self._conn.execute("SELECT mtime, size, sha1 FROM videos WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return row[2]
+        sha1 = file_sha1(path)
+        self._conn.execute("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?)", (path, stat.st_mtime, stat.st_size, sha1))
+        self._conn.commit()
+        return sha1
+
+    def register(self, video_path, config):
+        """Video + yapılandırma için önbellek anahtarını döndürür (ilk kullanımda kaydeder)."""
+        video_sha1 = self.video_hash(video_path)
+        description = json.dumps(config, sort_keys=True, default=str)
+        config_key = hashlib.sha1(f"{CACHE_VERSION}:{video_sha1}:{description}".encode('utf-8')).hexdigest()
+        self._conn.execute("INSERT OR IGNORE INTO configs VALUES (?, ?, ?, ?, ?, ?)",
+                           (config_key, video_sha1, os.path.abspath(video_path), config.get('detector_type'),
+                            description, time.time()))
+        self._conn.commit()
+        return config_key
+
+    def get(self, config_key, frame_num, state=None):
+        """(kare_sonuçları, sonraki_durum) veya önbellekte yoksa None döndürür.
+
+        Okunan karelerin kayıtlı süreleri silinir (NaN); rapor yüzdelikleri
+        yalnızca bu çalışmada ölçülen kareleri kullanır.
+        """
+        if self.disabled:
+            return None
+        s_hash = state_hash(state)
+        try:
+            row = self._conn.execute("SELECT data FROM frames WHERE config_key = ? AND frame = ? AND state_hash = ?",
+                                     (config_key, frame_num, s_hash)).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+        if row is None:
+            return None
+        try:
+            frame_results, state_after = _decode_entry(row[0])
+        except Exception as e:
+            logger.warning(f"Sonuç önbelleği: bozuk girdi yok sayıldı (kare {frame_num}): {e}")
+            return None
+        self._touched.append((time.time(), config_key, frame_num, s_hash))
+        frame_results.clear_timings()
+        return frame_results, state_after
+
+    def put(self, config_key, frame_num, state, frame_results, state_after):
+        if self.disabled:
+            return
+        data = _encode_entry(frame_results, state_after)
+        try:
+            self._conn.execute("INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?, ?)",
+                               (config_key, frame_num, state_hash(state), data, len(data), time.time()))
+        except sqlite3.Error as e:
+            self._disable(e)
+
+    def total_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM frames").fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """Toplam boyut sınırın altına inene kadar en eski kullanılan kareleri siler; silinen bayt."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.total_bytes() - max_bytes
+        if excess <= 0:
+            return 0
+        removed = 0
+        rows = self._conn.execute("SELECT rowid, size FROM frames ORDER BY last_used")
+        victims = []
+        for rowid, size in rows:
+            if removed >= excess:
+                break
+            victims.append((rowid,))
+            removed += size
+        self._conn.executemany("DELETE FROM frames WHERE rowid = ?", victims)
+        self._drop_empty_configs()
+        self._conn.commit()
+        logger.info(f"Sonuç önbelleği: {len(victims)} kare silindi ({removed / 1e6:.1f} MB)")
+        return removed
+
+    def _drop_empty_configs(self):
+        self._conn.execute("DELETE FROM configs WHERE config_key NOT IN (SELECT DISTINCT config_key FROM frames)")
+
+    def summary(self):
+        """Yapılandırma başına kare sayısı, boyut ve son kullanım (inceleme için)."""
+        rows = self._conn.execute(
+            "SELECT c.config_key, c.video_path, c.detector_type, c.description, COUNT(f.frame), "
+            "COALESCE(SUM(f.size), 0), MIN(f.frame), MAX(f.frame), MAX(f.last_used) "
+            "FROM configs c LEFT JOIN frames f ON f.config_key = c.config_key "
+            "GROUP BY c.config_key ORDER BY MAX(f.last_used) DESC")
+        return [{
+            'config_key': key, 'video_path': video_path, 'detector_type': detector_type,
+            'config': json.loads(description), 'frames': frames, 'bytes': size,
+            'first_frame': first, 'last_frame': last, 'last_used': last_used,
+        } for key, video_path, detector_type, description, frames, size, first, last, last_used in rows]
+
+    def purge(self, config_key=None, video_path=None, older_than_s=None):
+        """Koşullara uyan kareleri siler (koşul yoksa hepsini); silinen kare sayısı."""
+        clauses, params = [], []
+        if config_key:
+            clauses.append("config_key LIKE ?")
+            params.append(config_key + '%')
+        if video_path:
+            clauses.append("config_key IN (SELECT config_key FROM configs WHERE video_path = ?)")
+            params.append(os.path.abspath(video_path))
+        if older_than_s is not None:
+            clauses.append("last_used < ?")
+            params.append(time.time() - older_than_s)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        count = self._conn.execute(f"DELETE FROM frames{where}", params).rowcount
+        self._drop_empty_configs()
+        self._conn.commit()
+        self._conn.execute("VACUUM")
+        return count
+
+
+class FrameCacheSession:
+    """Tek bir test çalışmasının (sabit video + yapılandırma) önbellek erişimi."""
+
+    def __init__(self, cache, config_key):
+        self.cache = cache
+        self.config_key = config_key
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+
+    def lookup(self, frame_num, state=None):
+        hit = self.cache.get(self.config_key, frame_num, state)
+        if hit is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return hit
+
+    def put(self, frame_num, state, frame_results, state_after=None):
+        self.cache.put(self.config_key, frame_num, state, frame_results, state_after)
+        self._pending += 1
+        if self._pending >= RESULT_CACHE_SETTINGS['COMMIT_FRAMES']:
+            self.cache.commit()
+            self._pending = 0
+
+    def prefix(self, start_frame, end_frame, state=None):
+        """start_frame'den itibaren kesintisiz önbellekteki kareleri okur (video çözülmeden).
+
+        Durumlu dedektörde her karenin sonraki durumu bir sonraki karenin
+        anahtarıdır. [(kare_no, sonuçlar), ...], ilk eksik kare ve o karedeki
+        durum döndürülür.
+        """
+        frames = []
+        frame_num = start_frame
+        while frame_num < end_frame:
+            hit = self.cache.get(self.config_key, frame_num, state)
+            if hit is None:
+                break
+            frame_results, state = hit
+            frames.append((frame_num, frame_results))
+            frame_num += 1
+        self.hits += len(frames)
+        return frames, frame_num, state
+
+    def close(self):
+        self.cache.close()
+        if self.hits or self.misses:
+            logger.info(f"Sonuç önbelleği: {self.hits} kare önbellekten, {self.misses} kare hesaplandı")
+
+
+def open_cache_session(video_path, config):
+    """Önbellek açıksa oturum döndürür; kapalıysa veya açılamazsa None."""
+    if not RESULT_CACHE_SETTINGS['ENABLED']:
+        return None
+    try:
+        cache = ResultCache()
+        return FrameCacheSession(cache, cache.register(video_path, config))
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Sonuç önbelleği açılamadı: {e}")
+        return None
+
+
+def detect_frame_cached(session, detector, frame_num, detect_fn):
+    """Durumlu dedektör için tek kare: önbellekte varsa okur, yoksa detect_fn ile hesaplar.
+
+    detect_fn(kare_sonuçları) tespitleri verilen ResultsStore'a ekler.
+    Kare sonuçları (ResultsStore) döndürülür; dedektör durumu her iki
+    durumda da karenin sonrasına ilerler.
+    """
+    state = detector.get_state() if session else None
+    if session:
+        hit = session.lookup(frame_num, state)
+        if hit is not None:
+            frame_results, state_after = hit
+            detector.set_state(state_after)
+            return frame_results
+    frame_results = ResultsStore(capacity=8)
+    detect_fn(frame_results)
+    if session:
+        session.put(frame_num, state, frame_results, detector.get_state())
+    return frame_results
+
+
+def infer_batch_cached(session, items, infer_fn):
+    """Durumsuz (YOLO) batch: yalnızca önbellekte olmayan kareler infer_fn'e verilir.
+
+    infer_fn([(kare_no, kare), ...]) -> [(kare_no, kare_sonuçları), ...].
+    Kare sırasıyla kare sonuçları listesi döndürülür.
+    """
+    by_frame = {}
+    missing = []
+    for frame_num, frame in items:
+        hit = session.lookup(frame_num) if session else None
+        if hit is None:
+            missing.append((frame_num, frame))
+        else:
+            by_frame[frame_num] = hit[0]
+    if missing:
+        for frame_num, frame_results in infer_fn(missing):
+            by_frame[frame_num] = frame_results
+            if session:
+                session.put(frame_num, None, frame_results)
+    return [by_frame[frame_num] for frame_num, _ in items]
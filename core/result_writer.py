@@ -0,0 +1,134 @@
+import os
+import queue
+import logging
+import threading
+import pandas as pd
+from .results_store import EXPORT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def format_export_frame(df):
+    """Dışa aktarılacak DataFrame'i test modunun CSV biçimine getirir (güven 3 basamak)."""
+    if 'confidence' in df.columns:
+        df = df.assign(confidence=pd.to_numeric(df['confidence'], errors='coerce').round(3))
+    return df
+
+
+def stream_format(output_path):
+    """Dosya uzantısına göre akış biçimi: 'parquet' veya 'csv'."""
+    return 'parquet' if output_path.lower().endswith('.parquet') else 'csv'
+
+
+class StreamingResultWriter:
+    """Test sonuç parçalarını çalışma sırasında arka plan thread'inde diske yazar.
+
+    write() DataFrame parçasını sınırlı bir kuyruğa koyar; kuyruk doluysa
+    yazıcı yetişene kadar bekler (bellekte en fazla max_pending parça
+    bekler). CSV'de ilk parça başlığı yazar, sonrakiler eklenir; Parquet'te
+    her parça ayrı bir satır grubudur. Dosya geçici adla yazılır ve close()
+    ile hedef adına taşınır; iptal veya çökmede o ana kadar yazılanlar
+    '<hedef>.partial' dosyasında kalır.
+    """
+
+    def __init__(self, output_path, max_pending=4):
+        self.output_path = output_path
+        self.partial_path = output_path + '.partial'
+        self.format = stream_format(output_path)
+        if self.format == 'parquet' and not PYARROW_AVAILABLE:
+            raise ImportError("Parquet çıktısı için pyarrow gerekli.")
+        self.rows_written = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._file = None
+        self._parquet_writer = None
+        self._schema = None
+        self._opened = False
+        self.logger = logging.getLogger('StreamingResultWriter')
+        self._thread = threading.Thread(target=self._write_loop, name='StreamingResultWriter', daemon=True)
+        self._thread.start()
+
+    def write(self, df):
+        """Parçayı yazma kuyruğuna ekler (kuyruk doluysa bekler)."""
+        if self.error is not None:
+            raise IOError(f"Akış yazıcısı hatası: {self.error}")
+        if len(df):
+            self._queue.put(df)
+
+    def close(self, complete=True):
+        """Kalan parçaları yazar ve dosyayı kapatır.
+
+        complete True ise dosya hedef adına taşınır; False ise (iptal)
+        '.partial' olarak bırakılır. Yazılan satır sayısını döndürür.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise IOError(f"Akış yazıcısı hatası: {self.error}")
+        if complete:
+            if not self._opened:
+                self._open(None) # Sonuç yoksa da (başlıklı) dosya oluşsun
+                self._close_file()
+            os.replace(self.partial_path, self.output_path)
+        return self.rows_written
+
+    def _write_loop(self):
+        try:
+            while True:
+                df = self._queue.get()
+                if df is None:
+                    break
+                df = format_export_frame(df)
+                if not self._opened:
+                    self._open(df)
+                if self.format == 'parquet':
+                    table = pa.Table.from_pandas(self._plain(df), preserve_index=False)
+                    self._parquet_writer.write_table(table.cast(self._schema))
+                else:
+                    df.to_csv(self._file, header=False, index=False, float_format='%.3f')
+                    self._file.flush()
+                self.rows_written += len(df)
+        except Exception as e:
+            self.logger.error(f"Sonuç parçası yazılamadı: {e}", exc_info=True)
+            self.error = e
+            self._drain()
+        finally:
+            self._close_file()
+
+    def _open(self, df):
+        self._opened = True
+        if self.format == 'parquet':
+            if df is None:
+                df = pd.DataFrame({col: pd.Series(dtype=object if col in ('color', 'detector') else float)
+                                   for col in EXPORT_COLUMNS})
+            self._schema = pa.Table.from_pandas(self._plain(df), preserve_index=False).schema
+            self._parquet_writer = pq.ParquetWriter(self.partial_path, self._schema)
+        else:
+            self._file = open(self.partial_path, 'w', newline='')
+            columns = list(df.columns) if df is not None else EXPORT_COLUMNS
+            pd.DataFrame(columns=columns).to_csv(self._file, index=False)
+
+    @staticmethod
+    def _plain(df):
+        # Kategorik sütunlar metne çevrilir; parçalar arasında şema sabit kalır
+        return df.astype({col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def _drain(self):
+        # Hata sonrası bekleyen write() çağrıları kilitlenmesin
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
@@ -0,0 +1,284 @@
+import numpy as np
+import pandas as pd
+
+# Sayısal sütunlar ve tipleri (renk ve dedektör sözlük kodlu ayrı tutulur)
+NUMERIC_COLUMNS = [
+    ('frame', np.int32),
+    ('confidence', np.float64),
+    ('bbox_x1', np.float32),
+    ('bbox_y1', np.float32),
+    ('bbox_x2', np.float32),
+    ('bbox_y2', np.float32),
+    ('ellipse_cx', np.float32),
+    ('ellipse_cy', np.float32),
+    ('ellipse_ax1', np.float32),
+    ('ellipse_ax2', np.float32),
+    ('ellipse_angle', np.float32),
+]
+BBOX_COLUMNS = ['bbox_x1', 'bbox_y1', 'bbox_x2', 'bbox_y2']
+ELLIPSE_COLUMNS = ['ellipse_cx', 'ellipse_cy', 'ellipse_ax1', 'ellipse_ax2', 'ellipse_angle']
+# Satır sözlüklerindeki sütun sırası
+COLUMN_ORDER = ['frame', 'detector', 'color', 'confidence'] + BBOX_COLUMNS + ELLIPSE_COLUMNS
+# Dışa aktarılan CSV'nin sütunları (sırasıyla)
+EXPORT_COLUMNS = ['frame', 'color', 'confidence', 'detector'] + BBOX_COLUMNS
+# Kare başına kayıt sütunları (laser: -1 bilinmiyor / 0 normal / 1 lazer modu)
+FRAME_COLUMNS = [
+    ('frame', np.int32),
+    ('laser', np.int8),
+    ('detect_ms', np.float32),
+]
+
+
+class ResultsStore:
+    """Test sonuçlarını tespit başına sözlük yerine tipli NumPy sütunlarında tutar.
+
+    Sütunlar kapasite ikiye katlanarak büyür. 'color' ve 'detector' sözlük
+    kodludur (küçük tamsayı kod + ad listesi). Depo sinyallerle referans
+    olarak taşınır; dışa aktarma ve istatistikler to_dataframe() ile satır
+    sözlüğü üretmeden DataFrame görünümü alır. Tespitlerin yanında işlenen
+    her kare için ayrı bir kare kaydı (lazer modu, tespit süresi) tutulur;
+    tespit olmayan kareler de raporlarda böylece görünür.
+    """
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in NUMERIC_COLUMNS}
+        self._color_codes = np.empty(capacity, dtype=np.int16)
+        self._detector_codes = np.empty(capacity, dtype=np.int8)
+        self.color_names = []
+        self.detector_names = []
+        self._color_index = {}
+        self._detector_index = {}
+        # OpenCV kutuları tamsayıdır; CSV'de ondalıksız yazılmaları için izlenir
+        self.integer_boxes = True
+        self._frame_size = 0
+        self._frame_columns = {name: np.empty(0, dtype=dtype) for name, dtype in FRAME_COLUMNS}
+        self.sampling = None # Örneklemeli çalışmada mod ve evren aralığı (bkz. core.sampling)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def nbytes(self):
+        """Sütunların kullandığı bellek (kapasite dahil, bayt)."""
+        return (sum(column.nbytes for column in self._columns.values())
+                + self._color_codes.nbytes + self._detector_codes.nbytes)
+
+    def _reserve(self, count):
+        needed = self._size + count
+        capacity = len(self._color_codes)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity = max(1, capacity * 2)
+        for name in self._columns:
+            self._columns[name] = np.resize(self._columns[name], capacity)
+        self._color_codes = np.resize(self._color_codes, capacity)
+        self._detector_codes = np.resize(self._detector_codes, capacity)
+
+    @staticmethod
+    def _encode(value, names, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(names)
+            names.append(value)
+        return code
+
+    def color_code(self, color):
+        return self._encode(color, self.color_names, self._color_index)
+
+    def detector_code(self, detector):
+        return self._encode(detector, self.detector_names, self._detector_index)
+
+    def append_columns(self, frames, detector, colors, confidences, boxes, ellipses=None):
+        """Bir grup tespiti sütun dizileri olarak ekler.
+
+        frames: tek kare numarası veya dizi; colors: ad listesi; boxes: (N, 4);
+        ellipses: (N, 5) veya None (-1 ile doldurulur).
+        """
+        count = len(colors)
+        if count == 0:
+            return
+        boxes = np.asarray(boxes).reshape(count, 4)
+        if self.integer_boxes and not np.issubdtype(boxes.dtype, np.integer):
+            self.integer_boxes = False
+        self._reserve(count)
+        window = slice(self._size, self._size + count)
+        columns = self._columns
+        columns['frame'][window] = frames
+        columns['confidence'][window] = confidences
+        for i, name in enumerate(BBOX_COLUMNS):
+            columns[name][window] = boxes[:, i]
+        ellipses = np.full((count, 5), -1, dtype=np.float32) if ellipses is None else np.asarray(ellipses)
+        for i, name in enumerate(ELLIPSE_COLUMNS):
+            columns[name][window] = ellipses[:, i]
+        self._color_codes[window] = [self.color_code(color) for color in colors]
+        self._detector_codes[window] = self.detector_code(detector)
+        self._size += count
+
+    def append_detections(self, frame_num, detections, detector='opencv'):
+        """BalloonDetector (veya HybridDetector) çıktısını ekler."""
+        if not detections:
+            return
+        ellipses = [(d['ellipse']['center'][0], d['ellipse']['center'][1], d['ellipse']['axes'][0],
+                     d['ellipse']['axes'][1], d['ellipse']['angle']) if d.get('ellipse') else (-1,) * 5
+                    for d in detections]
+        self.append_columns(frame_num, detector, [d['color'] for d in detections],
+                            [d.get('confidence', -1.0) for d in detections],
+                            np.array([d['bbox'] for d in detections]), ellipses)
+
+    def append_frame(self, frame_num, laser_mode=None, detect_ms=None):
+        """İşlenen kareyi kare kaydına ekler (lazer modu/süre bilinmiyorsa None)."""
+        self._reserve_frames(1)
+        columns = self._frame_columns
+        columns['frame'][self._frame_size] = frame_num
+        columns['laser'][self._frame_size] = -1 if laser_mode is None else int(laser_mode)
+        columns['detect_ms'][self._frame_size] = np.nan if detect_ms is None else detect_ms
+        self._frame_size += 1
+
+    def clear_timings(self):
+        """Kare kaydındaki süreleri NaN yapar (önbellekten okunan kareler bu çalışmada ölçülmedi)."""
+        self._frame_columns['detect_ms'][:self._frame_size] = np.nan
+
+    @property
+    def frame_count(self):
+        """Kare kaydındaki kare sayısı."""
+        return self._frame_size
+
+    def frame_log(self):
+        """Kare kaydının DataFrame görünümü (frame, laser, detect_ms)."""
+        return pd.DataFrame({name: column[:self._frame_size] for name, column in self._frame_columns.items()},
+                            copy=False)
+
+    def extend(self, other):
+        """Başka bir deponun satırlarını ve kare kaydını sona ekler (kodlar bu depoya çevrilir)."""
+        self._extend_frames(other)
+        if not other:
+            return
+        count = len(other)
+        self._reserve(count)
+        window = slice(self._size, self._size + count)
+        for name, column in other._columns.items():
+            self._columns[name][window] = column[:count]
+        color_map = np.array([self.color_code(c) for c in other.color_names], dtype=np.int16)
+        detector_map = np.array([self.detector_code(d) for d in other.detector_names], dtype=np.int8)
+        self._color_codes[window] = color_map[other._color_codes[:count]]
+        self._detector_codes[window] = detector_map[other._detector_codes[:count]]
+        self.integer_boxes = self.integer_boxes and other.integer_boxes
+        self._size += count
+
+    def _reserve_frames(self, count):
+        needed = self._frame_size + count
+        capacity = len(self._frame_columns['frame'])
+        if needed <= capacity:
+            return
+        capacity = max(64, capacity)
+        while capacity < needed:
+            capacity *= 2
+        for name in self._frame_columns:
+            self._frame_columns[name] = np.resize(self._frame_columns[name], capacity)
+
+    def _extend_frames(self, other):
+        count = other._frame_size
+        if not count:
+            return
+        self._reserve_frames(count)
+        window = slice(self._frame_size, self._frame_size + count)
+        for name, column in other._frame_columns.items():
+            self._frame_columns[name][window] = column[:count]
+        self._frame_size += count
+
+    def column(self, name, start=0, end=None):
+        """Sütunun doldurulmuş kısmını kopyasız döndürür (color/detector için kodlar)."""
+        window = slice(start, self._size if end is None else min(end, self._size))
+        if name == 'color':
+            return self._color_codes[window]
+        if name == 'detector':
+            return self._detector_codes[window]
+        return self._columns[name][window]
+
+    def color_counts(self):
+        """Renk başına tespit sayısı."""
+        counts = np.bincount(self.column('color'), minlength=len(self.color_names))
+        return {name: int(count) for name, count in zip(self.color_names, counts) if count}
+
+    def to_dataframe(self, columns=None, start=0, end=None):
+        """Satır sözlüğü üretmeden [start, end) satırlarının DataFrame görünümünü döndürür.
+
+        color/detector kategorik sütun olur; kutular yalnızca tamsayı kaynaklı
+        ise tamsayıya çevrilir (eski satır listesiyle aynı CSV çıktısı için).
+        """
+        columns = columns or COLUMN_ORDER
+        data = {}
+        for name in columns:
+            if name == 'color':
+                data[name] = pd.Categorical.from_codes(self.column('color', start, end), self.color_names)
+            elif name == 'detector':
+                data[name] = pd.Categorical.from_codes(self.column('detector', start, end), self.detector_names)
+            elif name in BBOX_COLUMNS and self.integer_boxes:
+                data[name] = self.column(name, start, end).astype(np.int32)
+            else:
+                data[name] = self.column(name, start, end)
+        return pd.DataFrame(data, columns=columns, copy=False)
+
+    def rows(self):
+        """Eski satır sözlüğü formatı (yalnızca küçük sonuçlar / uyumluluk için)."""
+        return self.to_dataframe().astype(object).to_dict('records')
+
+    def to_arrays(self):
+        """Doldurulmuş sütunların kopyasız görünümleri (ad -> dizi).
+
+        color/detector kod dizileridir (adlar color_names/detector_names'te);
+        kare kaydı sütunları 'log_' önekiyle gelir. from_arrays() ile geri kurulur.
+        """
+        arrays = {name: self.column(name) for name in self._columns}
+        arrays['color'] = self.column('color')
+        arrays['detector'] = self.column('detector')
+        for name, column in self._frame_columns.items():
+            arrays['log_' + name] = column[:self._frame_size]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, color_names, detector_names, integer_boxes=True):
+        """to_arrays() çıktısından depo oluşturur."""
+        size = len(arrays['color'])
+        store = cls(capacity=max(1, size))
+        for name, _ in NUMERIC_COLUMNS:
+            store._columns[name][:size] = arrays[name]
+        store._color_codes[:size] = arrays['color']
+        store._detector_codes[:size] = arrays['detector']
+        store._size = size
+        for name in color_names:
+            store.color_code(name)
+        for name in detector_names:
+            store.detector_code(name)
+        store.integer_boxes = integer_boxes
+        frame_count = len(arrays['log_frame'])
+        store._reserve_frames(frame_count)
+        for name, _ in FRAME_COLUMNS:
+            store._frame_columns[name][:frame_count] = arrays['log_' + name]
+        store._frame_size = frame_count
+        return store
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Satır sözlüklerinden depo oluşturur."""
+        store = cls(capacity=max(1, len(rows)))
+        for row in rows:
+            store.append_columns(row['frame'], row['detector'], [row['color']], [row['confidence']],
+                                 np.array([[row[name] for name in BBOX_COLUMNS]]),
+                                 [[row.get(name, -1) for name in ELLIPSE_COLUMNS]])
+        return store
+
+    def __getstate__(self):
+        # Süreçler arası taşımada yalnızca dolu kısım gönderilir
+        state = dict(self.__dict__)
+        state['_columns'] = {name: self.column(name).copy() for name in self._columns}
+        state['_color_codes'] = self.column('color').copy()
+        state['_detector_codes'] = self.column('detector').copy()
+        state['_frame_columns'] = {name: column[:self._frame_size].copy()
+                                   for name, column in self._frame_columns.items()}
+        return state
@@ -0,0 +1,123 @@
+import math
+from statistics import NormalDist
+import numpy as np
+from ..config import SAMPLING_SETTINGS
+
+# Görünen ad -> örnekleme modu (None: tüm kareler)
+SAMPLING_MODES = {
+    "Tüm Kareler": None,
+    "Her N. Kare": 'stride',
+    "Rastgele Örnek": 'random',
+    "Süre Sınırlı": 'budget',
+}
+
+
+def sample_positions(sampling, start_frame, end_frame):
+    """Örneklenecek kare numaraları (artan sırada); süre sınırlı modda None.
+
+    sampling: {'mode': 'stride' | 'random' | 'budget', 'stride', 'fraction',
+    'seed', 'budget_s'}; verilmeyen değerler SAMPLING_SETTINGS'ten alınır.
+    """
+    mode = sampling['mode']
+    if mode == 'stride':
+        stride = max(1, int(sampling.get('stride') or SAMPLING_SETTINGS['STRIDE']))
+        return np.arange(start_frame, end_frame, stride)
+    if mode == 'random':
+        population = max(0, end_frame - start_frame)
+        fraction = sampling.get('fraction') or SAMPLING_SETTINGS['RANDOM_FRACTION']
+        count = min(population, max(1, int(round(population * fraction))))
+        seed = sampling.get('seed', SAMPLING_SETTINGS['SEED'])
+        rng = np.random.default_rng(seed)
+        return np.sort(rng.choice(population, size=count, replace=False)) + start_frame
+    if mode == 'budget':
+        return None
+    raise ValueError(f"Bilinmeyen örnekleme modu: {mode}")
+
+
+def effective_sample_size(values):
+    """Kare sırasındaki örneklerin otokorelasyonuna göre etkin örnek sayısı.
+
+    n / (1 + 2 * Σρ_k); toplam ilk pozitif olmayan gecikmeye kadar alınır.
+    Ardışık kareler birbirine benzediğinden sık örneklemede etkin sayı
+    örnek sayısından küçüktür.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n < 3:
+        return float(n)
+    x = x - x.mean()
+    variance = float(np.dot(x, x))
+    if variance == 0:
+        return float(n)
+    size = 1 << (2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(x, size)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n] / variance
+    lags = autocorr[1:n // 2]
+    stop = np.flatnonzero(lags <= 0)
+    rho_sum = float(lags[:stop[0]].sum()) if len(stop) else float(lags.sum())
+    return float(min(n, max(1.0, n / (1 + 2 * rho_sum))))
+
+
+def mean_interval(values, population, level=None):
+    """Örnek ortalaması ve güven aralığı (etkin örnek sayısı ve sonlu evren düzeltmesiyle)."""
+    level = level or SAMPLING_SETTINGS['CONFIDENCE_LEVEL']
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return {'mean': float('nan'), 'low': float('nan'), 'high': float('nan'), 'n': 0, 'n_eff': 0.0}
+    n_eff = effective_sample_size(x)
+    mean = float(x.mean())
+    std = float(x.std(ddof=1)) if n > 1 else 0.0
+    fpc = math.sqrt(max(0.0, 1 - n / population)) if population else 1.0
+    half = NormalDist().inv_cdf(0.5 + level / 2) * std / math.sqrt(n_eff) * fpc
+    return {'mean': mean, 'low': mean - half, 'high': mean + half, 'n': n, 'n_eff': n_eff}
+
+
+def sampling_estimates(results, sampling):
+    """Örneklenmiş kareler üzerinden kare başı tespit ortalamaları ve tüm aralık tahminleri.
+
+    results.frame_log() işlenen kareleri verir; sampling['start_frame'] /
+    ['end_frame'] evrenin (tüm aralığın) sınırlarıdır.
+    """
+    level = SAMPLING_SETTINGS['CONFIDENCE_LEVEL']
+    population = sampling['end_frame'] - sampling['start_frame']
+    frames = np.unique(results.frame_log()['frame'].to_numpy())
+    colors = results.color_names
+    det_frames = results.column('frame')
+    position = np.searchsorted(frames, det_frames)
+    valid = (position < len(frames)) & (frames[np.minimum(position, len(frames) - 1)] == det_frames) \
+        if len(frames) else np.zeros(len(det_frames), dtype=bool)
+    per_color = np.bincount(position[valid] * len(colors) + results.column('color')[valid],
+                            minlength=len(frames) * len(colors)).reshape(len(frames), len(colors))
+    counts = per_color.sum(axis=1)
+
+    metrics = {'detections_per_frame': mean_interval(counts, population, level),
+               'frames_with_detections': mean_interval(counts > 0, population, level)}
+    for i, color in enumerate(colors):
+        metrics[f"{color}_per_frame"] = mean_interval(per_color[:, i], population, level)
+    for name, stats in metrics.items():
+        if name.endswith('_per_frame'):
+            stats['total_estimate'] = [stats['low'] * population, stats['mean'] * population,
+                                       stats['high'] * population]
+    return {
+        'mode': sampling['mode'],
+        'population_frames': int(population),
+        'sampled_frames': int(len(frames)),
+        'coverage': len(frames) / population if population else 0.0,
+        'confidence_level': level,
+        'metrics': metrics,
+    }
+
+
+def format_estimates(estimates):
+    """Tahminlerin kısa metin özeti (test bitiş mesajı için)."""
+    metrics = estimates['metrics']
+    lines = [f"Örnekleme ({estimates['mode']}): {estimates['sampled_frames']} / {estimates['population_frames']} kare, "
+             f"%{estimates['confidence_level'] * 100:.0f} güven aralıkları:"]
+    for name, stats in metrics.items():
+        line = f"  {name}: {stats['mean']:.3f} [{stats['low']:.3f}, {stats['high']:.3f}] (etkin örnek {stats['n_eff']:.0f})"
+        if 'total_estimate' in stats:
+            low, mean, high = stats['total_estimate']
+            line += f"  (tüm aralık ≈ {mean:.0f} [{low:.0f}, {high:.0f}])"
+        lines.append(line)
+    return '\n'.join(lines)
@@ -0,0 +1,204 @@
+import os
+import re
+import time
+import logging
+import cv2
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from .detector import BalloonDetector
+from .model_registry import get_model_registry
+from .results_store import ResultsStore
+from .yolo_batching import FramePrefetcher
+from .yolo_results import predict_filter_kwargs
+from .test_processor import append_yolo_result, export_rows_to_csv, resolve_frame_range, YOLO_DEVICE_TEST
+from ..config import YOLO_SETTINGS
+
+logger = logging.getLogger('Sweep')
+
+
+def run_sweep(video_path, configs, start_frame=0, end_frame=0, use_full_video=True, batch_size=None,
+              progress=None, is_cancelled=None):
+    """Videoyu bir kez çözüp her kareyi tüm konfigürasyonlara dağıtır.
+
+    configs: [{'name', 'detector': 'opencv' | 'yolo', 'hsv_values' | 'model_path', 'backend'}, ...].
+    HSV konfigürasyonları karenin tek HSV dönüşümünü paylaşır; YOLO
+    konfigürasyonları aynı kare batch'ini kendi modelleriyle işler.
+    {'results': {ad: ResultsStore}, 'counts': {ad: kare başı sayı dizisi},
+    'detect_ms': {ad: toplam ms}, 'hsv_ms', 'decode_wait_ms', 'frames', ...} döndürür.
+    """
+    names = [config['name'] for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError("Konfigürasyon adları benzersiz olmalı.")
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    start_frame, end_frame = resolve_frame_range(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), start_frame, end_frame,
+                                                 use_full_video)
+    frames_to_process = max(0, end_frame - start_frame)
+
+    hsv_configs = [(config, BalloonDetector()) for config in configs if config['detector'] == 'opencv']
+    yolo_configs = [(config, get_model_registry().get(config['model_path'], YOLO_DEVICE_TEST,
+                                                      backend=config.get('backend', 'torch'),
+                                                      calibration_video=video_path))
+                    for config in configs if config['detector'] == 'yolo']
+    batch_size = batch_size or YOLO_SETTINGS['TEST_BATCH_SIZE']
+    predict_kwargs = predict_filter_kwargs()
+
+    results = {name: ResultsStore() for name in names}
+    counts = {name: [] for name in names}
+    detect_ms = dict.fromkeys(names, 0.0)
+    hsv_ms = 0.0
+    pending = [] # YOLO için biriken (kare_no, kare)
+
+    def flush_yolo():
+        frames = [frame for _, frame in pending]
+        for config, model in yolo_configs:
+            name = config['name']
+            t0 = time.perf_counter()
+            yolo_results = model(frames, device=YOLO_DEVICE_TEST, verbose=False, **predict_kwargs)
+            for (frame_num, _), yolo_result in zip(pending, yolo_results):
+                before = len(results[name])
+                append_yolo_result(results[name], frame_num, yolo_result)
+                counts[name].append(len(results[name]) - before)
+            detect_ms[name] += (time.perf_counter() - t0) * 1000
+        pending.clear()
+
+    prefetcher = FramePrefetcher(cap, start_frame, end_frame, queue_size=YOLO_SETTINGS['PREFETCH_QUEUE_SIZE'])
+    prefetcher.start()
+    wait_s = 0.0 # Ana thread'in kare beklediği süre (çözme darboğazı)
+    processed = 0
+    try:
+        while not (is_cancelled and is_cancelled()):
+            t0 = time.perf_counter()
+            item = prefetcher.get()
+            wait_s += time.perf_counter() - t0
+            if item is None:
+                break
+            frame_num, frame = item
+            if hsv_configs:
+                t0 = time.perf_counter()
+                hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) # Tüm HSV konfigürasyonları için bir kez
+                hsv_ms += (time.perf_counter() - t0) * 1000
+                for config, detector in hsv_configs:
+                    name = config['name']
+                    t0 = time.perf_counter()
+                    detections, _ = detector.detect(frame, config['hsv_values'], hsv=hsv)
+                    results[name].append_detections(frame_num, detections)
+                    detect_ms[name] += (time.perf_counter() - t0) * 1000
+                    counts[name].append(len(detections))
+            if yolo_configs:
+                pending.append(item)
+                if len(pending) >= batch_size:
+                    flush_yolo()
+            processed += 1
+            if progress:
+                progress(processed, frames_to_process)
+        if pending and not (is_cancelled and is_cancelled()):
+            flush_yolo()
+    finally:
+        prefetcher.stop()
+        cap.release()
+
+    frames = min((len(c) for c in counts.values()), default=0)
+    return {
+        'video_path': video_path,
+        'frames': frames,
+        'hsv_names': [config['name'] for config, _ in hsv_configs],
+        'yolo_names': [config['name'] for config, _ in yolo_configs],
+        'results': results,
+        'counts': {name: np.asarray(c[:frames]) for name, c in counts.items()},
+        'detect_ms': detect_ms,
+        'hsv_ms': hsv_ms,
+        'decode_wait_ms': wait_s * 1000,
+    }
+
+
+def sweep_summary(sweep):
+    """Konfigürasyon başına karşılaştırma tablosu (DataFrame).
+
+    Kararlılık: kare başı tespit sayısının standart sapması ve sayının bir
+    önceki kareden farklı olduğu karelerin oranı. Uyum: ilk konfigürasyonla
+    aynı sayıda tespit veren karelerin oranı.
+    """
+    frames = sweep['frames']
+    names = list(sweep['results'])
+    baseline = sweep['counts'][names[0]] if names else None
+    hsv_share = sweep['hsv_ms'] / max(1, len(sweep['hsv_names'])) # Paylaşılan HSV dönüşümünün payı
+    rows = []
+    for name in names:
+        counts = sweep['counts'][name]
+        store = sweep['results'][name]
+        ms = sweep['detect_ms'][name] + (hsv_share if name in sweep['hsv_names'] else 0.0)
+        colors = store.color_counts()
+        rows.append({
+            'config': name,
+            'frames': frames,
+            'detections': int(counts.sum()) if frames else 0,
+            'mean_per_frame': float(counts.mean()) if frames else 0.0,
+            'red': colors.get('red', 0),
+            'blue': colors.get('blue', 0),
+            'count_std': float(counts.std()) if frames else 0.0,
+            'count_change_rate': float(np.mean(np.diff(counts) != 0)) if frames > 1 else 0.0,
+            'agreement_with_first': float(np.mean(counts == baseline)) if frames else 0.0,
+            'ms_per_frame': ms / frames if frames else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def export_sweep(sweep, directory):
+    """Özet tabloyu ve her konfigürasyonun sonuçlarını (test CSV formatı) klasöre yazar.
+
+    Konfigürasyon dosyaları sıra numarasıyla başlar ('00_mevcut.csv'); ad
+    temizlenince aynı dosya adına düşen iki konfigürasyon ('a b', 'a_b') veya
+    'sweep_summary' adlı bir konfigürasyon başka bir dosyanın üzerine yazamaz.
+    """
+    os.makedirs(directory, exist_ok=True)
+    summary = sweep_summary(sweep)
+    summary.to_csv(os.path.join(directory, 'sweep_summary.csv'), index=False, float_format='%.3f')
+    for i, (name, store) in enumerate(sweep['results'].items()):
+        safe_name = re.sub(r'[^\w.-]+', '_', name).strip('_') or 'config'
+        export_rows_to_csv(store, os.path.join(directory, f"{i:02d}_{safe_name}.csv"))
+    return summary
+
+
+class SweepWorker(QObject):
+    """Çoklu konfigürasyon taramasını ayrı thread'de çalıştırır."""
+    finished = pyqtSignal(object) # run_sweep çıktısı (hata veya iptalde de, kısmi)
+    progress = pyqtSignal(int, int, str)
+    error = pyqtSignal(str)
+
+    def __init__(self, video_path, configs, start_frame, end_frame, use_full_video):
+        super().__init__()
+        self.video_path = video_path
+        self.configs = configs
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.use_full_video = use_full_video
+        self.is_cancelled = False
+
+    @pyqtSlot()
+    def run_sweep(self):
+        last_reported = [0]
+
+        def on_progress(processed, total):
+            if processed - last_reported[0] >= 25 or processed == total:
+                last_reported[0] = processed
+                percentage = int(processed / max(1, total) * 100)
+                self.progress.emit(percentage, processed,
+                                   f"Karşılaştırma ({len(self.configs)} ayar): {processed}/{total} (%{percentage})")
+
+        try:
+            sweep = run_sweep(self.video_path, self.configs, self.start_frame, self.end_frame, self.use_full_video,
+                              progress=on_progress, is_cancelled=lambda: self.is_cancelled)
+            sweep['cancelled'] = self.is_cancelled
+        except Exception as e:
+            logger.error(f"Karşılaştırma hatası: {e}", exc_info=True)
+            self.error.emit(f"Karşılaştırma Hatası: {e}")
+            sweep = None
+        status = "Karşılaştırma Tamamlandı." if not self.is_cancelled else "Karşılaştırma İptal Edildi."
+        self.progress.emit(100, last_reported[0], status)
+        self.finished.emit(sweep)
+
+    def cancel(self):
+        self.is_cancelled = True
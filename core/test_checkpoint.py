@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+from ..config import CHECKPOINT_SETTINGS, DETECTION_SETTINGS
+
+logger = logging.getLogger('TestCheckpoint')
+
+CHECKPOINT_VERSION = 2 # ResultsStore biçimi değişince artırılır; eski kontrol noktaları kullanılmaz
+
+
+def checkpoint_key(config):
+    """Test yapılandırmasının özeti; aynı yapılandırma aynı kontrol noktasını bulur.
+
+    Videonun boyutu ve değişiklik zamanı ile tespit ayarları da özete
+    girer; video veya ayarlar değiştiyse eski kontrol noktası kullanılmaz.
+    """
+    video_path = os.path.abspath(config['video_path'])
+    stat = os.stat(video_path)
+    payload = dict(config, video_path=video_path, video_size=stat.st_size, video_mtime=stat.st_mtime,
+                   detection_settings=DETECTION_SETTINGS, version=CHECKPOINT_VERSION)
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class TestCheckpoint:
+    """Uzun bir test çalışmasının kaldığı yeri diske kaydeder.
+
+    Durum (sonraki kare, dedektör durumu, kısmi sonuçlar) sözlük olarak
+    pickle ile geçici dosyaya yazılıp yerine taşınır; yazma yarıda kalsa
+    da önceki kontrol noktası bozulmaz. save() en fazla INTERVAL_SECONDS'ta
+    bir yazar (force ile hemen).
+    """
+
+    def __init__(self, config, directory=None):
+        self.key = checkpoint_key(config)
+        directory = directory or CHECKPOINT_SETTINGS['DIRECTORY']
+        self.path = os.path.join(directory, f"{self.key}.ckpt")
+        self.interval = CHECKPOINT_SETTINGS['INTERVAL_SECONDS']
+        self._last_save = time.monotonic()
+
+    def load(self):
+        """Kayıtlı durumu döndürür; yoksa veya okunamıyorsa None."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Kontrol noktası okunamadı, baştan başlanacak: {self.path} ({e})")
+            return None
+        if state.get('key') != self.key:
+            return None
+        return state
+
+    def save(self, state, force=False):
+        """Durumu kaydeder; kaydedildiyse True döndürür."""
+        now = time.monotonic()
+        if not force and now - self._last_save < self.interval:
+            return False
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(dict(state, key=self.key), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._last_save = now
+        return True
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,4 +1,5 @@
 import cv2
+import time
 import numpy as np
 import logging
 import pandas as pd
@@ -6,18 +7,145 @@ import torch
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot, Qt, QThread
 from .detector import BalloonDetector # Use the existing detector
 from .yolo_processor import YoloProcessor, ULTRALYTICS_AVAILABLE
+from .yolo_batching import FramePrefetcher, BatchedYoloInference, sample_frames
+from .model_registry import get_model_registry
+from .hybrid_detector import HybridDetector
+from .yolo_results import result_arrays, class_names, predict_filter_kwargs, box_agreement
+from .parallel_test import ParallelTestRunner, effective_workers
+from .results_store import ResultsStore, EXPORT_COLUMNS
+from .result_writer import StreamingResultWriter, format_export_frame
+from .test_checkpoint import TestCheckpoint
+from .test_report import build_report, write_report
+from .sampling import sample_positions
+from .result_cache import open_cache_session, detect_frame_cached, infer_batch_cached
+from ..config import (YOLO_SETTINGS, STREAM_EXPORT_SETTINGS, CHECKPOINT_SETTINGS, PARALLEL_TEST_SETTINGS,
+                      DETECTION_SETTINGS, HYBRID_SETTINGS, RESULT_CACHE_SETTINGS, SAMPLING_SETTINGS)
 
 
 YOLO_CLASS_MAP_TEST = YoloProcessor.CLASS_MAP if ULTRALYTICS_AVAILABLE else {}
 YOLO_DEVICE_TEST = 'cuda' if ULTRALYTICS_AVAILABLE and torch.cuda.is_available() else 'cpu'
 
+def resolve_frame_range(total_frames_video, start_frame, end_frame, use_full_video):
+    """Test ayarlarına göre işlenecek [başlangıç, bitiş) kare aralığını döndürür."""
+    if use_full_video:
+        return 0, total_frames_video
+    return max(0, start_frame), min(total_frames_video, end_frame)
+
+
+def append_yolo_result(store, frame_num, yolo_result):
+    """Tek bir YOLO sonucunu (results[0]) sonuç deposuna sütun olarak ekler."""
+    xyxy, conf, cls = result_arrays(yolo_result) # Filtreler model çağrısında uygulandı
+    store.append_columns(frame_num, 'yolo', class_names(cls, YOLO_CLASS_MAP_TEST), conf, xyxy)
+
+
+def yolo_results_store(frame_num, yolo_result, detect_ms=None):
+    """Tek karelik YOLO sonucunu ayrı bir (küçük) ResultsStore olarak döndürür."""
+    store = ResultsStore(capacity=8)
+    append_yolo_result(store, frame_num, yolo_result)
+    store.append_frame(frame_num, detect_ms=detect_ms)
+    return store
+
+
+def timed_yolo_stores(items, infer_fn):
+    """[(kare_no, kare), ...] batch'ini infer_fn ile işler; kare başına ResultsStore listesi.
+
+    infer_fn(items) model sonuçlarını giriş sırasıyla döndürür; batch süresi
+    karelere eşit bölünüp kare kaydına yazılır.
+    """
+    start = time.perf_counter()
+    outputs = list(infer_fn(items))
+    frame_ms = (time.perf_counter() - start) * 1000 / max(1, len(items))
+    return [(num, yolo_results_store(num, result, frame_ms)) for (num, _), result in zip(items, outputs)]
+
+
+def detect_into_store(store, detector, frame_num, frame, hsv_values, detector_name='opencv'):
+    """Durumlu dedektörü (OpenCV/Hibrit) tek karede çalıştırıp tespitleri ve kare kaydını ekler.
+
+    Kare kaydındaki lazer modu, karenin maskelerinde kullanılan moddur
+    (tespitten önceki durum).
+    """
+    laser_mode = detector.use_laser_mode
+    start = time.perf_counter()
+    detections = detector.detect(frame, hsv_values)[0]
+    detect_ms = (time.perf_counter() - start) * 1000
+    store.append_detections(frame_num, detections, detector=detector_name)
+    store.append_frame(frame_num, laser_mode, detect_ms)
+
+
+def yolo_result_to_rows(frame_num, yolo_result):
+    """Tek bir YOLO sonucunu (results[0]) test sonuç satırlarına dönüştürür."""
+    xyxy, conf, cls = result_arrays(yolo_result) # Filtreler model çağrısında uygulandı
+    colors = class_names(cls, YOLO_CLASS_MAP_TEST) # Eşleşme veya sınıf ID
+    return [{
+        'frame': frame_num,
+        'detector': 'yolo',
+        'color': color,
+        'confidence': c,
+        'bbox_x1': x1,
+        'bbox_y1': y1,
+        'bbox_x2': x2,
+        'bbox_y2': y2,
+        'ellipse_cx': -1, # YOLO elips vermez
+        'ellipse_cy': -1,
+        'ellipse_ax1': -1,
+        'ellipse_ax2': -1,
+        'ellipse_angle': -1,
+    } for (x1, y1, x2, y2), c, color in zip(xyxy.tolist(), conf.tolist(), colors)]
+
+
+def export_rows_to_csv(rows, output_path):
+    """Sonuçları (ResultsStore veya satır listesi) test modunun CSV formatında diske yazar."""
+    if isinstance(rows, ResultsStore):
+        df_export = rows.to_dataframe(EXPORT_COLUMNS)
+    else:
+        df = pd.DataFrame(rows)
+        # Sütunların var olup olmadığını kontrol et (bazı tespitlerde olmayabilir)
+        existing_columns = [col for col in EXPORT_COLUMNS if col in df.columns]
+        df_export = df[existing_columns].copy() # Seçili sütunlarla yeni DataFrame
+
+    # Ondalık hassasiyeti ayarla (örneğin 'confidence' için)
+    df_export = format_export_frame(df_export)
+
+    # CSV'ye kaydet (index olmadan), float_format ondalık gösterimi de ayarlar
+    df_export.to_csv(output_path, index=False, float_format='%.3f')
+
+def int8_accuracy_report(model_path, video_path, start_frame, end_frame, frame_count=None):
+    """int8 modelini test aralığından eşit aralıklı karelerde float ONNX modeliyle karşılaştırır.
+
+    Uyum IoU >= 0.5 eşleşme oranıdır (1.0: tespitler aynı); hızlanma kare
+    başı float süresinin int8 süresine oranıdır.
+    """
+    frames = sample_frames(video_path, frame_count or YOLO_SETTINGS.get('INT8_REPORT_FRAMES', 32),
+                           start_frame, end_frame)
+    registry = get_model_registry()
+    outputs, frame_ms = {}, {}
+    for backend in ('onnx', 'onnx-int8'):
+        model = registry.get(model_path, 'cpu', backend=backend, calibration_video=video_path)
+        start = time.perf_counter()
+        results = [model(frame, verbose=False, **predict_filter_kwargs())[0] for frame in frames]
+        frame_ms[backend] = (time.perf_counter() - start) * 1000 / max(1, len(frames))
+        outputs[backend] = [result_arrays(r)[0] for r in results]
+    agreement = np.mean([box_agreement(a, b) for a, b in zip(outputs['onnx'], outputs['onnx-int8'])]) if frames else 0.0
+    return {
+        'frames': len(frames),
+        'agreement': round(float(agreement), 4),
+        'float_detections': sum(len(o) for o in outputs['onnx']),
+        'int8_detections': sum(len(o) for o in outputs['onnx-int8']),
+        'float_ms': round(frame_ms['onnx'], 3),
+        'int8_ms': round(frame_ms['onnx-int8'], 3),
+        'speedup': round(frame_ms['onnx'] / frame_ms['onnx-int8'], 3) if frame_ms['onnx-int8'] > 0 else 0.0,
+    }
+
+
 class TestProcessorWorker(QObject):
     """Test döngüsünü çalıştırmak için işçi (worker) thread'i."""
-    finished = pyqtSignal(list)
+    finished = pyqtSignal(object)
     progress = pyqtSignal(int, int, str) # mevcut_kare, toplam_işlenen, durum_mesajı
     error = pyqtSignal(str)
+    int8_report = pyqtSignal(dict) # int8 arka ucunda float modele göre uyum/hızlanma
 
-    def __init__(self, video_path, start_frame, end_frame, use_full_video, hsv_values, detector_type, yolo_model_path):
+    def __init__(self, video_path, start_frame, end_frame, use_full_video, hsv_values, detector_type, yolo_model_path,
+                 batch_size=None, backend=None, stream_path=None, sampling=None):
         super().__init__()
         self.video_path = video_path
         self.start_frame = start_frame
@@ -26,40 +154,31 @@ class TestProcessorWorker(QObject):
         self.hsv_values = hsv_values
         self.detector_type = detector_type
         self.yolo_model_path = yolo_model_path
+        self.batch_size = batch_size or YOLO_SETTINGS['TEST_BATCH_SIZE']
+        self.backend = backend or YOLO_SETTINGS.get('BACKEND', 'torch') # 'torch', 'onnx' veya 'onnx-int8'
+        self.stream_path = stream_path # Verilirse sonuçlar test sırasında bu dosyaya (CSV/Parquet) yazılır
+        self.stream_writer = None
+        self.streamed_rows = 0
+        # Örnekleme: None (tüm kareler) veya {'mode': 'stride' | 'random' | 'budget', ...} (bkz. core.sampling)
+        self.sampling = sampling
 
         # Dedektörü burada başlatma
         self.cv_detector = None
         self.yolo_model = None
+        self.hybrid_detector = None
+        self.is_hybrid = "Hibrit" in self.detector_type # HSV önerileri + YOLO kırpıntıları
         if "OpenCV" in self.detector_type:
             self.cv_detector = BalloonDetector()
 
         self.is_cancelled = False
+        self.parallel_runner = None
+        self.checkpoint = None
         self.logger = logging.getLogger('TestWorker')
 
     @pyqtSlot()
     def run_test(self):
         self.logger.info("Test worker started.")
-        results = []
-        cap = cv2.VideoCapture(self.video_path)
-
-        # Eğer YOLO kullanılacaksa, modeli burada yükle (worker thread içinde)
-        if "YOLO" in self.detector_type:
-            if ULTRALYTICS_AVAILABLE and self.yolo_model_path:
-                try:
-                    from ultralytics import YOLO
-                    self.logger.info(f"Loading YOLO model for test: {self.yolo_model_path}")
-                    self.yolo_model = YOLO(self.yolo_model_path)
-                    # Cihaz önemli ölçüde fark yaratıyorsa ısınma için sahte çıkarım gerekebilir
-                    # self.yolo_model(np.zeros((64, 64, 3), dtype=np.uint8), device=YOLO_DEVICE_TEST, verbose=False)
-                    self.logger.info("Test için YOLO modeli başarıyla yüklendi.")
-                except Exception as e:
-                    self.logger.error(f"İşçi thread'inde YOLO modeli yüklenemedi: {e}", exc_info=True)
-                    self.error.emit(f"Test (YOLO): Model yüklenemedi - {e}")
-                    self.yolo_model = None # Yükleme başarısız olursa modelin None olduğundan emin olun
-            else:
-                 self.logger.error("Test için YOLO seçildi, ancak Ultralytics mevcut değil veya model yolu eksik.")
-                 self.error.emit("Test (YOLO): Ultralytics kütüphanesi veya model yolu bulunamadı.")
-
+        results = ResultsStore()
         cap = cv2.VideoCapture(self.video_path)
         if not cap.isOpened():
             self.logger.error(f"Test Worker: Failed to open video {self.video_path}")
@@ -67,122 +186,361 @@ class TestProcessorWorker(QObject):
             return
 
         total_frames_video = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        actual_start_frame = 0
-        actual_end_frame = total_frames_video
-        
-
-        if not self.use_full_video:
-            actual_start_frame = max(0, self.start_frame)
-            actual_end_frame = min(total_frames_video, self.end_frame)
+        actual_start_frame, actual_end_frame = resolve_frame_range(
+            total_frames_video, self.start_frame, self.end_frame, self.use_full_video)
 
         if actual_start_frame >= actual_end_frame:
              self.logger.warning("Test İşçisi: Başlangıç karesi >= bitiş karesi. İşlenecek kare yok.")
              self.error.emit("Test: Başlangıç karesi bitiş karesinden büyük veya eşit.")
              cap.release()
-             self.finished.emit([]) # Boş sonuçları gönder
+             self.finished.emit(ResultsStore()) # Boş sonuçları gönder
              return
 
         frames_to_process = actual_end_frame - actual_start_frame
         processed_count = 0
+        self._open_stream()
+
+        positions = None
+        if self.sampling:
+            # Örneklemeli çalışma sıralıdır; seçilen kareler tek VideoCapture ile atlanarak okunur
+            positions = sample_positions(self.sampling, actual_start_frame, actual_end_frame)
+            if positions is not None:
+                frames_to_process = len(positions)
+        workers = 1 if self.sampling else effective_workers(frames_to_process)
+        self.checkpoint = self._create_checkpoint(actual_start_frame, actual_end_frame, workers > 1)
+        saved = self.checkpoint.load() if self.checkpoint else None
+        if workers > 1:
+            cap.release()
+            self._run_parallel(workers, actual_start_frame, actual_end_frame, saved)
+            return
 
-        self.logger.info(f"Test processing frames {actual_start_frame} to {actual_end_frame-1} ({frames_to_process} frames)")
-        cap.set(cv2.CAP_PROP_POS_FRAMES, actual_start_frame)
-
-        current_frame_num = actual_start_frame
-        while current_frame_num < actual_end_frame:
-            if self.is_cancelled:
-                self.logger.info("Test worker cancelled.")
-                break
+        # Eğer YOLO kullanılacaksa, modeli burada yükle (worker thread içinde)
+        if "YOLO" in self.detector_type:
+            if ULTRALYTICS_AVAILABLE and self.yolo_model_path:
+                try:
+                    self.logger.info(f"Loading YOLO model for test: {self.yolo_model_path}")
+                    # Canlı YOLO modunda yüklenen model aynı cihazdaysa yeniden kullanılır
+                    self.yolo_model = get_model_registry().get(self.yolo_model_path, YOLO_DEVICE_TEST,
+                                                               backend=self.backend,
+                                                               calibration_video=self.video_path)
+                    self.logger.info(f"Test için YOLO modeli hazır (yükleme {self.yolo_model.load_ms:.0f} ms, "
+                                     f"ısınma {self.yolo_model.warmup_ms:.0f} ms).")
+                except Exception as e:
+                    self.logger.error(f"İşçi thread'inde YOLO modeli yüklenemedi: {e}", exc_info=True)
+                    self.error.emit(f"Test (YOLO): Model yüklenemedi - {e}")
+                    self.yolo_model = None # Yükleme başarısız olursa modelin None olduğundan emin olun
+            else:
+                 self.logger.error("Test için YOLO seçildi, ancak Ultralytics mevcut değil veya model yolu eksik.")
+                 self.error.emit("Test (YOLO): Ultralytics kütüphanesi veya model yolu bulunamadı.")
 
-            ret, frame = cap.read()
-            if not ret:
-                self.logger.warning(f"Test İşçisi: Kare {current_frame_num} okunamadı. Durduruluyor.")
-                break
-            # --- Kontrol Ekle ---
-            if frame is None:
-                self.logger.warning(f"Test İşçisi: {current_frame_num} konumunda geçersiz (None) kare okundu. Atlanıyor.")
+        self.logger.info(f"Test processing frames {actual_start_frame} to {actual_end_frame-1} ({frames_to_process} frames)")
+        session = self._open_cache_session()
+        batcher = None
+        if self.is_hybrid and self.yolo_model:
+            self.hybrid_detector = HybridDetector(self.yolo_model, YOLO_CLASS_MAP_TEST, device=YOLO_DEVICE_TEST)
+        elif "YOLO" in self.detector_type and self.yolo_model:
+            batcher = BatchedYoloInference(self.yolo_model, batch_size=self.batch_size, device=YOLO_DEVICE_TEST,
+                                           **predict_filter_kwargs())
+
+        next_frame = actual_start_frame # Sonuçları alınmış son kareden sonraki kare
+        if saved:
+            results, next_frame = saved['results'], saved['next_frame']
+            detector = self._stateful_detector()
+            if detector is not None and saved['detector_state'] is not None:
+                detector.set_state(saved['detector_state'])
+            # Örneklemede işlenen kare sayısı, next_frame'den önceki seçili kare sayısıdır
+            processed_count = (int(np.searchsorted(positions, next_frame)) if positions is not None
+                               else next_frame - actual_start_frame)
+            self.logger.info(f"Kontrol noktasından devam ediliyor: kare {next_frame} ({len(results)} sonuç)")
+            self.progress.emit(int((processed_count / frames_to_process) * 100), processed_count,
+                               f"Kontrol noktasından devam ediliyor: kare {next_frame}")
+        detector = self._stateful_detector()
+        if session and (detector is not None or batcher) and not self.sampling:
+            # Önbellekte kesintisiz duran kareler video çözülmeden alınır
+            cached, next_frame, state = session.prefix(next_frame, actual_end_frame, self._detector_state())
+            for _, frame_results in cached:
+                results.extend(frame_results)
+            if detector is not None and cached:
+                detector.set_state(state)
+            processed_count += len(cached)
+
+        # Kareler arka planda önden okunur; YOLO'da batch'ler halinde tek çağrıyla işlenir
+        budget_s = self.sampling.get('budget_s') or SAMPLING_SETTINGS['BUDGET_SECONDS'] \
+            if self.sampling and positions is None else None
+        prefetcher = FramePrefetcher(cap, next_frame, actual_end_frame,
+                                     # Süre sınırında kuyruk küçük tutulur; süre dolunca az kare beklesin
+                                     queue_size=2 if budget_s else YOLO_SETTINGS['PREFETCH_QUEUE_SIZE'],
+                                     positions=positions[positions >= next_frame] if positions is not None else None,
+                                     budget_s=budget_s, max_grab_gap=SAMPLING_SETTINGS['GRAB_MAX_GAP'])
+        prefetcher.start()
+        started = time.perf_counter()
+
+        last_reported = processed_count
+        while not self.is_cancelled:
+            batch = batcher.collect(prefetcher) if batcher else self._next_single(prefetcher)
+            if not batch:
                 break
             # --- Seçilen dedektörü kullan ---
             try:
-                detections = []
-                if "OpenCV" in self.detector_type and self.cv_detector:
+                if batcher:
+                    # YOLO Tespiti (batch, sonuçlar kare sırasıyla döner; önbellektekiler çalıştırılmaz)
+                    infer = lambda items: timed_yolo_stores(
+                        items, lambda batch_items: [result for _, _, result in batcher.infer(batch_items)])
+                    for frame_results in infer_batch_cached(session, batch, infer):
+                        results.extend(frame_results)
+                elif "OpenCV" in self.detector_type and self.cv_detector:
                     # OpenCV (HSV) Tespiti
                     # Not: Otomatik mod geçişi detector içinde yönetiliyor
-                    cv_detections, _ = self.cv_detector.detect(frame, self.hsv_values)
-                    # OpenCV formatını standart formata uyarla (zaten uyumlu olmalı)
-                    for det in cv_detections:
-                         detections.append({
-                            'frame': current_frame_num,
-                            'detector': 'opencv',
-                            'color': det['color'],
-                            'confidence': det.get('confidence', -1.0),
-                            'bbox_x1': det['bbox'][0],
-                            'bbox_y1': det['bbox'][1],
-                            'bbox_x2': det['bbox'][2],
-                            'bbox_y2': det['bbox'][3],
-                            'ellipse_cx': det['ellipse']['center'][0] if det.get('ellipse') else -1,
-                            'ellipse_cy': det['ellipse']['center'][1] if det.get('ellipse') else -1,
-                            'ellipse_ax1': det['ellipse']['axes'][0] if det.get('ellipse') else -1,
-                            'ellipse_ax2': det['ellipse']['axes'][1] if det.get('ellipse') else -1,
-                            'ellipse_angle': det['ellipse']['angle'] if det.get('ellipse') else -1,
-                        })
-
-                elif "YOLO" in self.detector_type and self.yolo_model:
-                    # YOLO Tespiti
-                    yolo_results = self.yolo_model(frame, device=YOLO_DEVICE_TEST, verbose=False)
-                    boxes = yolo_results[0].boxes
-                    for i in range(len(boxes.xyxy)):
-                        x1, y1, x2, y2 = map(int, boxes.xyxy[i])
-                        conf = float(boxes.conf[i])
-                        cls_id = int(boxes.cls[i])
-                        color = YOLO_CLASS_MAP_TEST.get(cls_id, f"class_{cls_id}") # Eşleşme veya sınıf ID
-
-                        detections.append({
-                            'frame': current_frame_num,
-                            'detector': 'yolo',
-                            'color': color, # Veya class_id'yi sakla
-                            'confidence': conf,
-                            'bbox_x1': x1,
-                            'bbox_y1': y1,
-                            'bbox_x2': x2,
-                            'bbox_y2': y2,
-                            'ellipse_cx': -1, # YOLO elips vermez
-                            'ellipse_cy': -1,
-                            'ellipse_ax1': -1,
-                            'ellipse_ax2': -1,
-                            'ellipse_angle': -1,
-                        })
-
-                # Toplanan detection'ları ana listeye ekle
-                results.extend(detections)
+                    frame_num, frame = batch[0]
+                    detect = lambda out: detect_into_store(out, self.cv_detector, frame_num, frame, self.hsv_values)
+                    results.extend(detect_frame_cached(session, self.cv_detector, frame_num, detect))
+                elif self.hybrid_detector:
+                    # Hibrit: HSV adayları kare kare, doğrulama aday kırpıntılarıyla tek çağrıda
+                    frame_num, frame = batch[0]
+                    detect = lambda out: detect_into_store(out, self.hybrid_detector, frame_num, frame,
+                                                           self.hsv_values, 'hybrid')
+                    results.extend(detect_frame_cached(session, self.hybrid_detector, frame_num, detect))
 
             except Exception as e:
-                self.logger.error(f"Test İşçisinde kare {current_frame_num}'de tespit sırasında hata: {e}", exc_info=True)
-                self.error.emit(f"Test Hatası (Kare {current_frame_num}): {e}")
+                first_frame = batch[0][0]
+                self.logger.error(f"Test İşçisinde kare {first_frame}'de tespit sırasında hata: {e}", exc_info=True)
+                self.error.emit(f"Test Hatası (Kare {first_frame}): {e}")
                 # Durup durmayacağınıza karar verin
                 # break # Hata durumunda durmak için yorumu kaldırın
 
-            processed_count += 1
-            if processed_count % 25 == 0 or current_frame_num == actual_end_frame - 1: # İlerlemeyi periyodik olarak güncelle
+            processed_count += len(batch)
+            next_frame = batch[-1][0] + 1
+            self._stream_rows(results)
+            self._save_checkpoint({'next_frame': next_frame, 'results': results,
+                                   'detector_state': self._detector_state()})
+            if processed_count - last_reported >= 25 or processed_count == frames_to_process: # İlerlemeyi periyodik olarak güncelle
+                last_reported = processed_count
+                if budget_s:
+                    percentage = min(99, int((time.perf_counter() - started) / budget_s * 100))
+                    status = f"Süre sınırlı örnekleme: {processed_count} kare (%{percentage})"
+                else:
+                    percentage = int((processed_count / frames_to_process) * 100)
+                    status = f"İşleniyor: {processed_count}/{frames_to_process} (%{percentage})"
+                self.progress.emit(percentage, processed_count, status)
+
+        if self.is_cancelled:
+            self.logger.info("Test worker cancelled.")
+        prefetcher.stop()
+        if prefetcher.read_error_frame is not None:
+            self.logger.warning(f"Test İşçisi: Kare {prefetcher.read_error_frame} okunamadı. Durduruluyor.")
+
+        cap.release()
+        if session:
+            session.close()
+        self._end_checkpoint({'next_frame': next_frame, 'results': results,
+                              'detector_state': self._detector_state()})
+        if self.yolo_model:
+            self._emit_int8_report(processed_count, actual_start_frame, actual_end_frame)
+        if self.sampling:
+            results.sampling = dict(self.sampling, start_frame=actual_start_frame, end_frame=actual_end_frame)
+        self._finish(results, processed_count)
+
+    def _stateful_detector(self):
+        """Kareler arası durumu olan dedektör (YOLO'da None)."""
+        return self.hybrid_detector if self.is_hybrid else self.cv_detector
+
+    def _detector_state(self):
+        detector = self._stateful_detector()
+        return detector.get_state() if detector is not None else None
+
+    def _cache_config(self):
+        """Kare sonuçlarını belirleyen ayarlar (sonuç önbelleği anahtarı); önbellek kapalıysa None."""
+        if not RESULT_CACHE_SETTINGS['ENABLED']:
+            return None
+        is_yolo = "YOLO" in self.detector_type
+        config = {'detector_type': self.detector_type, 'detection_settings': DETECTION_SETTINGS}
+        if not is_yolo or self.is_hybrid:
+            config['hsv_values'] = self.hsv_values
+        if is_yolo:
+            try:
+                model_hash = get_model_registry().file_hash(self.yolo_model_path)
+            except OSError as e:
+                self.logger.warning(f"Sonuç önbelleği kullanılamıyor: {e}")
+                return None
+            config.update(model_hash=model_hash, backend=self.backend, predict=predict_filter_kwargs(),
+                          class_map=YOLO_CLASS_MAP_TEST)
+        if self.is_hybrid:
+            config['hybrid_settings'] = HYBRID_SETTINGS
+        return config
+
+    def _open_cache_session(self):
+        if "YOLO" in self.detector_type and not self.yolo_model:
+            return None
+        config = self._cache_config()
+        return open_cache_session(self.video_path, config) if config else None
+
+    def _create_checkpoint(self, start_frame, end_frame, parallel):
+        """Yapılandırmaya özgü kontrol noktasını hazırlar (kapalıysa veya hata olursa None)."""
+        if not CHECKPOINT_SETTINGS['ENABLED']:
+            return None
+        if self.sampling and self.sampling['mode'] == 'budget':
+            return None # Süre sınırlı örneklemede seçilen kareler çalışmaya göre değişir
+        config = {
+            'video_path': self.video_path,
+            'start_frame': start_frame,
+            'end_frame': end_frame,
+            'detector_type': self.detector_type,
+            'hsv_values': self.hsv_values if "YOLO" not in self.detector_type or self.is_hybrid else None,
+            'batch_size': self.batch_size,
+            # Paralel parçalar sıralı çalışmanın durumuyla uyumlu değildir
+            'parallel': [PARALLEL_TEST_SETTINGS['CHUNK_FRAMES'], PARALLEL_TEST_SETTINGS['WARMUP_FRAMES']]
+                        if parallel else None,
+        }
+        if self.sampling:
+            config['sampling'] = self.sampling
+        try:
+            if "YOLO" in self.detector_type and self.yolo_model_path:
+                config.update(model_hash=get_model_registry().file_hash(self.yolo_model_path), backend=self.backend)
+            return TestCheckpoint(config)
+        except OSError as e:
+            self.logger.warning(f"Kontrol noktası hazırlanamadı: {e}")
+            return None
+
+    def _save_checkpoint(self, state, force=False):
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save(state, force=force)
+        except Exception as e:
+            self.logger.error(f"Kontrol noktası kaydedilemedi: {e}", exc_info=True)
+            self.checkpoint = None
+
+    def _end_checkpoint(self, state):
+        """İptal edildiyse son durumu kaydeder, test bittiyse kontrol noktasını siler."""
+        if self.checkpoint is None:
+            return
+        if self.is_cancelled:
+            self._save_checkpoint(state, force=True)
+            self.logger.info(f"Test kaldığı yerden devam ettirilebilir: {self.checkpoint.path}")
+        else:
+            self.checkpoint.remove()
+
+    def _run_parallel(self, workers, start_frame, end_frame, saved=None):
+        """Aralığı parçalara bölüp süreç havuzunda işler (bkz. ParallelTestRunner)."""
+        frames_to_process = end_frame - start_frame
+        if "YOLO" in self.detector_type and not (ULTRALYTICS_AVAILABLE and self.yolo_model_path):
+            self.logger.error("Test için YOLO seçildi, ancak Ultralytics mevcut değil veya model yolu eksik.")
+            self.error.emit("Test (YOLO): Ultralytics kütüphanesi veya model yolu bulunamadı.")
+            self._finish(ResultsStore(), 0)
+            return
+        task = {
+            'video_path': self.video_path,
+            'detector_type': self.detector_type,
+            'hsv_values': self.hsv_values,
+            'yolo_model_path': self.yolo_model_path,
+            'backend': self.backend,
+            'batch_size': self.batch_size,
+            'cache_config': self._cache_config(),
+        }
+        last_reported = [0]
+
+        def on_progress(processed_count):
+            if processed_count - last_reported[0] >= 25 or processed_count == frames_to_process:
+                last_reported[0] = processed_count
                 percentage = int((processed_count / frames_to_process) * 100)
-                status = f"İşleniyor: {processed_count}/{frames_to_process} (%{percentage})"
+                status = f"İşleniyor ({workers} süreç): {processed_count}/{frames_to_process} (%{percentage})"
                 self.progress.emit(percentage, processed_count, status)
 
-            current_frame_num += 1
-            # İsteğe bağlı: Gerekirse %100 CPU kullanımını önlemek için küçük bir uyku ekleyin
-            # time.sleep(0.001)
+        done_chunks = dict(saved['chunks']) if saved else {}
 
+        def on_chunk_done(index, chunk_results, processed):
+            done_chunks[index] = (chunk_results, processed)
+            self._save_checkpoint({'chunks': done_chunks})
 
-        cap.release()
+        def on_chunk(chunk_results):
+            # Parçalar kare sırasıyla gelir; birleştirmeyi beklemeden yazılır
+            self._write_stream(chunk_results.to_dataframe(EXPORT_COLUMNS))
+            self.streamed_rows += len(chunk_results)
+
+        self.parallel_runner = ParallelTestRunner(workers)
+        if self.is_cancelled: # Runner oluşmadan önce iptal istendiyse
+            self.parallel_runner.cancel()
+        try:
+            results = self.parallel_runner.run(task, start_frame, end_frame, progress_callback=on_progress,
+                                               chunk_callback=on_chunk if self.stream_writer else None,
+                                               done_chunks=done_chunks, chunk_done_callback=on_chunk_done)
+        except Exception as e:
+            self.logger.error(f"Paralel test hatası: {e}", exc_info=True)
+            self.error.emit(f"Test Hatası (paralel): {e}")
+            self._finish(ResultsStore(), last_reported[0])
+            return
+        processed_count = last_reported[0]
+        self._end_checkpoint({'chunks': done_chunks})
+        if "YOLO" in self.detector_type:
+            self._emit_int8_report(processed_count, start_frame, end_frame)
+        self._finish(results, processed_count)
+
+    def _emit_int8_report(self, processed_count, start_frame, end_frame):
+        if self.backend != 'onnx-int8' or self.is_cancelled:
+            return
+        self.progress.emit(100, processed_count, "int8 / float karşılaştırması yapılıyor...")
+        try:
+            self.int8_report.emit(int8_accuracy_report(self.yolo_model_path, self.video_path,
+                                                       start_frame, end_frame))
+        except Exception as e:
+            self.logger.error(f"int8 karşılaştırması yapılamadı: {e}", exc_info=True)
+
+    def _open_stream(self):
+        if not self.stream_path:
+            return
+        try:
+            self.stream_writer = StreamingResultWriter(self.stream_path,
+                                                       max_pending=STREAM_EXPORT_SETTINGS['MAX_PENDING_CHUNKS'])
+            self.logger.info(f"Sonuçlar test sırasında yazılıyor: {self.stream_path}")
+        except Exception as e:
+            self.logger.error(f"Akış dosyası açılamadı: {e}", exc_info=True)
+            self.error.emit(f"Test: Sonuç dosyası açılamadı - {e}")
+
+    def _stream_rows(self, results, force=False):
+        """Henüz yazılmamış satırlar CHUNK_ROWS'a ulaştıysa (veya force ise) yazıcıya verir."""
+        pending = len(results) - self.streamed_rows
+        if self.stream_writer and pending > 0 and (force or pending >= STREAM_EXPORT_SETTINGS['CHUNK_ROWS']):
+            self._write_stream(results.to_dataframe(EXPORT_COLUMNS, start=self.streamed_rows))
+            self.streamed_rows = len(results)
+
+    def _write_stream(self, df):
+        if self.stream_writer is None:
+            return
+        try:
+            self.stream_writer.write(df)
+        except IOError as e:
+            self.error.emit(f"Test: Sonuç dosyasına yazılamadı - {e}")
+            self.stream_writer = None
+
+    def _close_stream(self, results):
+        if self.stream_writer is None:
+            return
+        self._stream_rows(results, force=True)
+        try:
+            rows = self.stream_writer.close(complete=not self.is_cancelled)
+            self.logger.info(f"Akış dosyası kapatıldı ({rows} satır): {self.stream_path}")
+        except IOError as e:
+            self.error.emit(f"Test: Sonuç dosyasına yazılamadı - {e}")
+        self.stream_writer = None
+
+    def _finish(self, results, processed_count):
+        self._close_stream(results)
         status = "Test Tamamlandı." if not self.is_cancelled else "Test İptal Edildi."
         self.progress.emit(100, processed_count, status) # Son ilerleme güncellemesi
         self.finished.emit(results)
         self.logger.info(f"Test işçisi bitti. Sonuç sayısı: {len(results)}")
 
+    def _next_single(self, prefetcher):
+        """Prefetcher'dan tek kareyi batch listesi olarak alır (OpenCV yolu)."""
+        item = prefetcher.get()
+        return [item] if item is not None else []
+
     def cancel(self):
         """İşçi döngüsünün durmasını ister."""
         self.logger.info("Test işçisi iptal isteği alındı.")
         self.is_cancelled = True
+        if self.parallel_runner is not None:
+            self.parallel_runner.cancel() # Tüm parça süreçlerine iletilir
 
     # İsteğe bağlı: Thread biterken modeli temizle
     # def __del__(self):
@@ -190,9 +548,12 @@ class TestProcessorWorker(QObject):
 
 class TestProcessor(QObject):
     """TestProcessorWorker'ı yönetir."""
-    test_finished = pyqtSignal(list) # Bittiğinde sonuç listesini yayınlar
+    test_finished = pyqtSignal(object) # Bittiğinde sonuç deposunu (ResultsStore) referansla yayınlar
     test_progress = pyqtSignal(int, int, str) # yüzde, işlenen_sayısı, durum
     test_error = pyqtSignal(str)
+    test_int8_report = pyqtSignal(dict)
+    sweep_finished = pyqtSignal(object) # Çoklu konfigürasyon taraması çıktısı (bkz. core.sweep)
+    comparison_finished = pyqtSignal(object) # OpenCV / YOLO yan yana karşılaştırma çıktısı (bkz. core.comparison)
 
     def __init__(self):
         super().__init__()
@@ -201,8 +562,10 @@ class TestProcessor(QObject):
         self.video_path = None
         self.hsv_values = None
         self.config = {}
-        self.results = []
-        logging.basicConfig(level=logging.INFO)
+        self.results = ResultsStore()
+        self.stream_path = None # Ana pencere test başlamadan önce ayarlar (akışlı dışa aktarma)
+        self.sampling = None # Ana pencere test başlamadan önce ayarlar (örneklemeli test, bkz. core.sampling)
+        self.yolo_backend = YOLO_SETTINGS.get('BACKEND', 'torch') # Ana pencere ModePanel seçimine göre ayarlar
         self.logger = logging.getLogger('TestProcessor')
 
 
@@ -232,7 +595,7 @@ class TestProcessor(QObject):
               self.test_error.emit("Test başlatılamıyor: Video veya HSV değerleri ayarlanmadı.")
 
         self.logger.info("Test başlatılıyor...")
-        self.results = [] # Önceki sonuçları temizle
+        self.results = ResultsStore() # Önceki sonuçları temizle
         self.worker_thread = QThread()
         self.current_worker = TestProcessorWorker(
             video_path=self.video_path,
@@ -241,13 +604,17 @@ class TestProcessor(QObject):
             use_full_video=self.config['use_full_video'],
             hsv_values=self.hsv_values,
             detector_type=self.detector_type, 
-            yolo_model_path=self.yolo_model_path
+            yolo_model_path=self.yolo_model_path,
+            backend=self.yolo_backend,
+            stream_path=self.stream_path,
+            sampling=self.sampling
         )
         self.current_worker.moveToThread(self.worker_thread)
         # İşçiden gelen sinyalleri işlemcinin sinyallerine bağla
         self.current_worker.finished.connect(self._on_worker_finished)
         self.current_worker.progress.connect(self.test_progress.emit) # İlerlemeyi yeniden yayınla
         self.current_worker.error.connect(self.test_error.emit)     # Hatayı yeniden yayınla
+        self.current_worker.int8_report.connect(self.test_int8_report.emit)
 
         # Bağlantıyı başlatmadan önce worker thread'in başlatıldığından emin olun
         self.worker_thread.started.connect(self.current_worker.run_test) # Thread başlayınca worker'ın işini başlat
@@ -262,6 +629,68 @@ class TestProcessor(QObject):
         self.worker_thread.start() # Thread'i başlat
         # self.test_started.emit() # İsteğe bağlı
 
+    def start_sweep(self, configs, start_frame, end_frame, use_full_video):
+        """Videoyu bir kez çözüp kareleri verilen konfigürasyonlara dağıtan taramayı başlatır."""
+        from .sweep import SweepWorker # core.sweep bu modülü içe aktarır
+        if self.current_worker and self.worker_thread.isRunning():
+            self.test_error.emit("Test zaten çalışıyor.")
+            return
+        if not self.video_path:
+            self.test_error.emit("Karşılaştırma başlatılamıyor: Video ayarlanmadı.")
+            return
+
+        self.logger.info(f"Karşılaştırma başlatılıyor: {[c['name'] for c in configs]}")
+        self.worker_thread = QThread()
+        self.current_worker = SweepWorker(self.video_path, configs, start_frame, end_frame, use_full_video)
+        self.current_worker.moveToThread(self.worker_thread)
+        self.current_worker.finished.connect(self._on_sweep_finished)
+        self.current_worker.progress.connect(self.test_progress.emit)
+        self.current_worker.error.connect(self.test_error.emit)
+        self.worker_thread.started.connect(self.current_worker.run_sweep)
+        self.current_worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.current_worker.deleteLater)
+        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+        self.worker_thread.finished.connect(self._clear_thread_references)
+        self.worker_thread.start()
+
+    @pyqtSlot(object)
+    def _on_sweep_finished(self, sweep):
+        self.logger.info("Karşılaştırma işçisi bitti.")
+        self.sweep_finished.emit(sweep)
+        self._clear_thread_references()
+
+    def start_comparison(self):
+        """set_config ile ayarlanan aralıkta OpenCV (mevcut HSV) ve YOLO'yu aynı karelerde yan yana çalıştırır."""
+        from .comparison import ComparisonWorker # core.comparison bu modülü içe aktarır
+        if self.current_worker and self.worker_thread.isRunning():
+            self.test_error.emit("Test zaten çalışıyor.")
+            return
+        if not self.video_path or not self.yolo_model_path:
+            self.test_error.emit("Karşılaştırma başlatılamıyor: Video veya YOLO modeli ayarlanmadı.")
+            return
+
+        self.logger.info(f"OpenCV / YOLO karşılaştırması başlatılıyor: {self.yolo_model_path}")
+        self.worker_thread = QThread()
+        self.current_worker = ComparisonWorker(self.video_path, self.hsv_values, self.yolo_model_path, self.yolo_backend,
+                                               self.config['start_frame'], self.config['end_frame'],
+                                               self.config['use_full_video'])
+        self.current_worker.moveToThread(self.worker_thread)
+        self.current_worker.finished.connect(self._on_comparison_finished)
+        self.current_worker.progress.connect(self.test_progress.emit)
+        self.current_worker.error.connect(self.test_error.emit)
+        self.worker_thread.started.connect(self.current_worker.run_comparison)
+        self.current_worker.finished.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.current_worker.deleteLater)
+        self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+        self.worker_thread.finished.connect(self._clear_thread_references)
+        self.worker_thread.start()
+
+    @pyqtSlot(object)
+    def _on_comparison_finished(self, comparison):
+        self.logger.info("OpenCV / YOLO karşılaştırma işçisi bitti.")
+        self.comparison_finished.emit(comparison)
+        self._clear_thread_references()
+
     @pyqtSlot()
     def cancel_test(self):
         if self.worker_thread and self.worker_thread.isRunning() and self.current_worker:
@@ -273,10 +702,10 @@ class TestProcessor(QObject):
         else:
             self.logger.warning("No active test to cancel.")
 
-    @pyqtSlot(list)
-    def _on_worker_finished(self, results_list):
+    @pyqtSlot(object)
+    def _on_worker_finished(self, results_store):
         self.logger.info("Test worker finished signal received by processor.")
-        self.results = results_list # Sonuçları sakla
+        self.results = results_store # Sonuçları sakla (kopyalanmaz)
         self.test_finished.emit(self.results) # Testin bittiğini ve sonuçları yayınla
         self._clear_thread_references()
 
@@ -288,7 +717,9 @@ class TestProcessor(QObject):
     
 
     def export_results(self, output_path):
-        """Tespit sonuçlarını bir CSV dosyasına aktarır."""
+        """Tespit sonuçlarını bir CSV dosyasına, .html/.json uzantısında istatistik raporuna aktarır."""
+        if output_path.lower().endswith(('.html', '.json')):
+            return self.export_report(output_path)
         if not self.results:
             self.logger.warning("Export failed: No test results available.")
             self.test_error.emit("Dışa aktarma başarısız: Test sonucu yok.")
@@ -296,34 +727,27 @@ class TestProcessor(QObject):
 
         try:
             self.logger.info(f"Exporting {len(self.results)} results to {output_path}")
-            df = pd.DataFrame(self.results)
-            # 1. İstenen Sütunları Seç ve Sırala
-            columns_to_keep = [
-                 'frame',
-                 'color',
-                 'confidence',
-                 'detector',
-                 'bbox_x1',
-                 'bbox_y1',
-                 'bbox_x2',
-                 'bbox_y2',
-            ]
-            # Sütunların var olup olmadığını kontrol et (bazı tespitlerde olmayabilir)
-            existing_columns = [col for col in columns_to_keep if col in df.columns]
-            df_export = df[existing_columns].copy() # Seçili sütunlarla yeni DataFrame
-
-            # 2. Ondalık Hassasiyeti Ayarla (örneğin 'confidence' için)
-            if 'confidence' in df_export.columns:
-                df_export['confidence'] = pd.to_numeric(df_export['confidence'], errors='coerce').round(3) # Önce sayısal yap
-            # Diğer ondalıklı sütunlar için de benzerini yapabilirsiniz (örn. elips)
-
-            # 3. CSV'ye Kaydet (index olmadan)
-            df_export.to_csv(output_path, index=False, float_format='%.3f') # float_format ondalık gösterimi de ayarlar
-            # --- ---
+            export_rows_to_csv(self.results, output_path)
 
             self.logger.info("Export successful.")
             return True
         except Exception as e:
             self.logger.error(f"Failed to export results: {e}", exc_info=True)
             self.test_error.emit(f"Sonuçlar dışa aktarılamadı: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def export_report(self, output_path):
+        """Son testin istatistik raporunu (bkz. core.test_report) HTML veya JSON olarak yazar."""
+        if not self.results and not self.results.frame_count:
+            self.test_error.emit("Rapor oluşturulamadı: Test sonucu yok.")
+            return False
+        try:
+            meta = {'video': self.video_path, 'detector': getattr(self, 'detector_type', None)}
+            report = build_report(self.results, meta=meta)
+            write_report(report, output_path)
+            self.logger.info(f"Test raporu yazıldı ({report['generated_ms']:.0f} ms): {output_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to write report: {e}", exc_info=True)
+            self.test_error.emit(f"Rapor yazılamadı: {e}")
+            return False
@@ -0,0 +1,241 @@
+import json
+import html
+import time
+import numpy as np
+from .results_store import BBOX_COLUMNS
+from .sampling import sampling_estimates
+from ..config import REPORT_SETTINGS
+
+
+def frame_runs(mask, offset=0):
+    """Mantıksal dizideki ardışık True bölgeleri: (başlangıçlar, bitişler) [dahil, hariç)."""
+    edges = np.diff(np.concatenate([[0], np.asarray(mask, dtype=np.int8), [0]]))
+    return np.flatnonzero(edges == 1) + offset, np.flatnonzero(edges == -1) + offset
+
+
+def interval_summary(starts, ends, min_frames=1):
+    """Aralık sayısı, toplam/en uzun süre ve en uzun MAX_LISTED_INTERVALS aralık (kare sırasıyla)."""
+    lengths = ends - starts
+    keep = lengths >= min_frames
+    starts, ends, lengths = starts[keep], ends[keep], lengths[keep]
+    listed = np.sort(np.argsort(-lengths, kind='stable')[:REPORT_SETTINGS['MAX_LISTED_INTERVALS']])
+    return {
+        'count': int(len(lengths)),
+        'frames': int(lengths.sum()),
+        'longest': int(lengths.max()) if len(lengths) else 0,
+        'intervals': [{'start': int(starts[i]), 'end': int(ends[i]), 'frames': int(lengths[i])} for i in listed],
+    }
+
+
+def percentile_summary(values):
+    """NaN olmayan değerlerin sayısı, ortalaması, en büyüğü ve REPORT_SETTINGS yüzdelikleri."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {'count': 0}
+    stats = {'count': int(len(values)), 'mean': float(values.mean()), 'max': float(values.max())}
+    percentiles = REPORT_SETTINGS['PERCENTILES']
+    stats.update({f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))})
+    return stats
+
+
+def build_report(results, start_frame=None, end_frame=None, meta=None):
+    """Test sonuç deposundan istatistik raporu (JSON'a yazılabilir sözlük) üretir.
+
+    Kare başı sayılar, renk zaman çizelgesi, tespit kesintileri, lazer modu
+    aralıkları, kutu boyutu dağılımları ve kare başı süre yüzdelikleri
+    sütunlar üzerinde bincount/gruplama ile hesaplanır. Aralık verilmezse
+    kare kaydı ve tespitlerden çıkarılır. Örneklemeli çalışmada (results.sampling)
+    kare başı istatistikler yalnızca işlenen karelerden hesaplanır, kesintiler
+    atlanır ve tüm aralık için güven aralıklı tahminler eklenir.
+    """
+    started = time.perf_counter()
+    sampling = results.sampling
+    if sampling:
+        start_frame = sampling['start_frame'] if start_frame is None else start_frame
+        end_frame = sampling['end_frame'] if end_frame is None else end_frame
+    df = results.to_dataframe(['frame', 'color', 'confidence'] + BBOX_COLUMNS)
+    log = results.frame_log()
+    known = np.concatenate([df['frame'].to_numpy(), log['frame'].to_numpy()])
+    if start_frame is None:
+        start_frame = int(known.min()) if len(known) else 0
+    if end_frame is None:
+        end_frame = int(known.max()) + 1 if len(known) else start_frame
+    frame_total = max(0, end_frame - start_frame)
+    df = df[(df['frame'] >= start_frame) & (df['frame'] < end_frame)]
+    log = log[(log['frame'] >= start_frame) & (log['frame'] < end_frame)]
+
+    colors = list(df['color'].cat.categories)
+    offsets = df['frame'].to_numpy(dtype=np.int64) - start_frame
+    codes = df['color'].cat.codes.to_numpy(dtype=np.int64)
+    per_color = np.bincount(offsets * len(colors) + codes,
+                            minlength=frame_total * len(colors)).reshape(frame_total, len(colors))
+    observed = np.arange(frame_total) # Sayıları kullanılan karelerin aralık içindeki konumu
+    if sampling:
+        observed = np.unique(log['frame'].to_numpy(dtype=np.int64) - start_frame)
+        per_color = per_color[observed]
+    counts = per_color.sum(axis=1)
+
+    # Zaman çizelgesi: kareler eşit kutulara toplanır, kutu başına ortalama sayı (boş kutular atlanır)
+    bins = min(REPORT_SETTINGS['TIMELINE_BINS'], frame_total)
+    timeline = {'bin_start': [], 'total': []}
+    if bins and len(observed):
+        bin_index = observed * bins // frame_total
+        bin_sizes = np.bincount(bin_index, minlength=bins)
+        filled = bin_sizes > 0
+        timeline['bin_start'] = (np.flatnonzero(filled) * frame_total // bins + start_frame).tolist()
+        series = {'total': counts, **{color: per_color[:, i] for i, color in enumerate(colors)}}
+        for name, values in series.items():
+            sums = np.bincount(bin_index, weights=values, minlength=bins)
+            timeline[name] = (sums[filled] / bin_sizes[filled]).round(3).tolist()
+
+    # Kesintiler: tespitin (veya rengin) ardışık karelerde kaybolduğu aralıklar
+    dropouts = {}
+    if not sampling:
+        min_dropout = REPORT_SETTINGS['MIN_DROPOUT_FRAMES']
+        dropouts['any'] = interval_summary(*frame_runs(counts == 0, start_frame), min_dropout)
+        for i, color in enumerate(colors):
+            dropouts[color] = interval_summary(*frame_runs(per_color[:, i] == 0, start_frame), min_dropout)
+
+    # Lazer modu: kare kaydından (-1 bilinmiyor)
+    laser = np.full(frame_total, -1, dtype=np.int8)
+    laser[log['frame'].to_numpy(dtype=np.int64) - start_frame] = log['laser'].to_numpy()
+    known_laser = laser >= 0
+    laser_mode = None
+    if known_laser.any():
+        # Örneklemede aralıklar anlamsızdır, yalnızca oran verilir
+        laser_mode = interval_summary(*frame_runs(laser == 1, start_frame)) if not sampling else {}
+        laser_mode['known_frames'] = int(known_laser.sum())
+        laser_mode['ratio'] = float((laser == 1).sum() / known_laser.sum())
+
+    # Kutu boyutları ve güven, renk başına
+    sizes = df.assign(width=df['bbox_x2'] - df['bbox_x1'], height=df['bbox_y2'] - df['bbox_y1'])
+    sizes = sizes.assign(area=sizes['width'] * sizes['height'])
+    box_sizes = {}
+    for color, group in sizes.groupby('color', observed=True):
+        box_sizes[color] = {name: percentile_summary(group[name].to_numpy()) for name in ('width', 'height', 'area',
+                                                                                      'confidence')}
+    diameter = np.sqrt(np.clip(sizes['area'].to_numpy(dtype=np.float64), 0, None))
+    edges = np.histogram_bin_edges(diameter, bins=20) if len(diameter) else np.zeros(1)
+    size_histogram = {'edges': edges.round(2).tolist()}
+    for i, color in enumerate(colors):
+        size_histogram[color] = np.histogram(diameter[codes == i], bins=edges)[0].tolist() if len(diameter) else []
+
+    timings = {name: percentile_summary(log[name].to_numpy()) for name in log.columns if name.endswith('_ms')}
+    report = {
+        'meta': dict(meta or {}),
+        'summary': {
+            'start_frame': int(start_frame),
+            'end_frame': int(end_frame),
+            'frames': int(frame_total),
+            'logged_frames': int(len(log)),
+            'counted_frames': int(len(observed)),
+            'detections': int(len(df)),
+            'frames_with_detections': int(np.count_nonzero(counts)),
+            'mean_per_frame': float(counts.mean()) if len(counts) else 0.0,
+            'max_per_frame': int(counts.max()) if len(counts) else 0,
+            'per_color': {color: int(per_color[:, i].sum()) for i, color in enumerate(colors)},
+        },
+        'count_distribution': np.bincount(counts).tolist() if len(counts) else [],
+        'timeline': timeline,
+        'dropouts': dropouts,
+        'laser_mode': laser_mode,
+        'box_sizes': box_sizes,
+        'size_histogram': size_histogram,
+        'timings_ms': timings,
+        'sampling': sampling_estimates(results, sampling) if sampling else None,
+    }
+    report['generated_ms'] = (time.perf_counter() - started) * 1000
+    return report
+
+
+def _table(headers, rows):
+    head = ''.join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape(_cell(v))}</td>" for v in row) + '</tr>' for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+def _cell(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def _timeline_svg(timeline, width=900, height=160):
+    series = [(name, values) for name, values in timeline.items() if name not in ('bin_start',) and values]
+    if not series:
+        return ''
+    peak = max(max(values) for _, values in series) or 1.0
+    palette = {'red': '#d62728', 'blue': '#1f77b4', 'total': '#7f7f7f'}
+    lines = []
+    for name, values in series:
+        step = width / max(1, len(values) - 1)
+        points = ' '.join(f"{i * step:.1f},{height - v / peak * (height - 10):.1f}" for i, v in enumerate(values))
+        lines.append(f'<polyline fill="none" stroke="{palette.get(name, "#2ca02c")}" stroke-width="1.5" '
+                     f'points="{points}"><title>{html.escape(name)}</title></polyline>')
+    return (f'<svg width="{width}" height="{height}" style="border:1px solid #ccc">{"".join(lines)}</svg>'
+            f"<p>Kare başı ortalama tespit (en yüksek {peak:.2f}); gri: toplam.</p>")
+
+
+def report_to_html(report):
+    """Raporu tek dosyalık, dış bağımlılıksız HTML olarak döndürür."""
+    summary = report['summary']
+    parts = [
+        "<h2>Özet</h2>",
+        _table(['Alan', 'Değer'], [(k, v) for k, v in summary.items() if k != 'per_color']
+               + [(f"tespit ({color})", count) for color, count in summary['per_color'].items()]
+               + [(k, v) for k, v in report['meta'].items()]),
+        "<h2>Renk Zaman Çizelgesi</h2>", _timeline_svg(report['timeline']),
+        "<h2>Kare Başı Tespit Sayısı Dağılımı</h2>",
+        _table(['Tespit', 'Kare'], [(n, c) for n, c in enumerate(report['count_distribution']) if c]),
+    ]
+    sampling = report['sampling']
+    if sampling:
+        parts.append(f"<h2>Örnekleme Tahminleri (%{sampling['confidence_level'] * 100:.0f} güven)</h2>")
+        parts.append(f"<p>{sampling['mode']}: {sampling['sampled_frames']} / {sampling['population_frames']} kare "
+                     f"(%{sampling['coverage'] * 100:.1f}).</p>")
+        parts.append(_table(['Ölçü', 'Ortalama', 'Alt', 'Üst', 'Örnek', 'Etkin örnek', 'Tüm aralık tahmini'],
+                            [(name, s['mean'], s['low'], s['high'], s['n'], s['n_eff'],
+                              f"{s['total_estimate'][1]:.0f} [{s['total_estimate'][0]:.0f}, "
+                              f"{s['total_estimate'][2]:.0f}]" if 'total_estimate' in s else '')
+                             for name, s in sampling['metrics'].items()]))
+    if report['dropouts']:
+        parts.append(f"<h2>Kesintiler (en az {REPORT_SETTINGS['MIN_DROPOUT_FRAMES']} kare)</h2>")
+        parts.append(_table(['Tür', 'Sayı', 'Toplam kare', 'En uzun'],
+                            [(name, d['count'], d['frames'], d['longest']) for name, d in report['dropouts'].items()]))
+        parts.append(_table(['Tür', 'Başlangıç', 'Bitiş', 'Kare'],
+                            [(name, i['start'], i['end'], i['frames']) for name, d in report['dropouts'].items()
+                             for i in d['intervals']]))
+    parts.append("<h2>Lazer Modu</h2>")
+    laser = report['laser_mode']
+    if laser and 'intervals' in laser:
+        parts.append(f"<p>{laser['count']} aralık, {laser['frames']} kare "
+                     f"(bilinen karelerin %{laser['ratio'] * 100:.1f}'i).</p>")
+        parts.append(_table(['Başlangıç', 'Bitiş', 'Kare'],
+                            [(i['start'], i['end'], i['frames']) for i in laser['intervals']]))
+    elif laser:
+        parts.append(f"<p>Örneklenen karelerin %{laser['ratio'] * 100:.1f}'i lazer modunda.</p>")
+    else:
+        parts.append("<p>Lazer modu bilgisi yok (YOLO veya eski sonuçlar).</p>")
+    percentiles = [f"p{p}" for p in REPORT_SETTINGS['PERCENTILES']]
+    stat_columns = ['count', 'mean'] + percentiles + ['max']
+    parts.append("<h2>Kutu Boyutları ve Güven</h2>")
+    parts.append(_table(['Renk', 'Ölçü'] + stat_columns,
+                        [(color, name, *[stats.get(c, '') for c in stat_columns])
+                         for color, measures in report['box_sizes'].items() for name, stats in measures.items()]))
+    parts.append("<h2>Kare Başı Süreler (ms)</h2>")
+    parts.append(_table(['Aşama'] + stat_columns,
+                        [(name, *[stats.get(c, '') for c in stat_columns])
+                         for name, stats in report['timings_ms'].items()]))
+    style = ("body{font-family:sans-serif;font-size:13px}table{border-collapse:collapse;margin:6px 0}"
+             "td,th{border:1px solid #ccc;padding:2px 6px;text-align:right}")
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>Test Raporu</title>"
+            f"<style>{style}</style></head><body><h1>Test Raporu</h1>{''.join(parts)}</body></html>")
+
+
+def write_report(report, output_path):
+    """Raporu uzantıya göre JSON veya HTML olarak yazar."""
+    if output_path.lower().endswith('.json'):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(report_to_html(report))
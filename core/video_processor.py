@@ -4,11 +4,12 @@ from PyQt5.QtCore import QObject, pyqtSignal, QTimer, pyqtSlot, Qt
 import time
 from ..config import VIDEO_SETTINGS
 from .detector import BalloonDetector
+from .visualization import render_for_display, draw_ellipse_detections, render_debug_view
 import logging
 from collections import deque
 from balloon_detector.core.pid_controller import PIDController
+from balloon_detector.utils.telemetry import get_telemetry
 class VideoProcessor(QObject):
-    frame_processed = pyqtSignal(object, dict)  # frame ve stats
     progress_updated = pyqtSignal(int, int)  # mevcut_kare, toplam_kare
     performance_metrics = pyqtSignal(dict)  # Performans metrikleri için yeni sinyal
     finished = pyqtSignal()  # Thread'i durdurmak için
@@ -25,9 +26,13 @@ class VideoProcessor(QObject):
         self.native_fps = 0     # Videonun orijinal FPS'i
         self.current_preset = "Varsayılan"
         self.total_frames = 0
-        # --- Kontur Gösterme ---
+        # Görüntülenecek kareler GUI'ye bu kutu üzerinden gider (bkz. DisplayMailbox)
+        self.display_mailbox = None
+        # --- Kontur Gösterme (hata ayıklama görünümü) ---
         self.show_contours_flag = False
-        self._contour_window_name = "Konturlar ve Maske (OpenCV)"
+        self.debug_view_mode = 'combined' # bkz. visualization.DEBUG_VIEW_MODES
+        self.debug_view_interval = 1.0 / VIDEO_SETTINGS.get('DEBUG_VIEW_FPS', 10)
+        self._last_debug_render = 0.0
         
         # FPS ve Metrik Hesaplama için Değişkenler
         self.fps_window = VIDEO_SETTINGS.get('FPS_WINDOW', 60) # config'den al, yoksa 60
@@ -42,9 +47,9 @@ class VideoProcessor(QObject):
         # Frame işleme sinyalini bağla
         self.process_next.connect(self._process_next_frame)
         
-        # Logging ayarları
-        logging.basicConfig(level=logging.INFO)
+        # Logging ayarları (yapılandırma main.py'de, bkz. utils.telemetry.configure_logging)
         self.logger = logging.getLogger('VideoProcessor')
+        self.telemetry = get_telemetry() # Kare bazlı kayıtlar için hız sınırlı kanal
         # PID kontrolcü (örnek: yatay eksende hedefe odaklanma)
         self.pid = PIDController(kp=0.1, ki=0.01, kd=0.05)  
 
@@ -107,8 +112,6 @@ class VideoProcessor(QObject):
         if self.cap:
             self.cap.release()
             self.cap = None
-        if self.show_contours_flag:
-            cv2.destroyWindow(self._contour_window_name) # Pencereyi kapat
         self.finished.emit() # Thread çıkışı için sinyal gönder
         self.logger.info("Video işlemci tamamen durduruldu.")
     
@@ -154,19 +157,30 @@ class VideoProcessor(QObject):
             detections, combined_mask = self.detector.detect(frame, self.hsv_values)
             detection_time = (time.perf_counter() - detection_start) * 1000
             
-            # Görselleştirme süresi
-            vis_start = time.perf_counter()
-            frame_with_detections = self._visualize_detections(frame.copy(), detections)
-            vis_time = (time.perf_counter() - vis_start) * 1000
+            # Görselleştirme süresi (sadece GUI bir önceki kareyi aldıysa çizilir)
+            frame_with_detections = None
+            vis_time = 0.0
+            if self._display_wants_frame():
+                vis_start = time.perf_counter()
+                frame_with_detections = self._visualize_detections(frame, detections)
+                vis_time = (time.perf_counter() - vis_start) * 1000
+            
+            # Hata ayıklama görünümü süresi (kısıtlı hızda, ayrı aşama olarak ölçülür)
+            debug_time = 0.0
+            if self._debug_view_due():
+                debug_start = time.perf_counter()
+                self._render_debug_view(detections)
+                debug_time = (time.perf_counter() - debug_start) * 1000
             
             # Toplam işleme süresi
-            total_time = capture_time + detection_time + vis_time
+            total_time = capture_time + detection_time + vis_time + debug_time
 
             # Zamanlama verilerini deque'ye ekle
             timing_data = {
                 'capture': capture_time,
                 'detect': detection_time,
                 'vis': vis_time,
+                'debug': debug_time,
                 'total': total_time
             }
             self.frame_timing_history.append(timing_data)
@@ -192,6 +206,7 @@ class VideoProcessor(QObject):
                     'avg_detection_time': round(float(np.mean([t['detect'] for t in metric_data])), 2),
                     'avg_visualization_time': round(float(np.mean([t['vis'] for t in metric_data])), 2),
                     'avg_capture_time': round(float(np.mean([t['capture'] for t in metric_data])), 2),
+                    'avg_debug_view_time': round(float(np.mean([t['debug'] for t in metric_data])), 2),
                     'avg_fps': round(self.processing_fps, 1) # Zaten hesaplandı
                 }
                 self.performance_metrics.emit(metrics)
@@ -208,18 +223,8 @@ class VideoProcessor(QObject):
             })
             
             # Frame'i ve istatistikleri gönder
-            self.frame_processed.emit(frame_with_detections, stats)
-
-            # --- Konturları Göster (eğer aktifse) ---
-            if self.show_contours_flag:
-                try:
-                    # Maskeyi BGR'ye çevirip renklendirme (opsiyonel)
-                    mask_display = cv2.cvtColor(combined_mask, cv2.COLOR_GRAY2BGR)
-                    # Konturları maske üzerinde çiz (opsiyonel, zaten tespitte kullanıldı)
-                    # cv2.drawContours(mask_display, [d['contour'] for d in detections if 'contour' in d], -1, (0, 255, 0), 1)
-                    cv2.imshow(self._contour_window_name, mask_display)
-                except Exception as e_vis:
-                    self.logger.warning(f"Kontur penceresi gösterilirken hata: {e_vis}")
+            if frame_with_detections is not None:
+                self.display_mailbox.post(frame_with_detections, stats)
 
             # Hedef FPS'e göre bekleme süresi
             target_latency = 1000 / self.target_fps
@@ -229,24 +234,26 @@ class VideoProcessor(QObject):
             if self.running and not self.paused: # Planlamadan önce tekrar çalışıyor mu kontrol et
                 QTimer.singleShot(int(remaining_time), self.process_next.emit)
 
-            # --- OpenCV Pencere Güncellemesi İçin ---
-            # Eğer cv2.imshow kullanılıyorsa, olayları işlemek için küçük bir bekleme gerekir.
-            # cv2.waitKey(1) # Çok küçük tut, 1ms yeterli olmalı
             # --- PID Uygulaması (sadece ilk tespit için örnek) ---
+            pid_output = None
+            pid_target = None
+            pid_current = None
             if detections:
             # İlk tespit edilen balonun merkezini al (ellipse.center)
-                cx = detections[0]['ellipse']['center'][0]
-                frame_center_x = frame.shape[1] / 2
+                pid_current = detections[0]['ellipse']['center'][0]
+                pid_target = frame.shape[1] / 2
 
             # PID çıktısını hesapla
-                output = self.pid.update(target_value=frame_center_x, current_value=cx)
-
-            # Konsola yaz veya logla
-                self.logger.info(f"PID Output: {output:.2f} (Target: {frame_center_x}, Current: {cx})")
+                pid_output = self.pid.update(target_value=pid_target, current_value=pid_current)
 
+            # Telemetriye yaz (biçimlendirme ve G/Ç arka planda yapılır)
             # İstersen bu output'u GUI'de bir label'a da iletebilirsin
-            # Frame'i ve istatistikleri gönder
-            self.frame_processed.emit(frame_with_detections, stats)
+            self.telemetry.record('frame', source='opencv', frame=current_frame,
+                                  capture=capture_time, detect=detection_time, vis=vis_time,
+                                  debug=debug_time, total=total_time,
+                                  blue=stats['blue_count'], red=stats['red_count'],
+                                  laser=self.detector.use_laser_mode,
+                                  pid=pid_output, pid_target=pid_target, pid_current=pid_current)
         except Exception as e:
             # Daha iyi hata ayıklama için traceback ekle
             self.logger.error(f"Frame işleme hatası: {str(e)}", exc_info=True)
@@ -261,7 +268,7 @@ class VideoProcessor(QObject):
             detection_time = (time.perf_counter() - detection_start) * 1000
             
             vis_start = time.perf_counter()
-            frame_with_detections = self._visualize_detections(frame.copy(), detections)
+            frame_with_detections = self._visualize_detections(frame, detections)
             vis_time = (time.perf_counter() - vis_start) * 1000
             
             total_time = detection_time + vis_time
@@ -276,29 +283,36 @@ class VideoProcessor(QObject):
                 'capture_time': 0 # Yakalama yok
             })
             
-            self.frame_processed.emit(frame_with_detections, stats)
+            if self.display_mailbox is not None:
+                self.display_mailbox.post(frame_with_detections, stats) # Tek kare her zaman gösterilir
             
         except Exception as e:
             self.logger.error(f"Tek kare işleme hatası: {str(e)}", exc_info=True)
     
+    def _display_wants_frame(self):
+        """GUI bir sonraki kareyi gösterecek durumdaysa True döner."""
+        return self.display_mailbox is not None and self.display_mailbox.wants_frame()
+
     def _visualize_detections(self, frame, detections):
-        for detection in detections:
-            color = (0, 0, 255) if detection["color"] == "red" else (255, 0, 0)
-            
-            # Elipsi çiz
-            ellipse = detection["ellipse"]
-            cv2.ellipse(frame,
-                       (int(ellipse["center"][0]), int(ellipse["center"][1])),
-                       (int(ellipse["axes"][0]/2), int(ellipse["axes"][1]/2)),
-                       ellipse["angle"], 0, 360, color, 2)
-            
-            # Bilgi metnini yaz
-            x1, y1 = detection["bbox"][:2]
-            text = f"{detection['color']} {detection['confidence']:.2f}"
-            cv2.putText(frame, text, (x1, y1 - 10),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        
-        return frame
+        """Kareyi gösterim boyutuna indirir ve tespitleri o çözünürlükte çizer."""
+        target_size = self.display_mailbox.target_size() if self.display_mailbox else (0, 0)
+        return render_for_display(frame, detections, target_size, draw_ellipse_detections)
+
+    def _debug_view_due(self):
+        """Görünüm açık, GUI son kareyi almış ve kısıtlama aralığı dolmuşsa True."""
+        if not self.show_contours_flag or self.display_mailbox is None:
+            return False
+        if time.perf_counter() - self._last_debug_render < self.debug_view_interval:
+            return False
+        return self.display_mailbox.wants_frame('debug')
+
+    def _render_debug_view(self, detections):
+        if self.detector.last_masks is None:
+            return
+        self._last_debug_render = time.perf_counter()
+        view = render_debug_view(self.detector.last_masks, self.detector.last_contours, detections,
+                                 self.debug_view_mode, self.display_mailbox.target_size('debug'))
+        self.display_mailbox.post(view, {'view_mode': self.debug_view_mode}, channel='debug')
     
     def _prepare_stats(self, detections):
         return {
@@ -337,12 +351,15 @@ class VideoProcessor(QObject):
 
     @pyqtSlot(bool)
     def set_show_contours(self, enabled):
-        """Kontur gösterme penceresini açar veya kapatır."""
+        """Maske/kontur hata ayıklama görünümünü açar veya kapatır."""
         self.show_contours_flag = enabled
-        if not enabled:
-            try:
-                cv2.destroyWindow(self._contour_window_name)
-            except Exception: pass # Pencere zaten kapalıysa hata vermesin
+        self._last_debug_render = 0.0
+
+    @pyqtSlot(str)
+    def set_debug_view_mode(self, view_mode):
+        """Hata ayıklama görünümünde gösterilecek maskeyi seçer."""
+        self.debug_view_mode = view_mode
+        self._last_debug_render = 0.0
     
     def set_preset(self, name, values):
         self.current_preset = name
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+RED_BGR = (0, 0, 255)
+BLUE_BGR = (255, 0, 0)
+UNKNOWN_BGR = (0, 255, 0) # Bilinmeyen sınıflar için yeşil
+KEYFRAME_BGR = (0, 200, 0) # Ana kare (YOLO çalıştı) etiketi
+PROPAGATED_BGR = (0, 165, 255) # Taşınmış kare etiketi
+CANDIDATE_BGR = (0, 255, 255) # Filtrelenmeden önceki tüm konturlar
+
+# Hata ayıklama görünümü seçenekleri: maske anahtarı veya aday kaplaması
+DEBUG_VIEW_MODES = ('red', 'blue', 'combined', 'candidates')
+
+
+def detection_color_bgr(color_name):
+    if color_name == "red":
+        return RED_BGR
+    if color_name == "blue":
+        return BLUE_BGR
+    return UNKNOWN_BGR
+
+
+def fit_to_display(frame, target_size):
+    """Kareyi oranını koruyarak hedef boyuta sığdırır; (kare, ölçek) döndürür.
+
+    Sadece küçültme yapılır (INTER_AREA ile, tek seferde). Hedef boyut
+    bilinmiyorsa veya kare zaten küçükse kare kopyalanmadan aynen döner;
+    büyütmeyi gerekirse Qt yapar.
+    """
+    target_w, target_h = target_size
+    h, w = frame.shape[:2]
+    if target_w <= 0 or target_h <= 0:
+        return frame, 1.0
+    scale = min(target_w / w, target_h / h)
+    if scale >= 1.0:
+        return frame, 1.0
+    new_size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, new_size, interpolation=cv2.INTER_AREA), scale
+
+
+def draw_ellipse_detections(frame, detections, scale=1.0):
+    """OpenCV (HSV) tespitlerini elips ve etiket olarak çizer (yerinde)."""
+    for detection in detections:
+        color = detection_color_bgr(detection["color"])
+
+        # Elipsi çiz
+        ellipse = detection["ellipse"]
+        cv2.ellipse(frame,
+                    (int(ellipse["center"][0] * scale), int(ellipse["center"][1] * scale)),
+                    (int(ellipse["axes"][0] * scale / 2), int(ellipse["axes"][1] * scale / 2)),
+                    ellipse["angle"], 0, 360, color, 2)
+
+        # Bilgi metnini yaz
+        x1, y1 = detection["bbox"][:2]
+        text = f"{detection['color']} {detection['confidence']:.2f}"
+        cv2.putText(frame, text, (int(x1 * scale), int(y1 * scale) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    return frame
+
+
+def draw_box_detections(frame, detections, scale=1.0):
+    """YOLO tespitlerini kutu ve etiket olarak çizer (yerinde)."""
+    for detection in detections:
+        x1, y1, x2, y2 = [int(v * scale) for v in detection["bbox"]]
+        color_bgr = detection_color_bgr(detection["color"])
+        propagated = detection.get("propagated", False) # Ana kare modunda optik akışla taşınmış kutu
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color_bgr, 1 if propagated else 2)
+        label = f"{detection['color']} {detection['confidence']:.2f}" + (" ~" if propagated else "")
+        cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_bgr, 2)
+    return frame
+
+
+def draw_keyframe_tag(frame, keyframe):
+    """Karenin YOLO ile mi işlendiğini yoksa taşındığını sol üst köşeye yazar (yerinde)."""
+    text, color = ("YOLO", KEYFRAME_BGR) if keyframe else ("TASINDI", PROPAGATED_BGR)
+    cv2.putText(frame, text, (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return frame
+
+
+def render_for_display(frame, detections, target_size, draw_fn):
+    """Kareyi gösterim boyutuna indirip tespitleri o çözünürlükte çizer.
+
+    Not: Küçültme gerekmiyorsa çizim doğrudan verilen kare üzerine yapılır,
+    bu yüzden çağıran taraf kareyi sonrasında ham haliyle kullanmamalıdır.
+    """
+    display_frame, scale = fit_to_display(frame, target_size)
+    return draw_fn(display_frame, detections, scale)
+
+
+def render_debug_view(masks, contours, detections, view_mode, target_size):
+    """Maske / aday kontur görünümünü gösterim çözünürlüğünde üretir.
+
+    Maske önce küçültülür, renk dönüşümü ve çizim küçük görüntü üzerinde yapılır.
+    """
+    mask_key = 'combined' if view_mode == 'candidates' else view_mode
+    small_mask, scale = fit_to_display(masks[mask_key], target_size)
+    view = cv2.cvtColor(small_mask, cv2.COLOR_GRAY2BGR)
+    if view_mode == 'candidates':
+        if scale != 1.0:
+            contours = [(c * scale).astype(np.int32) for c in contours]
+        cv2.drawContours(view, contours, -1, CANDIDATE_BGR, 1)
+        draw_ellipse_detections(view, detections, scale)
+    return view
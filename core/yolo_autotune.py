@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import logging
+import platform
+import itertools
+import numpy as np
+from ..config import YOLO_SETTINGS
+from .model_registry import get_model_registry
+from .yolo_results import result_arrays, box_agreement, predict_filter_kwargs
+
+logger = logging.getLogger('YoloAutotune')
+
+
+def machine_id():
+    """Profilleri makineye bağlamak için kısa tanımlayıcı (ana makine, mimari, çekirdek)."""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def _profile_key(model_path):
+    return f"{get_model_registry().file_hash(model_path)}|{machine_id()}"
+
+
+def _read_profiles(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Profil dosyası okunamadı ({path}): {e}")
+        return {}
+
+
+def load_profile(model_path, path=None):
+    """Model + makine için kaydedilmiş en iyi profili döndürür; yoksa None."""
+    path = path or YOLO_SETTINGS['PROFILE_FILE']
+    if not model_path or not os.path.exists(model_path):
+        return None
+    return _read_profiles(path).get(_profile_key(model_path))
+
+
+def save_profile(model_path, profile, path=None):
+    path = path or YOLO_SETTINGS['PROFILE_FILE']
+    profiles = _read_profiles(path)
+    profiles[_profile_key(model_path)] = profile
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(profiles, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def apply_torch_threads(threads):
+    """PyTorch operatör thread sayısını ayarlar (süreç geneli); önceki değeri döndürür."""
+    import torch
+    previous = torch.get_num_threads()
+    if threads:
+        torch.set_num_threads(threads)
+    return previous
+
+
+def _run_config(model_path, frames, backend, imgsz, threads, batch_size, device, default_threads,
+                calibration_video=None):
+    registry = get_model_registry()
+    if backend.startswith('onnx'):
+        model = registry.get(model_path, device, backend=backend, intra_op_threads=threads or 0,
+                             calibration_video=calibration_video)
+    else:
+        apply_torch_threads(threads or default_threads)
+        model = registry.get(model_path, device, backend=backend)
+    kwargs = dict(predict_filter_kwargs(), device=model.device, verbose=False)
+    if imgsz:
+        kwargs['imgsz'] = imgsz
+    model(frames[:batch_size], **kwargs) # Bu boyut/batch için ısınma
+
+    outputs = []
+    batch_latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batch_start = time.perf_counter()
+        results = model(frames[i:i + batch_size], **kwargs)
+        batch_latencies.append((time.perf_counter() - batch_start) * 1000)
+        outputs.extend(result_arrays(r)[0] for r in results)
+    wall_ms = (time.perf_counter() - start) * 1000
+    return outputs, np.array(batch_latencies), wall_ms
+
+
+def run_autotune(model_path, frames, imgsz_values=(320, 480, 640), thread_values=(None,),
+                 batch_values=(1, 2, 4), backends=('torch', 'onnx'), max_latency_ms=None,
+                 min_agreement=None, device='cpu', progress=None, calibration_video=None):
+    """Ayar ızgarasını verilen kareler üzerinde ölçer.
+
+    Referans: PyTorch, model varsayılan imgsz, batch 1. Her konfigürasyon için
+    verim (FPS), batch gecikmesi (ortalama/p95; canlı modda bir karenin
+    bekleyebileceği süre) ve referansla IoU >= 0.5 eşleşme oranı hesaplanır.
+    (sonuçlar, en_iyi) döndürür; en iyi, gecikme ve uyum sınırlarını geçenler
+    arasında en yüksek FPS'li konfigürasyondur. 'onnx-int8' arka ucu
+    calibration_video ile kalibre edilir (verilmezse dinamik niceleme).
+    """
+    if max_latency_ms is None:
+        max_latency_ms = YOLO_SETTINGS['AUTOTUNE_MAX_LATENCY_MS']
+    if min_agreement is None:
+        min_agreement = YOLO_SETTINGS['AUTOTUNE_MIN_AGREEMENT']
+
+    default_threads = apply_torch_threads(None)
+    reference, _, _ = _run_config(model_path, frames, 'torch', None, None, 1, device, default_threads)
+
+    grid = list(itertools.product(backends, imgsz_values, thread_values, batch_values))
+    results = []
+    for idx, (backend, imgsz, threads, batch_size) in enumerate(grid):
+        if progress:
+            progress(idx, len(grid), backend, imgsz, threads, batch_size)
+        try:
+            outputs, latencies, wall_ms = _run_config(model_path, frames, backend, imgsz,
+                                                      threads, batch_size, device, default_threads,
+                                                      calibration_video)
+        except Exception as e:
+            logger.warning(f"Konfigürasyon atlandı ({backend}, {imgsz}, {threads}, {batch_size}): {e}")
+            continue
+        agreement = float(np.mean([box_agreement(a, b) for a, b in zip(reference, outputs)]))
+        results.append({
+            'backend': backend,
+            'imgsz': imgsz,
+            'threads': threads,
+            'batch_size': batch_size,
+            'fps': round(len(frames) * 1000.0 / wall_ms, 2) if wall_ms > 0 else 0.0,
+            'mean_latency_ms': round(float(latencies.mean()), 3),
+            'p95_latency_ms': round(float(np.percentile(latencies, 95)), 3),
+            'agreement': round(agreement, 4),
+        })
+
+    eligible = [r for r in results
+                if r['p95_latency_ms'] <= max_latency_ms and r['agreement'] >= min_agreement]
+    best = max(eligible, key=lambda r: r['fps']) if eligible else None
+    apply_torch_threads(default_threads) # Ölçüm sırasında değişen thread sayısını geri al
+    return results, best
+
+
+def make_profile(best, video_path, frame_count):
+    profile = {k: best[k] for k in ('backend', 'imgsz', 'threads', 'batch_size')}
+    profile.update({
+        'fps': best['fps'],
+        'p95_latency_ms': best['p95_latency_ms'],
+        'agreement': best['agreement'],
+        'video': os.path.basename(video_path),
+        'frames': frame_count,
+        'tuned_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    })
+    return profile
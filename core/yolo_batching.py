@@ -0,0 +1,243 @@
+import time
+import queue
+import logging
+import threading
+import cv2
+import numpy as np
+
+_END_OF_STREAM = None
+
+
+def read_frames(video_path, start_frame, count):
+    """Videodan en fazla count kareyi belleğe okur (ölçüm/ayar araçları için)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def sample_frames(video_path, count, start_frame=0, end_frame=None):
+    """[start_frame, end_frame) aralığından eşit aralıklı en fazla count kare okur."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    end_frame = total if end_frame is None else min(end_frame, total)
+    frames = []
+    if end_frame > start_frame:
+        positions = np.unique(np.linspace(start_frame, end_frame - 1, count).astype(int))
+        for pos in positions:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(pos))
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+    cap.release()
+    return frames
+
+
+class FramePrefetcher:
+    """VideoCapture'dan kareleri arka plan thread'inde okuyup sınırlı bir kuyruğa koyar.
+
+    Çalışırken VideoCapture'a yalnızca bu thread dokunur; konum değiştirmek
+    (seek) için önce stop() çağrılmalıdır. Kuyruk elemanları (kare_no, kare)
+    çiftleridir; akış bittiğinde get() None döndürür.
+
+    Örnekleme: positions verilirse yalnızca bu (artan) kareler okunur;
+    budget_s verilirse kareler süre dolana kadar aralığa eşit yayılarak
+    seçilir. Aradaki kısa boşluklar çözülmeden grab() ile, uzunları
+    konumlanarak atlanır.
+    """
+
+    def __init__(self, cap, start_frame, end_frame=None, queue_size=16, loop=False, positions=None, budget_s=None,
+                 max_grab_gap=120):
+        self.cap = cap
+        self.start_frame = start_frame
+        self.end_frame = end_frame  # None ise videonun sonuna kadar
+        self.loop = loop            # Canlı mod: sona gelince başa dön
+        self.positions = positions
+        self.budget_s = budget_s
+        self.max_grab_gap = max_grab_gap
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.read_error_frame = None  # Okunamayan ilk kare (varsa)
+        self.logger = logging.getLogger('FramePrefetcher')
+
+    def start(self):
+        self._stop_event.clear()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+        self._thread = threading.Thread(target=self._read_loop, name='FramePrefetcher', daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """Okuma thread'ini durdurur ve kuyrukta kalan kareleri atar."""
+        self._stop_event.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                self._drain()
+                self._thread.join(0.05)
+            self._thread = None
+        self._drain()
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _put(self, item):
+        """Kuyruk doluysa yer açılana veya durdurulana kadar bekler."""
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.05)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _budget_positions(self):
+        """Süre sınırlı örnekleme: tüketim hızına göre adımı sürekli yeniden hesaplar.
+
+        Kuyruk dolunca okuma tüketiciyi beklediğinden üretilen kare / geçen
+        süre, kare başına toplam maliyeti (çözme + tespit) yansıtır. Kalan
+        süreyle işlenebilecek kare sayısı kalan aralığa eşit aralıklarla
+        dağıtılır.
+        """
+        started = time.perf_counter()
+        position, produced = self.start_frame, 0
+        while position < self.end_frame:
+            yield position
+            produced += 1
+            elapsed = time.perf_counter() - started
+            remaining = self.budget_s - elapsed
+            if remaining <= 0:
+                return
+            affordable = max(1.0, remaining * produced / max(elapsed, 1e-6))
+            position += max(1, int(np.ceil((self.end_frame - position - 1) / affordable)))
+
+    def _read_sampled(self):
+        positions = self.positions if self.positions is not None else self._budget_positions()
+        current = self.start_frame # start() VideoCapture'ı buraya konumladı
+        for frame_num in positions:
+            if self._stop_event.is_set():
+                return
+            gap = frame_num - current
+            if gap < 0 or gap > self.max_grab_gap:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_num))
+            else:
+                for _ in range(gap):
+                    if not self.cap.grab():
+                        break
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                self.read_error_frame = int(frame_num)
+                break
+            if not self._put((int(frame_num), frame)):
+                return
+            current = frame_num + 1
+        self._put(_END_OF_STREAM)
+
+    def _read_loop(self):
+        if self.positions is not None or self.budget_s is not None:
+            self._read_sampled()
+            return
+        frame_num = self.start_frame
+        while not self._stop_event.is_set():
+            if self.end_frame is not None and frame_num >= self.end_frame:
+                break
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                if self.loop and frame_num > 0:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    frame_num = 0
+                    continue
+                self.read_error_frame = frame_num
+                break
+            if not self._put((frame_num, frame)):
+                return
+            frame_num += 1
+        self._put(_END_OF_STREAM)
+
+    def get(self, timeout=None):
+        """Sıradaki (kare_no, kare) çiftini döndürür; akış bittiyse veya durdurulduysa None.
+
+        timeout verilir ve dolarsa queue.Empty fırlatılır.
+        """
+        if timeout is not None:
+            return self._queue.get(timeout=timeout)
+        while True:
+            try:
+                return self._queue.get(timeout=0.1)
+            except queue.Empty:
+                # Başka bir thread stop() çağırdıysa sonsuza kadar bekleme
+                if self._stop_event.is_set():
+                    return _END_OF_STREAM
+
+
+class BatchedYoloInference:
+    """Önden okunan karelerden toplu (batch) YOLO çıkarımı yapar.
+
+    Kareler kuyruktan batch_size kadar toplanır ve tek bir model çağrısına
+    verilir; sonuçlar kare sırasıyla geri döner. max_batch_latency_ms verilirse
+    (canlı mod) ilk kare geldikten sonra bu süre dolunca batch eksik de olsa
+    çalıştırılır.
+    """
+
+    def __init__(self, model, batch_size=8, max_batch_latency_ms=None, **predict_kwargs):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_batch_latency_ms = max_batch_latency_ms
+        self.predict_kwargs = predict_kwargs
+        self.finished = False  # Akışın sonu görüldü mü
+
+    def collect(self, prefetcher):
+        """Prefetcher'dan bir batch toplar; akış bittiyse boş liste döner."""
+        if self.finished:
+            return []
+        items = []
+        first = prefetcher.get()
+        if first is _END_OF_STREAM:
+            self.finished = True
+            return items
+        items.append(first)
+        deadline = None
+        if self.max_batch_latency_ms is not None:
+            deadline = time.perf_counter() + self.max_batch_latency_ms / 1000.0
+        while len(items) < self.batch_size:
+            try:
+                if deadline is None:
+                    item = prefetcher.get()
+                else:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    item = prefetcher.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _END_OF_STREAM:
+                self.finished = True
+                break
+            items.append(item)
+        return items
+
+    def infer(self, items):
+        """[(kare_no, kare), ...] için tek model çağrısı yapar.
+
+        [(kare_no, kare, sonuç), ...] listesini giriş sırasıyla döndürür.
+        """
+        if not items:
+            return []
+        results = self.model([frame for _, frame in items], verbose=False, **self.predict_kwargs)
+        return [(frame_num, frame, result) for (frame_num, frame), result in zip(items, results)]
@@ -2,10 +2,19 @@ import cv2
 import numpy as np
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer, pyqtSlot, Qt
 import time
-from ..config import VIDEO_SETTINGS
+from ..config import VIDEO_SETTINGS, YOLO_SETTINGS
+from .yolo_batching import FramePrefetcher, BatchedYoloInference
+from .model_registry import get_model_registry
+from .hybrid_detector import HybridDetector
+from .yolo_results import result_arrays, class_names, predict_filter_kwargs
+from .yolo_autotune import load_profile, apply_torch_threads
+from .keyframe_tracker import KeyframePropagator
+from .cascade_detector import CascadeDetector
+from .visualization import render_for_display, draw_box_detections, draw_keyframe_tag
 import logging
 from collections import deque
 import torch
+from balloon_detector.utils.telemetry import get_telemetry
 
 # --- Ultralytics gerektirir ---
 try:
@@ -16,11 +25,11 @@ except ImportError:
 # --- ---
 
 class YoloProcessor(QObject):
-    frame_processed = pyqtSignal(object, dict)  # frame ve istatistikler
     progress_updated = pyqtSignal(int, int)  # mevcut_kare, toplam_kare
     finished = pyqtSignal()
     error_occurred = pyqtSignal(str)
     model_loaded = pyqtSignal(bool, str) # Başarı (bool), mesaj/hata (str)
+    profile_applied = pyqtSignal(dict) # Otomatik ayar profili uygulandığında (arka uç GUI'de eşitlenir)
     process_next = pyqtSignal()
 
     # --- Sınıf Eşleştirme ---
@@ -51,9 +60,37 @@ class YoloProcessor(QObject):
         self.processing_fps = 0
         self.target_fps = VIDEO_SETTINGS.get('TARGET_FPS', 30)
         self.frame_timing_history = deque(maxlen=60) # FPS hesaplaması için
+        self.display_mailbox = None # Görüntülenecek kareler GUI'ye bu kutu üzerinden gider
+
+        # Batch çıkarım: kareler önden okunur, gecikme sınırı içinde batch'lenir
+        self.batch_size = YOLO_SETTINGS.get('LIVE_BATCH_SIZE', 1)
+        self.max_batch_latency_ms = YOLO_SETTINGS.get('LIVE_MAX_BATCH_LATENCY_MS', 40)
+        self._prefetcher = None
+        self._batcher = None
+        self._pending_frames = deque() # (kare_no, kare, tespitler, kare_başı_çıkarım_ms)
+        self._next_frame_pos = 0
+        self.backend = YOLO_SETTINGS.get('BACKEND', 'torch') # 'torch', 'onnx' (ONNX Runtime CPU) veya 'onnx-int8'
+        self.video_path = None # int8 modeli bu videodan alınan karelerle kalibre edilir
+        self.imgsz = None # None: modelin varsayılan giriş boyutu
+        self.onnx_threads = None # None: YOLO_SETTINGS değeri
+        self._profiled_model_path = None # Profili uygulanmış son model
+
+        # Hibrit mod: HSV adayları YOLO kırpıntılarıyla doğrulanır (preset değerleri gerekir)
+        self.hybrid_mode = False
+        self.hsv_values = None
+        self.current_preset = None
+        self._hybrid_detector = None
+
+        # Ana kare modu: YOLO her K karede bir, aradaki karelerde kutular taşınır
+        self.keyframe_mode = False
+        self._keyframes = KeyframePropagator()
+
+        # Kademeli mod: önce küçük giriş boyutu, belirsiz karelerde tam boyut
+        self.cascade_mode = False
+        self._cascade = None
 
-        logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger('YoloProcessor')
+        self.telemetry = get_telemetry()
 
         # Cihazı belirle
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
@@ -68,13 +105,18 @@ class YoloProcessor(QObject):
             return
         try:
             self.logger.info(f"YOLO modeli yükleniyor: {model_path}")
-            self.model = YOLO(model_path)
-            # Modelin cihaza yüklendiğinden emin olmak için sahte bir çıkarım yapın
-            # Küçük bir sahte görüntü kullanın
-            dummy_img = np.zeros((64, 64, 3), dtype=np.uint8)
-            self.model(dummy_img, device=self.device, verbose=False)
+            self._reset_prefetch(self._next_frame_pos) # Batcher eski modeli tutmasın
+            if model_path != self._profiled_model_path:
+                self._profiled_model_path = model_path
+                self._apply_saved_profile(model_path)
+            # Model süreç genelindeki kayıt defterinden gelir: ilk seferde
+            # yüklenip ısıtılır, mod değişiminde diskten tekrar okunmaz
+            self.model = get_model_registry().get(model_path, self.device, backend=self.backend,
+                                                  intra_op_threads=self.onnx_threads,
+                                                  calibration_video=self.video_path)
             self.model_path = model_path
-            self.logger.info(f"YOLO modeli başarıyla {self.device} cihazına yüklendi.")
+            self.logger.info(f"YOLO modeli {self.model.backend}/{self.model.device} üzerinde hazır "
+                             f"(yükleme {self.model.load_ms:.0f} ms, ısınma {self.model.warmup_ms:.0f} ms).")
             self.model_loaded.emit(True, f"Model yüklendi: {model_path}")
         except Exception as e:
             error_msg = f"YOLO modeli yüklenemedi: {str(e)}"
@@ -84,7 +126,72 @@ class YoloProcessor(QObject):
             self.model_loaded.emit(False, error_msg)
             self.error_occurred.emit(error_msg)
 
+    def _apply_saved_profile(self, model_path):
+        """Bu model + makine için otomatik ayar profili varsa uygular."""
+        if not YOLO_SETTINGS.get('AUTO_APPLY_PROFILE', True):
+            return
+        profile = load_profile(model_path)
+        if not profile:
+            return
+        self.backend = profile['backend']
+        self.imgsz = profile.get('imgsz')
+        self.batch_size = profile.get('batch_size') or self.batch_size
+        if self.backend.startswith('onnx'):
+            self.onnx_threads = profile.get('threads')
+        else:
+            apply_torch_threads(profile.get('threads'))
+        self.logger.info(f"Otomatik ayar profili uygulandı: {profile['backend']}, imgsz={self.imgsz}, "
+                         f"thread={profile.get('threads')}, batch={self.batch_size}")
+        self.profile_applied.emit(profile)
+
+    def _predict_kwargs(self):
+        kwargs = predict_filter_kwargs()
+        if self.imgsz:
+            kwargs['imgsz'] = self.imgsz
+        return kwargs
+
+    @pyqtSlot(str)
+    def set_backend(self, backend):
+        """Çıkarım arka ucunu değiştirir; yüklü bir model varsa yeni arka uçla tekrar yükler."""
+        if backend == self.backend:
+            return
+        self.backend = backend
+        if self.model_path:
+            self.load_model(self.model_path)
+
+    @pyqtSlot(bool)
+    def set_hybrid_mode(self, enabled):
+        """Hibrit modu açar/kapatır; önden işlenmiş kareler yeni moda göre yeniden işlenir."""
+        if enabled == self.hybrid_mode:
+            return
+        self.hybrid_mode = enabled
+        self._hybrid_detector = None
+        self._reset_prefetch(self._next_frame_pos)
+
+    @pyqtSlot(bool)
+    def set_keyframe_mode(self, enabled):
+        """Ana kare modunu açar/kapatır; önden işlenmiş kareler yeni moda göre yeniden işlenir."""
+        if enabled == self.keyframe_mode:
+            return
+        self.keyframe_mode = enabled
+        self._reset_prefetch(self._next_frame_pos)
+
+    @pyqtSlot(bool)
+    def set_cascade_mode(self, enabled):
+        """Kademeli çözünürlük modunu açar/kapatır."""
+        if enabled == self.cascade_mode:
+            return
+        self.cascade_mode = enabled
+        self._cascade = None
+        self._reset_prefetch(self._next_frame_pos)
+
+    def set_preset(self, name, values):
+        """Hibrit modun kullandığı HSV değerlerini ayarlar."""
+        self.current_preset = name
+        self.hsv_values = values
+
     def set_video(self, video_path):
+        self._reset_prefetch(0)
         if self.cap:
             self.cap.release()
             self.native_fps = 0
@@ -93,6 +200,9 @@ class YoloProcessor(QObject):
             self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
             self.native_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.get(cv2.CAP_PROP_FPS) > 0 else 0
             self.logger.info(f"Video set for YOLO: {video_path}, Frames: {self.total_frames}, FPS: {self.native_fps:.2f}")
+            previous_video, self.video_path = self.video_path, video_path
+            if self.backend == 'onnx-int8' and self.model_path and previous_video != video_path:
+                self.load_model(self.model_path) # int8 modelini yeni videoyla kalibre et (önbellekte varsa hızlı)
         else:
             self.logger.error(f"Failed to open video: {video_path}")
             self.total_frames = 0
@@ -127,10 +237,11 @@ class YoloProcessor(QObject):
     def quit_processor(self):
         self.running = False
         self.paused = True
+        self._reset_prefetch(0)
         if self.cap:
             self.cap.release()
             self.cap = None
-        # Modeli açıkça silmeye gerek yok? GC halletmeli.
+        # Model kayıt defterinde kalır; burada sadece referansı bırakıyoruz
         self.model = None
         self.finished.emit()
         self.logger.info("YOLO işlemcisi durduruldu.")
@@ -141,34 +252,30 @@ class YoloProcessor(QObject):
             return
 
         frame_start_time = time.perf_counter()
-        ret, frame = self.cap.read()
-
-        if not ret:
-            self.logger.info("YOLO: End of video reached, looping.")
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-            if not ret:
-                self.logger.error("YOLO: Failed to read frame after loop.")
+        try:
+            # Bekleyen kare yoksa bir batch oku ve tek model çağrısıyla işle
+            fill_time = 0.0
+            if not self._pending_frames:
+                fill_time = self._fill_pending_frames()
+            if not self._pending_frames:
+                self.logger.error("YOLO: Failed to read frame.")
                 self.stop_processing()
                 self.error_occurred.emit("Video karesi okunamadı.")
                 return
 
-        current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
-        self.progress_updated.emit(current_frame, self.total_frames)
-
-        try:
-            # YOLO çıkarımı yap
-            results = self.model(frame, device=self.device, verbose=False) # Ayrıntılı loglamayı devre dışı bırak
-
-            # Sonuçları işle
-            detections = self._parse_yolo_results(results[0]) # results bir listedir
+            frame_num, frame, detections, inference_time = self._pending_frames.popleft()
+            current_frame = frame_num + 1 # cap konumu ile aynı anlam (okunan karenin ardı)
+            self.progress_updated.emit(current_frame, self.total_frames)
 
-            # Görselleştir
-            frame_with_detections = self._visualize_detections(frame.copy(), detections)
+            # Görselleştir (sadece GUI bir önceki kareyi aldıysa)
+            frame_with_detections = None
+            if self._display_wants_frame():
+                frame_with_detections = self._visualize_detections(frame, detections)
 
-            # Timing & FPS
+            # Timing & FPS (batch süresi karelere bölünmüş olarak hesaba katılır)
             frame_end_time = time.perf_counter()
-            total_time = (frame_end_time - frame_start_time) * 1000 # ms
+            elapsed_time = (frame_end_time - frame_start_time) * 1000 # ms, bu adımda geçen gerçek süre
+            total_time = inference_time + max(0.0, elapsed_time - fill_time)
             self.frame_timing_history.append(total_time)
             if len(self.frame_timing_history) > 1:
                  avg_time = sum(self.frame_timing_history) / len(self.frame_timing_history)
@@ -179,13 +286,16 @@ class YoloProcessor(QObject):
             # Prepare stats
             stats = self._prepare_stats(detections)
             stats['frame_time'] = round(total_time, 2)
+            self.telemetry.record('frame', source='yolo', frame=current_frame, total=total_time,
+                                  blue=stats['blue_count'], red=stats['red_count'],
+                                  count=len(detections))
 
-            # Sinyali gönder
-            self.frame_processed.emit(frame_with_detections, stats)
+            # Kareyi gösterime gönder
+            if frame_with_detections is not None:
+                self.display_mailbox.post(frame_with_detections, stats)
 
             # Sonrakini planla
             target_latency = 1000 / self.target_fps
-            elapsed_time = total_time
             wait_time = max(0, int(target_latency - elapsed_time))
             if self.running and not self.paused:
                 QTimer.singleShot(wait_time, self.process_next.emit)
@@ -196,46 +306,108 @@ class YoloProcessor(QObject):
             self.stop_processing()
 
 
+    def _fill_pending_frames(self):
+        """Prefetcher'dan bir batch toplar, çıkarım yapar ve sonuçları sıraya ekler.
+
+        Harcanan toplam süreyi (ms) döndürür.
+        """
+        if self._prefetcher is None:
+            self._prefetcher = FramePrefetcher(self.cap, self._next_frame_pos, loop=True,
+                                               queue_size=YOLO_SETTINGS.get('PREFETCH_QUEUE_SIZE', 16))
+            self._batcher = BatchedYoloInference(self.model, batch_size=self.batch_size,
+                                                 max_batch_latency_ms=self.max_batch_latency_ms,
+                                                 device=self.device, **self._predict_kwargs())
+            self._prefetcher.start()
+        fill_start = time.perf_counter()
+        if self._hybrid_active() or self.keyframe_mode:
+            # Hibrit modda kareler arası HSV durumu (lazer modu), ana kare modunda
+            # optik akış önceki kareye bağlı olduğu için kare kare işlenir
+            item = self._prefetcher.get()
+            if item is None:
+                return 0.0
+            frame_num, frame = item
+            if self.keyframe_mode:
+                detections = self._keyframes.process(frame, self._detect_frame, self.target_fps)
+            else:
+                detections = self._detect_frame(frame)
+            fill_time = (time.perf_counter() - fill_start) * 1000
+            self._pending_frames.append((frame_num, frame, detections, fill_time))
+            self._next_frame_pos = frame_num + 1
+            return fill_time
+        if self.cascade_mode:
+            batch = self._batcher.collect(self._prefetcher)
+            results = self._cascade_detector()([frame for _, frame in batch]) if batch else []
+            inferred = [(frame_num, frame, result) for (frame_num, frame), result in zip(batch, results)]
+        else:
+            inferred = self._batcher.infer(self._batcher.collect(self._prefetcher))
+        fill_time = (time.perf_counter() - fill_start) * 1000
+        per_frame_ms = fill_time / max(1, len(inferred))
+        for frame_num, frame, result in inferred:
+            self._pending_frames.append((frame_num, frame, self._parse_yolo_results(result), per_frame_ms))
+        if inferred:
+            self._next_frame_pos = inferred[-1][0] + 1
+        return fill_time
+
+    def _hybrid_active(self):
+        return self.hybrid_mode and self.hsv_values is not None
+
+    def _detect_frame(self, frame):
+        """Tek kare için tespit (hibrit modda HSV önerileri + YOLO kırpıntıları)."""
+        if self._hybrid_active():
+            if self._hybrid_detector is None or self._hybrid_detector.model is not self.model:
+                self._hybrid_detector = HybridDetector(self.model, self.CLASS_MAP, device=self.device)
+            detections, _ = self._hybrid_detector.detect(frame, self.hsv_values)
+            return detections
+        if self.cascade_mode:
+            results = self._cascade_detector()([frame])
+        else:
+            results = self.model(frame, device=self.device, verbose=False, **self._predict_kwargs())
+        return self._parse_yolo_results(results[0])
+
+    def _cascade_detector(self):
+        if self._cascade is None or self._cascade.model is not self.model:
+            self._cascade = CascadeDetector(self.model, device=self.device, predict_kwargs=self._predict_kwargs())
+        return self._cascade
+
+    def _reset_prefetch(self, next_frame_pos):
+        """Önden okumayı durdurur; sonraki batch verilen kareden başlar."""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+        self._prefetcher = None
+        self._batcher = None
+        self._pending_frames.clear()
+        self._next_frame_pos = next_frame_pos
+        self._keyframes.reset() # Atlanan karelerden sonra optik akış sürdürülemez
+        if self._cascade is not None:
+            self._cascade.reset()
+
     def _parse_yolo_results(self, result):
         """Converts YOLO detection results to the application's format."""
-        detections = []
-        boxes = result.boxes  # Access the Boxes object
-
-        for i in range(len(boxes.xyxy)):
-            x1, y1, x2, y2 = map(int, boxes.xyxy[i])
-            conf = float(boxes.conf[i])
-            cls_id = int(boxes.cls[i])
-
-            color = self.CLASS_MAP.get(cls_id, "unknown") # Eşleştirmeyi kullan
-
-            # Temel filtreleme (isteğe bağlı, model iyi eğitilmiş olmalı)
-            if conf < 0.25: # Örnek güven eşiği
-                continue # Düşük güvenli tespitleri atla
-
-            # Not: YOLO doğrudan elips sağlamaz. Sınırlayıcı kutu kullanıyoruz.
-            # Görselleştirme tutarlılığı için, elips kısmını atlayabiliriz
-            # veya başka bir yerde gerekirse bbox'tan tahmin edebiliriz.
-            detections.append({
-                "bbox": [x1, y1, x2, y2],
-                "confidence": conf,
-                "color": color,
-                "is_laser_mode": False, # YOLO'da bu kavram yok
-                "color_ratio": conf, # Güveni bir vekil skor olarak kullan
-                "ellipse": None # Veya gerekirse tahmin et
-            })
-        return detections
+        # Güven/sınıf filtreleri model çağrısında uygulandı; kutular tek seferde NumPy'a alınır
+        xyxy, conf, cls = result_arrays(result)
+        colors = class_names(cls, self.CLASS_MAP, default="unknown") # Eşleştirmeyi kullan
+
+        # Not: YOLO doğrudan elips sağlamaz. Sınırlayıcı kutu kullanıyoruz.
+        return [{
+            "bbox": bbox,
+            "confidence": c,
+            "color": color,
+            "is_laser_mode": False, # YOLO'da bu kavram yok
+            "color_ratio": c, # Güveni bir vekil skor olarak kullan
+            "ellipse": None
+        } for bbox, c, color in zip(xyxy.tolist(), conf.tolist(), colors)]
+
+    def _display_wants_frame(self):
+        """GUI bir sonraki kareyi gösterecek durumdaysa True döner."""
+        return self.display_mailbox is not None and self.display_mailbox.wants_frame()
 
     def _visualize_detections(self, frame, detections):
-        """Draws bounding boxes and labels on the frame."""
-        for detection in detections:
-            x1, y1, x2, y2 = detection["bbox"]
-            color_bgr = (0, 0, 255) if detection["color"] == "red" else (255, 0, 0) if detection["color"] == "blue" else (0, 255, 0) # Bilinmeyen için yeşil
-            conf = detection["confidence"]
-
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color_bgr, 2)
-            label = f"{detection['color']} {conf:.2f}"
-            cv2.putText(frame, label, (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color_bgr, 2)
-        return frame
+        """Kareyi gösterim boyutuna indirir ve kutuları o çözünürlükte çizer."""
+        target_size = self.display_mailbox.target_size() if self.display_mailbox else (0, 0)
+        rendered = render_for_display(frame, detections, target_size, draw_box_detections)
+        if self.keyframe_mode and self._keyframes.last_stats:
+            draw_keyframe_tag(rendered, self._keyframes.last_stats['keyframe'])
+        return rendered
 
     def _prepare_stats(self, detections):
         return {
@@ -244,11 +416,42 @@ class YoloProcessor(QObject):
             "native_fps": self.native_fps,
             "blue_count": len([d for d in detections if d["color"] == "blue"]),
             "red_count": len([d for d in detections if d["color"] == "red"]),
-            "mode": "YOLO",
+            "mode": "YOLO (Hibrit)" if self._hybrid_active() else "YOLO",
             "control": f"Model: {self.model_path.split('/')[-1].split('\\')[-1]}" if self.model_path else "N/A", # Model adını göster
-            "preset": "N/A" # Presetler YOLO modunda kullanılmaz
+            "preset": self.current_preset if self._hybrid_active() else "N/A", # Presetler sadece hibrit modda kullanılır
+            "details": self._mode_details(),
         }
 
+    def _mode_details(self):
+        lines = [self._hybrid_details() if self._hybrid_active() else None,
+                 self._keyframe_details() if self.keyframe_mode else None,
+                 self._cascade_details() if self.cascade_mode and not self._hybrid_active() else None]
+        return "\n".join(line for line in lines if line) or None
+
+    def _cascade_details(self):
+        if self._cascade is None:
+            return None
+        stats = self._cascade.stats()
+        return (f"Kademeli: yükseltme %{stats['escalation_rate'] * 100:.0f}, "
+                f"küçük {stats['small_ms']:.0f} ms, tam {stats['full_ms']:.0f} ms")
+
+    def _keyframe_details(self):
+        stats = self._keyframes.last_stats
+        if not stats:
+            return None
+        kind = f"YOLO ({stats['reason']})" if stats['keyframe'] else "taşındı"
+        return (f"Ana kare: {kind}, K={stats['interval']} "
+                f"(çıkarım {stats['inference_ms']:.0f} ms, taşıma {stats['propagate_ms']:.1f} ms)")
+
+    def _hybrid_details(self):
+        stats = self._hybrid_detector.last_stats if self._hybrid_detector else {}
+        if not stats:
+            return None
+        text = f"Hibrit: {stats['verified']}/{stats['proposals']} aday onaylandı"
+        if stats['full_frame']:
+            text += f", tam kare +{stats['full_frame_added']}"
+        return text
+
     def seek_to_frame(self, frame_number):
         """Seek to a specific frame and process it."""
         if not self.cap or not self.model:
@@ -256,19 +459,20 @@ class YoloProcessor(QObject):
 
         was_paused = self.paused
         self.paused = True # Pause processing during seek
+        self._reset_prefetch(frame_number + 1) # Önden okunan kareler artık geçersiz
 
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
         ret, frame = self.cap.read()
 
         if ret:
             try:
-                results = self.model(frame, device=self.device, verbose=False)
-                detections = self._parse_yolo_results(results[0])
-                frame_with_detections = self._visualize_detections(frame.copy(), detections)
+                detections = self._detect_frame(frame)
+                frame_with_detections = self._visualize_detections(frame, detections)
                 stats = self._prepare_stats(detections)
                  # Add dummy timing for single frame processing
                 stats['frame_time'] = -1.0
-                self.frame_processed.emit(frame_with_detections, stats)
+                if self.display_mailbox is not None:
+                    self.display_mailbox.post(frame_with_detections, stats)
                 self.progress_updated.emit(frame_number, self.total_frames)
             except Exception as e:
                  self.logger.error(f"Error processing single YOLO frame {frame_number}: {e}", exc_info=True)
@@ -0,0 +1,79 @@
+import numpy as np
+from ..config import YOLO_SETTINGS
+
+_EMPTY_XYXY = np.zeros((0, 4), dtype=np.int32)
+_EMPTY_CONF = np.zeros(0, dtype=np.float32)
+_EMPTY_CLS = np.zeros(0, dtype=np.int32)
+
+
+def predict_filter_kwargs():
+    """Model çağrısına verilecek güven/sınıf filtreleri.
+
+    Filtreler Ultralytics'in (ve ONNX arka ucunun) NMS adımında uygulanır,
+    böylece elenen kutular hiç Python tarafına gelmez.
+    """
+    kwargs = {'conf': YOLO_SETTINGS.get('CONFIDENCE', 0.25)}
+    if YOLO_SETTINGS.get('CLASSES') is not None:
+        kwargs['classes'] = list(YOLO_SETTINGS['CLASSES'])
+    return kwargs
+
+
+def result_arrays(result, min_confidence=None, classes=None):
+    """Tek bir YOLO sonucunu sıkı dizilere çevirir: (xyxy, conf, cls).
+
+    Kutular tek seferde NumPy'a aktarılır (N x 6: x1, y1, x2, y2, güven, sınıf);
+    xyxy int32 (N x 4), conf float32 (N), cls int32 (N) döner. min_confidence
+    ve classes verilirse maske olarak uygulanır (model çağrısında zaten
+    uygulanmadıysa).
+    """
+    data = result.boxes.data
+    if hasattr(data, 'cpu'):
+        data = data.cpu().numpy()
+    if len(data) == 0:
+        return _EMPTY_XYXY, _EMPTY_CONF, _EMPTY_CLS
+    conf = data[:, 4].astype(np.float32)
+    cls = data[:, 5].astype(np.int32)
+    keep = None
+    if min_confidence is not None:
+        keep = conf >= min_confidence
+    if classes is not None:
+        class_mask = np.isin(cls, classes)
+        keep = class_mask if keep is None else keep & class_mask
+    xyxy = data[:, :4]
+    if keep is not None:
+        xyxy, conf, cls = xyxy[keep], conf[keep], cls[keep]
+    # int() ile aynı davranış: sıfıra doğru kırp
+    return xyxy.astype(np.int32), conf, cls
+
+
+def iou_matrix(a, b):
+    """İki xyxy kutu dizisi (N x 4, M x 4) arasındaki IoU matrisi (N x M)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def box_agreement(ref_xyxy, xyxy, iou_threshold=0.5):
+    """İki kutu kümesinin açgözlü IoU eşleşme oranı (eşleşen / en büyük küme boyutu)."""
+    if len(ref_xyxy) == 0 and len(xyxy) == 0:
+        return 1.0
+    if len(ref_xyxy) == 0 or len(xyxy) == 0:
+        return 0.0
+    iou = iou_matrix(ref_xyxy, xyxy)
+    matched = 0
+    while iou.max() >= iou_threshold:
+        i, j = np.unravel_index(iou.argmax(), iou.shape)
+        matched += 1
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return matched / max(len(ref_xyxy), len(xyxy))
+
+
+def class_names(cls, class_map, default=None):
+    """Sınıf indekslerini etiketlere çevirir; default None ise 'class_<id>' kullanılır."""
+    return [class_map.get(c, default if default is not None else f"class_{c}") for c in cls.tolist()]
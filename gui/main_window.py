@@ -1,20 +1,25 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QDockWidget, QStyle, QMessageBox
+import os
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QDockWidget, QStyle, QMessageBox, QDialog,
+                             QVBoxLayout, QListWidget, QAbstractItemView, QCheckBox, QDialogButtonBox, QFileDialog)
 from PyQt5.QtCore import Qt, QThread, pyqtSlot
-import cv2
 from balloon_detector.gui.widgets.video_panel import VideoPanel
 from balloon_detector.gui.widgets.preset_panel import PresetPanel
 from balloon_detector.gui.widgets.timing_panel import TimingPanel
 from balloon_detector.gui.widgets.config_panel import ConfigPanel
 from balloon_detector.gui.widgets.system_usage_panel import SystemUsagePanel
 from balloon_detector.gui.widgets.mode_panel import ModePanel
+from balloon_detector.gui.widgets.debug_view_panel import DebugViewPanel
 
 from balloon_detector.utils.preset_manager import PresetManager
 
-from balloon_detector.config import DEFAULT_HSV_VALUES, GUI_SETTINGS
+from balloon_detector.config import DEFAULT_HSV_VALUES, GUI_SETTINGS, YOLO_SETTINGS
 
 from balloon_detector.core.video_processor import VideoProcessor # OpenCV
 from balloon_detector.core.yolo_processor import YoloProcessor   # YOLO
-from balloon_detector.core.test_processor import TestProcessor # Test Modu
+from balloon_detector.core.test_processor import TestProcessor, YOLO_DEVICE_TEST # Test Modu
+from balloon_detector.core.model_registry import get_model_registry
+from balloon_detector.core.sampling import sampling_estimates, format_estimates
+from balloon_detector.core.yolo_autotune import load_profile
 
 PROCESSOR_TYPE_MAP = { "opencv": 0, "yolo": 1, "test": 2 } # Tip kontrolü için basit eşleştirme
 
@@ -25,6 +30,7 @@ class BalloonDetectorGUI(QMainWindow):
         self.timing_panel = None
         self.system_usage_panel = None
         self.mode_panel = None
+        self.debug_view_panel = None
         self._init_ui()
         self.preset_manager = PresetManager()
 
@@ -35,15 +41,30 @@ class BalloonDetectorGUI(QMainWindow):
         self.current_video_file = None
         self.test_yolo_model_path = None # Test modunda kullanılacak YOLO modeli yolu
         self.loaded_yolo_model_path = None # YOLO modunda başarıyla yüklenen model yolu
-        self.test_results_cache = [] # TestProcessor'dan gelen sonuçları önbelleğe al
+        self.test_results_cache = None # TestProcessor'dan gelen sonuçları önbelleğe al
+        self.test_int8_report = None # int8 arka ucunda test sonunda gelen karşılaştırma
         # --- -------------------- ---
         
         self._connect_signals()
         self._load_default_values()
+        self._prewarm_yolo_model()
         
         # Başlangıç işlemcisini başlat (örn. OpenCV)
         self._start_processor(PROCESSOR_TYPE_MAP["opencv"])
     
+    def _prewarm_yolo_model(self):
+        """YOLO_SETTINGS['PREWARM_MODEL'] ayarlıysa modeli arka planda yükleyip ısıtır."""
+        model_path = YOLO_SETTINGS.get('PREWARM_MODEL')
+        if not model_path or not os.path.exists(model_path):
+            return
+        backend, threads = self.mode_panel.current_yolo_backend(), None
+        profile = load_profile(model_path) if YOLO_SETTINGS.get('AUTO_APPLY_PROFILE', True) else None
+        if profile: # YOLO modu açılırken aynı profil uygulanacak
+            backend = profile['backend']
+            threads = profile.get('threads') if backend.startswith('onnx') else None
+        get_model_registry().prewarm(model_path, YOLO_DEVICE_TEST, backend=backend, intra_op_threads=threads)
+        self.loaded_yolo_model_path = model_path # YOLO moduna geçişte bu model kullanılır
+
     def _init_ui(self):
         self.setWindowTitle("Balon Tespit Programı")
         self.setGeometry(100, 100, 
@@ -97,6 +118,15 @@ class BalloonDetectorGUI(QMainWindow):
         mode_dock_widget.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea)
         mode_dock_widget.setWidget(self.mode_panel)
         self.addDockWidget(Qt.LeftDockWidgetArea, mode_dock_widget)
+
+        # Maske/Kontur hata ayıklama paneli (Dock Widget, kontur gösterimi açılınca görünür)
+        self.debug_view_panel = DebugViewPanel(self.video_panel.display_mailbox)
+        self.debug_view_dock_widget = QDockWidget("Maske / Kontur Görünümü", self)
+        self.debug_view_dock_widget.setObjectName("DebugViewDock")
+        self.debug_view_dock_widget.setAllowedAreas(Qt.LeftDockWidgetArea | Qt.RightDockWidgetArea | Qt.BottomDockWidgetArea)
+        self.debug_view_dock_widget.setWidget(self.debug_view_panel)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.debug_view_dock_widget)
+        self.debug_view_dock_widget.hide()
         self.setMinimumSize(800, 600)
 
         # Menü çubuğu
@@ -106,6 +136,7 @@ class BalloonDetectorGUI(QMainWindow):
         view_menu.addAction(timing_dock_widget.toggleViewAction())
         view_menu.addAction(system_usage_dock_widget.toggleViewAction())
         view_menu.addAction(mode_dock_widget.toggleViewAction())
+        view_menu.addAction(self.debug_view_dock_widget.toggleViewAction())
     
     def _connect_signals(self):
         # Video paneli sinyalleri (Tüm modlar için geçerli)
@@ -117,6 +148,7 @@ class BalloonDetectorGUI(QMainWindow):
         self.video_panel.auto_mode_changed.connect(self._on_auto_mode_changed)
         self.video_panel.laser_mode_changed.connect(self._on_laser_mode_changed)
         self.mode_panel.show_contours_signal.connect(self._on_show_contours_changed)
+        self.debug_view_panel.view_mode_changed.connect(self._on_debug_view_mode_changed)
         # --- ---------------------------------------- ---
         
         # --- Preset/HSV Sinyalleri (OpenCV ve Test Konfigürasyonu) ---
@@ -137,8 +169,13 @@ class BalloonDetectorGUI(QMainWindow):
         # ModePanel -> Ana Pencere (Test İşlemleri)
         self.mode_panel.start_test_signal.connect(self._on_start_test)
         self.mode_panel.cancel_test_signal.connect(self._on_cancel_test)
+        self.mode_panel.compare_presets_signal.connect(self._on_compare_presets)
         self.mode_panel.export_results_signal.connect(self._on_export_results)
         self.mode_panel.load_test_yolo_model_signal.connect(self._on_set_test_yolo_model_path)
+        self.mode_panel.yolo_backend_changed.connect(self._on_yolo_backend_changed)
+        self.mode_panel.yolo_hybrid_changed.connect(self._on_yolo_hybrid_changed)
+        self.mode_panel.yolo_keyframe_changed.connect(self._on_yolo_keyframe_changed)
+        self.mode_panel.yolo_cascade_changed.connect(self._on_yolo_cascade_changed)
         # --- ------------------------------------------ ---
 
     # --- İşlemci Yaşam Döngüsü Yönetimi ---
@@ -195,6 +232,7 @@ class BalloonDetectorGUI(QMainWindow):
             processor_instance = VideoProcessor()
             processor_instance.hsv_values = hsv_values # Başlangıç HSV'sini ayarla
             processor_instance.target_fps = self.config_panel.target_fps_spinbox.value() if self.config_panel else 30
+            processor_instance.debug_view_mode = self.debug_view_panel.current_view_mode()
             # OpenCV'ye özgü sinyalleri bağla
             processor_instance.performance_metrics.connect(self.timing_panel.update_timings)
             # Preset/HSV etkileşimlerini etkinleştir
@@ -207,13 +245,20 @@ class BalloonDetectorGUI(QMainWindow):
 
         elif processor_type == PROCESSOR_TYPE_MAP["yolo"]:
             processor_instance = YoloProcessor()
+            processor_instance.backend = self.mode_panel.current_yolo_backend()
+            processor_instance.set_preset(self.preset_panel.preset_combo.currentText(), hsv_values)
+            processor_instance.hybrid_mode = self.mode_panel.hybrid_checkbox.isChecked()
+            processor_instance.keyframe_mode = self.mode_panel.keyframe_checkbox.isChecked()
+            processor_instance.cascade_mode = self.mode_panel.cascade_checkbox.isChecked()
             processor_instance.target_fps = self.config_panel.target_fps_spinbox.value() if self.config_panel else 30
             # YOLO'ya özgü sinyalleri bağla
             processor_instance.model_loaded.connect(self._on_yolo_model_actually_loaded)
             processor_instance.model_loaded.connect(self.mode_panel.on_yolo_model_loaded) # ModePanel etiketini güncelle
+            processor_instance.profile_applied.connect(
+                lambda profile: self.mode_panel.set_yolo_backend(profile['backend']))
             processor_instance.error_occurred.connect(self._show_error_message)
-            # Preset/HSV etkileşimlerini devre dışı bırak
-            self.preset_panel.setEnabled(False)
+            # Preset/HSV etkileşimleri sadece hibrit modda kullanılır
+            self.preset_panel.setEnabled(processor_instance.hybrid_mode)
             # YOLO moduna özel UI elemanlarını etkinleştir/göster
             self.video_panel.set_opencv_controls_visibility(False)
             self.mode_panel.set_opencv_options_visibility(False)
@@ -223,9 +268,13 @@ class BalloonDetectorGUI(QMainWindow):
 
         elif processor_type == PROCESSOR_TYPE_MAP["test"]:
             processor_instance = TestProcessor()
+            processor_instance.yolo_backend = self.mode_panel.current_yolo_backend()
             # Test'e özgü sinyalleri bağla
             processor_instance.test_progress.connect(self.mode_panel.update_test_progress)
             processor_instance.test_finished.connect(self._on_test_finished)
+            processor_instance.test_int8_report.connect(self._on_test_int8_report)
+            processor_instance.sweep_finished.connect(self._on_sweep_finished)
+            processor_instance.comparison_finished.connect(self._on_comparison_finished)
             processor_instance.test_error.connect(self._show_error_message)
             processor_instance.test_error.connect(lambda: self.mode_panel.on_test_completed(False)) # Hata durumunda UI'ı güncelle
             # Preset/HSV etkileşimlerini etkinleştir (test başlamadan önce ayarlanabilir)
@@ -246,8 +295,9 @@ class BalloonDetectorGUI(QMainWindow):
         self.current_processor.moveToThread(self.current_thread)
 
         # Ortak sinyalleri bağla
-        if hasattr(self.current_processor, 'frame_processed'):
-            self.current_processor.frame_processed.connect(self.video_panel.update_frame)
+        if hasattr(self.current_processor, 'display_mailbox'):
+            self.video_panel.display_mailbox.clear() # Önceki işlemciden kalan kareyi at
+            self.current_processor.display_mailbox = self.video_panel.display_mailbox
         if hasattr(self.current_processor, 'progress_updated'):
             self.current_processor.progress_updated.connect(self.video_panel.update_progress)
         # OpenCV ve YOLO işlemcilerinin 'finished' sinyali thread'i durdurur
@@ -348,11 +398,14 @@ class BalloonDetectorGUI(QMainWindow):
         self._apply_hsv_to_processor(self.preset_panel.preset_combo.currentText(), values)
 
     def _apply_hsv_to_processor(self, name, values):
-        """HSV değerlerini mevcut ilgili işlemciye (OpenCV veya Test) uygular."""
+        """HSV değerlerini mevcut ilgili işlemciye (OpenCV, hibrit YOLO veya Test) uygular."""
         # Eğer aktifse OpenCV işlemcisine uygula
         if self.current_processor_type == PROCESSOR_TYPE_MAP["opencv"] and self.current_processor:
             if hasattr(self.current_processor, 'set_preset'): # set_preset hsv_values'i de ayarlar
                 self.current_processor.set_preset(name, values)
+        # YOLO işlemcisi HSV değerlerini sadece hibrit modda kullanır
+        elif self.current_processor_type == PROCESSOR_TYPE_MAP["yolo"] and self.current_processor:
+            self.current_processor.set_preset(name, values)
         # Test işlemcisi için sakla (test başladığında okunacak)
         elif self.current_processor_type == PROCESSOR_TYPE_MAP["test"] and self.current_processor:
              self.current_processor.hsv_values = values # TestProcessor config'i günceller
@@ -370,8 +423,9 @@ class BalloonDetectorGUI(QMainWindow):
         if "OpenCV" in mode_name:
             self._start_processor(PROCESSOR_TYPE_MAP["opencv"])
         elif "YOLO" in mode_name:
-            # İşlemci kurulumunu başlat, ancak model yükleme buton tıklamasıyla olur
-            self._start_processor(PROCESSOR_TYPE_MAP["yolo"])
+            # Daha önce yüklenmiş bir model varsa kayıt defterinden tekrar kullanılır,
+            # yoksa model yükleme buton tıklamasıyla olur
+            self._start_processor(PROCESSOR_TYPE_MAP["yolo"], model_path=self.loaded_yolo_model_path)
         elif "Test" in mode_name:
             # İşlemci kurulumunu başlat, test çalıştırma buton tıklamasıyla olur
             self._start_processor(PROCESSOR_TYPE_MAP["test"])
@@ -386,6 +440,35 @@ class BalloonDetectorGUI(QMainWindow):
         else:
             self._show_error_message("YOLO Modu aktif değil.")
 
+    @pyqtSlot(str)
+    def _on_yolo_backend_changed(self, backend):
+        """ModePanel'de YOLO arka ucu değiştiğinde aktif işlemciye iletir."""
+        if isinstance(self.current_processor, YoloProcessor):
+            self.current_processor.set_backend(backend)
+        elif isinstance(self.current_processor, TestProcessor):
+            self.current_processor.yolo_backend = backend
+
+    @pyqtSlot(bool)
+    def _on_yolo_hybrid_changed(self, enabled):
+        """YOLO modunda hibrit tespit açılıp kapatıldığında çağrılır."""
+        if isinstance(self.current_processor, YoloProcessor):
+            self.current_processor.set_preset(self.preset_panel.preset_combo.currentText(),
+                                              self.preset_panel.get_values())
+            self.current_processor.set_hybrid_mode(enabled)
+            self.preset_panel.setEnabled(enabled)
+
+    @pyqtSlot(bool)
+    def _on_yolo_keyframe_changed(self, enabled):
+        """YOLO modunda ana kare modu açılıp kapatıldığında çağrılır."""
+        if isinstance(self.current_processor, YoloProcessor):
+            self.current_processor.set_keyframe_mode(enabled)
+
+    @pyqtSlot(bool)
+    def _on_yolo_cascade_changed(self, enabled):
+        """YOLO modunda kademeli çözünürlük açılıp kapatıldığında çağrılır."""
+        if isinstance(self.current_processor, YoloProcessor):
+            self.current_processor.set_cascade_mode(enabled)
+
     @pyqtSlot(bool, str)
     def _on_yolo_model_actually_loaded(self, success, message):
         """YoloProcessor modeli yüklemeyi bitirdiğinde çağrılır."""
@@ -423,12 +506,123 @@ class BalloonDetectorGUI(QMainWindow):
                 self.current_video_file, start_frame, end_frame, use_full_video, hsv_values,
                detector_type, yolo_model_path_for_test # Yeni bilgiyi geçir
             )
-            self.test_results_cache = [] # Önceki test sonuçlarını temizle
+            if "Karşılaştırma" in detector_type:
+                # Aynı karelerde OpenCV + YOLO; önceki test sonuçları korunur
+                self.current_processor.start_comparison()
+                return
+            self.current_processor.stream_path = self.mode_panel.stream_path
+            self.current_processor.sampling = self.mode_panel.current_sampling()
+            self.test_results_cache = None # Önceki test sonuçlarını temizle
             self.current_processor.start_test() # Bu, işçiyi kendi thread'inde çalıştırır
         else:
             self._show_error_message("Testi başlatmak için Test Modunda olmalısınız.")
             self.mode_panel.on_test_completed(False) # UI durumunu sıfırla
 
+    def _select_sweep_configs(self):
+        """Karşılaştırılacak presetleri (ve isteğe bağlı test YOLO modelini) seçtirir."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Presetleri Karşılaştır")
+        layout = QVBoxLayout(dialog)
+        preset_list = QListWidget()
+        preset_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        preset_list.addItem("(Mevcut HSV Değerleri)")
+        preset_list.addItems(self.preset_manager.get_preset_names())
+        preset_list.item(0).setSelected(True)
+        layout.addWidget(preset_list)
+        yolo_checkbox = QCheckBox("Test YOLO Modelini Ekle")
+        yolo_checkbox.setEnabled(bool(self.test_yolo_model_path))
+        yolo_checkbox.setChecked(bool(self.test_yolo_model_path))
+        layout.addWidget(yolo_checkbox)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        if dialog.exec_() != QDialog.Accepted:
+            return []
+
+        configs = []
+        include_current = False
+        for item in preset_list.selectedItems():
+            if preset_list.row(item) == 0:
+                include_current = True
+            else:
+                name = item.text()
+                configs.append({'name': name, 'detector': 'opencv', 'hsv_values': self.preset_manager.load_preset(name)})
+        if yolo_checkbox.isChecked():
+            configs.append({'name': f"yolo:{os.path.basename(self.test_yolo_model_path)}", 'detector': 'yolo',
+                            'model_path': self.test_yolo_model_path,
+                            'backend': self.mode_panel.current_yolo_backend()})
+        if include_current:
+            # Aynı adlı bir preset varsa run_sweep benzersiz ad istediği için numaralandırılır
+            taken = {config['name'] for config in configs}
+            name, suffix = 'mevcut', 2
+            while name in taken:
+                name, suffix = f"mevcut ({suffix})", suffix + 1
+            configs.insert(0, {'name': name, 'detector': 'opencv', 'hsv_values': self.preset_panel.get_values()})
+        return configs
+
+    @pyqtSlot(int, int, bool)
+    def _on_compare_presets(self, start_frame, end_frame, use_full_video):
+        """Seçilen presetleri tek video çözümüyle karşılaştırır (bkz. core.sweep)."""
+        if self.current_processor_type != PROCESSOR_TYPE_MAP["test"] or not self.current_processor:
+            self._show_error_message("Karşılaştırma için Test Modunda olmalısınız.")
+            self.mode_panel.on_test_completed(False)
+            return
+        if not self.current_video_file:
+            self._show_error_message("Karşılaştırma başlatılamıyor: Önce bir video açın.")
+            self.mode_panel.on_test_completed(False)
+            return
+        configs = self._select_sweep_configs()
+        if not configs:
+            self.mode_panel.on_test_completed(bool(self.test_results_cache))
+            return
+        self.current_processor.video_path = self.current_video_file
+        self.current_processor.start_sweep(configs, start_frame, end_frame, use_full_video)
+
+    @pyqtSlot(object)
+    def _on_sweep_finished(self, sweep):
+        """Karşılaştırma bittiğinde özet tabloyu gösterir ve dışa aktarmayı önerir."""
+        from balloon_detector.core.sweep import sweep_summary, export_sweep
+        self.mode_panel.on_test_completed(bool(self.test_results_cache))
+        if not sweep:
+            return # Hata mesajı test_error ile gösterildi
+        summary = sweep_summary(sweep)
+        title = "Karşılaştırma İptal Edildi" if sweep.get('cancelled') else "Karşılaştırma Tamamlandı"
+        message = (f"{sweep['frames']} kare, video bir kez çözüldü.\n\n"
+                   + summary.to_string(index=False, float_format=lambda v: f"{v:.3f}")
+                   + "\n\nSonuçlar bir klasöre aktarılsın mı?")
+        answer = QMessageBox.question(self, title, message, QMessageBox.Yes | QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Karşılaştırma Sonuçlarının Yazılacağı Klasör")
+        if directory:
+            try:
+                export_sweep(sweep, directory)
+                QMessageBox.information(self, "Dışa Aktarma Başarılı", f"Karşılaştırma sonuçları '{directory}' klasörüne kaydedildi.")
+            except OSError as e:
+                self._show_error_message(f"Karşılaştırma sonuçları yazılamadı: {e}")
+
+    @pyqtSlot(object)
+    def _on_comparison_finished(self, comparison):
+        """OpenCV / YOLO karşılaştırması bittiğinde özeti gösterir ve dışa aktarmayı önerir."""
+        from balloon_detector.core.comparison import comparison_summary, format_comparison, export_comparison
+        self.mode_panel.on_test_completed(bool(self.test_results_cache))
+        if not comparison:
+            return # Hata mesajı test_error ile gösterildi
+        title = "Karşılaştırma İptal Edildi" if comparison.get('cancelled') else "Karşılaştırma Tamamlandı"
+        message = (format_comparison(comparison_summary(comparison))
+                   + "\n\nKare tablosu ve sonuçlar bir klasöre aktarılsın mı?")
+        answer = QMessageBox.question(self, title, message, QMessageBox.Yes | QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Karşılaştırma Sonuçlarının Yazılacağı Klasör")
+        if directory:
+            try:
+                export_comparison(comparison, directory)
+                QMessageBox.information(self, "Dışa Aktarma Başarılı", f"Karşılaştırma sonuçları '{directory}' klasörüne kaydedildi.")
+            except OSError as e:
+                self._show_error_message(f"Karşılaştırma sonuçları yazılamadı: {e}")
+
     @pyqtSlot()
     def _on_cancel_test(self):
         """ModePanel tarafından çalışan testi iptal etmek için tetiklenir."""
@@ -442,11 +636,21 @@ class BalloonDetectorGUI(QMainWindow):
     @pyqtSlot(bool)
     def _on_show_contours_changed(self, enabled):
         """OpenCV işlemcisine konturları göstermesini/gizlemesini söyler."""
+        self.debug_view_dock_widget.setVisible(enabled)
+        if not enabled:
+            self.debug_view_panel.clear_view()
         if self.current_processor_type == PROCESSOR_TYPE_MAP["opencv"] and self.current_processor:
             if hasattr(self.current_processor, 'set_show_contours'):
                 self.current_processor.set_show_contours(enabled)
                 print(f"Kontur gösterimi {'etkinleştirildi' if enabled else 'devre dışı bırakıldı'}.")
 
+    @pyqtSlot(str)
+    def _on_debug_view_mode_changed(self, view_mode):
+        """Hata ayıklama panelinde seçilen görünümü OpenCV işlemcisine iletir."""
+        if self.current_processor_type == PROCESSOR_TYPE_MAP["opencv"] and self.current_processor:
+            if hasattr(self.current_processor, 'set_debug_view_mode'):
+                self.current_processor.set_debug_view_mode(view_mode)
+
     @pyqtSlot(str)
     def _on_set_test_yolo_model_path(self, path):
         """ModePanel'den gelen test YOLO modeli yolunu saklar ve label'ı günceller."""
@@ -456,22 +660,37 @@ class BalloonDetectorGUI(QMainWindow):
         if self.mode_panel:
             self.mode_panel.update_test_yolo_label(path)
 
-    @pyqtSlot(list)
-    def _on_test_finished(self, results_list):
-        """TestProcessor işçisi bittiğinde çağrılır."""
-        print(f"Test tamamlandı, {len(results_list)} sonuç alındı.")
-        self.test_results_cache = results_list # Sonuçları sonraki export için sakla
+    @pyqtSlot(object)
+    def _on_test_finished(self, results_store):
+        """TestProcessor işçisi bittiğinde çağrılır (sonuç deposu referansla gelir)."""
+        print(f"Test tamamlandı, {len(results_store)} sonuç alındı.")
+        self.test_results_cache = results_store # Sonuçları sonraki export için sakla
         # ModePanel UI'ını güncelle (export'u etkinleştir, ilerlemeyi sıfırla)
-        self.mode_panel.on_test_completed(True if results_list else False) # Sonuç varsa export'u etkinleştir
+        # Sonuç (veya rapor için kare kaydı) varsa export'u etkinleştir
+        self.mode_panel.on_test_completed(bool(results_store) or results_store.frame_count > 0)
         # Burada bir özet mesaj kutusu gösterebilirsiniz
-        QMessageBox.information(self, "Test Tamamlandı", f"Test tamamlandı. {len(results_list)} tespit bulundu.")
+        message = f"Test tamamlandı. {len(results_store)} tespit bulundu."
+        if results_store.sampling:
+            message += "\n\n" + format_estimates(sampling_estimates(results_store, results_store.sampling))
+        report, self.test_int8_report = self.test_int8_report, None
+        if report:
+            message += (f"\n\nint8 / float ({report['frames']} kare): uyum {report['agreement']:.3f}, "
+                        f"tespit {report['int8_detections']} / {report['float_detections']}, "
+                        f"{report['int8_ms']:.1f} / {report['float_ms']:.1f} ms/kare "
+                        f"(hızlanma x{report['speedup']:.2f})")
+        QMessageBox.information(self, "Test Tamamlandı", message)
+
+    @pyqtSlot(dict)
+    def _on_test_int8_report(self, report):
+        """int8 test raporunu test bitiş mesajında göstermek üzere saklar."""
+        self.test_int8_report = report
 
     @pyqtSlot(str)
     def _on_export_results(self, output_path):
         """ModePanel tarafından test sonuçlarını dışa aktarmak için tetiklenir."""
         if self.current_processor_type == PROCESSOR_TYPE_MAP["test"] and self.current_processor:
             # Önbelleğe alınmış sonuçları kullan
-            if not self.test_results_cache:
+            if self.test_results_cache is None:
                 self._show_error_message("Dışa aktarılacak test sonucu bulunamadı.")
                 return
             # Export işlemini TestProcessor'a devret (cache ile)
@@ -503,8 +722,7 @@ class BalloonDetectorGUI(QMainWindow):
             self.current_processor.target_fps = initial_fps
     
     def closeEvent(self, event):
-        """Uygulama kapatılırken thread'i temizle ve pencereleri kapat"""
+        """Uygulama kapatılırken thread'i temizle"""
         print("Kapatma olayı tetiklendi. İşlemci durduruluyor...")
         self._stop_current_processor() # Yardımcı fonksiyonu kullan
-        cv2.destroyAllWindows() # Tüm OpenCV pencerelerini kapat
         super().closeEvent(event)
\ No newline at end of file
@@ -0,0 +1,73 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSizePolicy
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+from PyQt5.QtGui import QImage, QPixmap
+from balloon_detector.config import GUI_SETTINGS
+
+DEBUG_CHANNEL = 'debug'
+
+
+class DebugViewPanel(QWidget):
+    """OpenCV modunun maske/kontur hata ayıklama görünümü.
+
+    Kareler işlemciden ana görüntüyle aynı DisplayMailbox üzerinden ('debug'
+    kanalı) gelir; işlemci bu kanalı kısıtlı bir hızda ve panel boyutunda doldurur.
+    """
+    view_mode_changed = pyqtSignal(str)
+
+    VIEW_MODES = {
+        "Birleşik Maske": 'combined',
+        "Kırmızı Maske": 'red',
+        "Mavi Maske": 'blue',
+        "Aday Kaplaması": 'candidates',
+    }
+
+    def __init__(self, display_mailbox, parent=None):
+        super().__init__(parent)
+        self.display_mailbox = display_mailbox
+        self._init_ui()
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._poll_display_mailbox)
+        self._poll_timer.start(GUI_SETTINGS.get('DISPLAY_REFRESH_MS', 15))
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Görünüm:"))
+        self.view_mode_combo = QComboBox()
+        self.view_mode_combo.addItems(list(self.VIEW_MODES.keys()))
+        self.view_mode_combo.currentTextChanged.connect(
+            lambda text: self.view_mode_changed.emit(self.VIEW_MODES[text]))
+        mode_layout.addWidget(self.view_mode_combo, 1)
+        layout.addLayout(mode_layout)
+
+        self.view_label = QLabel("Görünüm kapalı")
+        self.view_label.setAlignment(Qt.AlignCenter)
+        self.view_label.setMinimumSize(160, 120)
+        self.view_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored) # Pixmap boyutu paneli büyütmesin
+        self.view_label.setStyleSheet("QLabel { background-color: black; color: gray; }")
+        layout.addWidget(self.view_label, 1)
+
+    def current_view_mode(self):
+        return self.VIEW_MODES[self.view_mode_combo.currentText()]
+
+    def _poll_display_mailbox(self):
+        item = self.display_mailbox.take(DEBUG_CHANNEL)
+        if item is None:
+            return
+        view, _ = item
+        h, w, ch = view.shape
+        qt_image = QImage(view.data, w, h, ch * w, QImage.Format_BGR888)
+        self.view_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
+            self.view_label.size(), Qt.KeepAspectRatio))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.display_mailbox.set_target_size(self.view_label.width(), self.view_label.height(),
+                                             channel=DEBUG_CHANNEL)
+
+    def clear_view(self):
+        self.display_mailbox.take(DEBUG_CHANNEL)
+        self.view_label.clear()
+        self.view_label.setText("Görünüm kapalı")
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QStackedWidget,
                              QGroupBox, QLabel, QPushButton, QFormLayout,
                              QSpinBox, QCheckBox, QSizePolicy, QProgressBar, QMessageBox,
-                             QFileDialog)
+                             QFileDialog, QDoubleSpinBox)
 from PyQt5.QtCore import pyqtSignal, pyqtSlot
+from balloon_detector.config import YOLO_SETTINGS, SAMPLING_SETTINGS
+from balloon_detector.core.sampling import SAMPLING_MODES
 
 class ModePanel(QWidget):
     mode_changed = pyqtSignal(str) # Seçilen modun adını yayınla
@@ -10,13 +12,27 @@ class ModePanel(QWidget):
     # --- Arka uç ile etkileşim için sinyaller ---
     start_test_signal = pyqtSignal(int, int, bool, str) # başlangıç_karesi, bitiş_karesi, tam_kullan, dedektör_tipi
     cancel_test_signal = pyqtSignal()
+    compare_presets_signal = pyqtSignal(int, int, bool) # başlangıç_karesi, bitiş_karesi, tam_kullan
     load_yolo_model_signal = pyqtSignal(str) # model_yolu
     export_results_signal = pyqtSignal(str) # çıktı_yolu
     load_test_yolo_model_signal = pyqtSignal(str) # model_yolu (Test modu için)
     show_contours_signal = pyqtSignal(bool) # Kontur gösterme sinyali
+    yolo_backend_changed = pyqtSignal(str) # 'torch', 'torchscript', 'onnx' veya 'onnx-int8'
+    yolo_hybrid_changed = pyqtSignal(bool) # Hibrit mod (HSV önerileri + YOLO doğrulama)
+    yolo_keyframe_changed = pyqtSignal(bool) # Ana kare modu (YOLO her K karede, arada kutu taşıma)
+    yolo_cascade_changed = pyqtSignal(bool) # Kademeli çözünürlük (küçük giriş, belirsizse tam boyut)
+
+    # YOLO çıkarım arka uçları (görünen ad -> arka uç anahtarı)
+    YOLO_BACKENDS = {
+        "PyTorch": 'torch',
+        "PyTorch (TorchScript önbellekli)": 'torchscript',
+        "ONNX Runtime (CPU)": 'onnx',
+        "ONNX Runtime int8 (CPU)": 'onnx-int8',
+    }
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.stream_path = None # Test sırasında sonuçların yazılacağı dosya (seçildiyse)
         self._init_ui()
 
     def _init_ui(self):
@@ -60,7 +76,7 @@ class ModePanel(QWidget):
         layout.addWidget(description)
 
         self.show_contours_checkbox = QCheckBox("Konturları Göster (Geliştirme)")
-        self.show_contours_checkbox.setToolTip("Tespit edilen maske/konturları ayrı bir pencerede gösterir.")
+        self.show_contours_checkbox.setToolTip("Tespit edilen maske/konturları ayrı bir panelde gösterir.")
         self.show_contours_checkbox.toggled.connect(self.show_contours_signal.emit) # Sinyali doğrudan yayınla
          # self.show_contours_checkbox.stateChanged.connect(self.on_show_contours_changed)
         layout.addWidget(self.show_contours_checkbox)
@@ -85,7 +101,7 @@ class ModePanel(QWidget):
 
         # --- Dedektör Seçimi ---
         self.test_detector_combo = QComboBox()
-        self.test_detector_combo.addItems(["OpenCV (HSV)", "YOLO"])
+        self.test_detector_combo.addItems(["OpenCV (HSV)", "YOLO", "Hibrit (HSV + YOLO)", "OpenCV / YOLO Karşılaştırma"])
         self.test_detector_combo.currentTextChanged.connect(self._on_test_detector_changed) # YOLO butonunu göster/gizle
         test_layout.addRow("Dedektör:", self.test_detector_combo)
 
@@ -101,6 +117,14 @@ class ModePanel(QWidget):
         self.test_yolo_row_widget.setLayout(test_yolo_layout)
         test_layout.addRow(self.test_yolo_row_widget) # Widget'ı satıra ekle
         self.test_yolo_row_widget.setVisible(False) # Başlangıçta gizle
+        self.test_backend_combo = self._create_backend_combo()
+        self.test_backend_row_widget = QWidget()
+        test_backend_layout = QHBoxLayout(self.test_backend_row_widget)
+        test_backend_layout.setContentsMargins(0, 0, 0, 0)
+        test_backend_layout.addWidget(QLabel("Arka Uç:"))
+        test_backend_layout.addWidget(self.test_backend_combo, 1)
+        test_layout.addRow(self.test_backend_row_widget)
+        self.test_backend_row_widget.setVisible(False)
         # --- ---
 
 
@@ -116,6 +140,22 @@ class ModePanel(QWidget):
         test_layout.addRow("Bitiş Frame:", self.end_frame_spin)
         test_layout.addRow(self.process_full_checkbox)
 
+        # --- Örnekleme (hızlı preset doğrulaması için kare alt kümesi) ---
+        self.sampling_combo = QComboBox()
+        self.sampling_combo.addItems(SAMPLING_MODES.keys())
+        self.sampling_combo.setToolTip("Örneklemeli testte rapor, tüm aralık için güven aralıklı tahmin verir.")
+        self.sampling_value_spin = QDoubleSpinBox()
+        self.sampling_combo.currentTextChanged.connect(self._on_sampling_mode_changed)
+        sampling_layout = QHBoxLayout()
+        sampling_layout.addWidget(self.sampling_combo, 1)
+        sampling_layout.addWidget(self.sampling_value_spin)
+        test_layout.addRow("Örnekleme:", sampling_layout)
+        self._on_sampling_mode_changed(self.sampling_combo.currentText())
+        self.stream_export_checkbox = QCheckBox("Sonuçları Test Sırasında Diske Yaz (CSV/Parquet)")
+        self.stream_export_checkbox.setToolTip("Sonuçlar çalışma sırasında parça parça yazılır; "
+                                               "iptal veya çökmede yazılanlar '.partial' dosyasında kalır.")
+        test_layout.addRow(self.stream_export_checkbox)
+
         # Test Buttons and Progress
         button_layout = QHBoxLayout()
 
@@ -133,6 +173,12 @@ class ModePanel(QWidget):
         self.export_results_button.clicked.connect(self._on_export_results)
         test_layout.addRow(self.export_results_button)
 
+        self.compare_presets_button = QPushButton("Presetleri Karşılaştır")
+        self.compare_presets_button.setToolTip("Video bir kez çözülür; seçilen HSV presetleri ve YOLO modeli "
+                                               "aynı karelerde çalıştırılıp karşılaştırılır.")
+        self.compare_presets_button.clicked.connect(self._on_compare_presets)
+        test_layout.addRow(self.compare_presets_button)
+
         # Test İlerleme ve Durum
         self.test_progress_bar = QProgressBar()
         self.test_progress_bar.setTextVisible(True)
@@ -170,13 +216,71 @@ class ModePanel(QWidget):
         self.loaded_model_label = QLabel("Yüklenen Model: Yok")
         self.loaded_model_label.setWordWrap(True)
 
+        backend_layout = QHBoxLayout()
+        backend_layout.addWidget(QLabel("Arka Uç:"))
+        self.yolo_backend_combo = self._create_backend_combo()
+        backend_layout.addWidget(self.yolo_backend_combo, 1)
+
+        self.hybrid_checkbox = QCheckBox("Hibrit Mod (HSV Adayları + YOLO Doğrulama)")
+        self.hybrid_checkbox.setToolTip(
+            "HSV ile bulunan adayların etrafındaki küçük kırpıntılar YOLO ile doğrulanır;\n"
+            "tam kare YOLO sadece belirli aralıklarla çalışır. Preset Paneli'ndeki HSV değerleri kullanılır.")
+        self.hybrid_checkbox.toggled.connect(self.yolo_hybrid_changed.emit)
+
+        self.keyframe_checkbox = QCheckBox("Ana Kare Modu (YOLO her K karede, arada optik akış)")
+        self.keyframe_checkbox.setToolTip(
+            "YOLO sadece ana karelerde (her K karede veya sahne değişiminde) çalışır;\n"
+            "aradaki karelerde kutular optik akışla taşınır. K, Hedef FPS'e göre otomatik ayarlanır.")
+        self.keyframe_checkbox.toggled.connect(self.yolo_keyframe_changed.emit)
+
+        self.cascade_checkbox = QCheckBox("Kademeli Çözünürlük (önce küçük, belirsizse tam boyut)")
+        self.cascade_checkbox.setToolTip(
+            "Kareler önce küçük giriş boyutunda işlenir; güven düşükse, tespit sayısı değiştiyse\n"
+            "veya çok küçük kutu varsa kare tam boyutta tekrar işlenir.")
+        self.cascade_checkbox.toggled.connect(self.yolo_cascade_changed.emit)
+
         yolo_layout.addWidget(self.load_model_button)
+        yolo_layout.addLayout(backend_layout)
+        yolo_layout.addWidget(self.hybrid_checkbox)
+        yolo_layout.addWidget(self.keyframe_checkbox)
+        yolo_layout.addWidget(self.cascade_checkbox)
         yolo_layout.addWidget(self.loaded_model_label)
 
         layout.addWidget(yolo_group)
         layout.addStretch(1)
         self.stacked_widget.addWidget(widget)
 
+    def _create_backend_combo(self):
+        combo = QComboBox()
+        combo.addItems(list(self.YOLO_BACKENDS.keys()))
+        for name, backend in self.YOLO_BACKENDS.items():
+            if backend == YOLO_SETTINGS.get('BACKEND', 'torch'):
+                combo.setCurrentText(name)
+        combo.setToolTip("ONNX Runtime: model ilk kullanımda bir kez ONNX'e aktarılır ve modelin yanına kaydedilir.")
+        combo.currentTextChanged.connect(self._on_backend_changed)
+        return combo
+
+    def _on_backend_changed(self, text):
+        """YOLO ve Test panellerindeki arka uç seçimlerini eşitler ve yayınlar."""
+        for combo in (self.yolo_backend_combo, self.test_backend_combo):
+            if combo.currentText() != text:
+                combo.blockSignals(True)
+                combo.setCurrentText(text)
+                combo.blockSignals(False)
+        self.yolo_backend_changed.emit(self.YOLO_BACKENDS[text])
+
+    def set_yolo_backend(self, backend):
+        """Arka uç seçimini sinyal yayınlamadan günceller (örn. profil uygulandığında)."""
+        for name, value in self.YOLO_BACKENDS.items():
+            if value == backend:
+                for combo in (self.yolo_backend_combo, self.test_backend_combo):
+                    combo.blockSignals(True)
+                    combo.setCurrentText(name)
+                    combo.blockSignals(False)
+
+    def current_yolo_backend(self):
+        return self.YOLO_BACKENDS[self.yolo_backend_combo.currentText()]
+
     def _on_mode_changed(self, index):
         self.stacked_widget.setCurrentIndex(index)
         selected_mode = self.mode_combo.currentText()
@@ -198,6 +302,42 @@ class ModePanel(QWidget):
     def _update_test_yolo_visibility(self):
         show_yolo_options = ("YOLO" in self.test_detector_combo.currentText()) and (self.stacked_widget.currentIndex() == 1) # Index 1 Test Modu varsayımı
         self.test_yolo_row_widget.setVisible(show_yolo_options)
+        self.test_backend_row_widget.setVisible(show_yolo_options)
+
+    def _on_sampling_mode_changed(self, text):
+        """Değer kutusunu seçilen örnekleme moduna göre (N / yüzde / saniye) ayarlar."""
+        mode = SAMPLING_MODES[text]
+        spin = self.sampling_value_spin
+        spin.setVisible(mode is not None)
+        spin.blockSignals(True)
+        if mode == 'stride':
+            spin.setDecimals(0)
+            spin.setRange(2, 10000)
+            spin.setSuffix(". kare")
+            spin.setValue(SAMPLING_SETTINGS['STRIDE'])
+        elif mode == 'random':
+            spin.setDecimals(1)
+            spin.setRange(0.1, 100)
+            spin.setSuffix(" %")
+            spin.setValue(SAMPLING_SETTINGS['RANDOM_FRACTION'] * 100)
+        elif mode == 'budget':
+            spin.setDecimals(0)
+            spin.setRange(1, 36000)
+            spin.setSuffix(" sn")
+            spin.setValue(SAMPLING_SETTINGS['BUDGET_SECONDS'])
+        spin.blockSignals(False)
+
+    def current_sampling(self):
+        """Seçilen örnekleme ayarı (tüm karelerde None)."""
+        mode = SAMPLING_MODES[self.sampling_combo.currentText()]
+        value = self.sampling_value_spin.value()
+        if mode == 'stride':
+            return {'mode': mode, 'stride': int(value)}
+        if mode == 'random':
+            return {'mode': mode, 'fraction': value / 100, 'seed': SAMPLING_SETTINGS['SEED']}
+        if mode == 'budget':
+            return {'mode': mode, 'budget_s': value}
+        return None
 
     def _toggle_frame_spins(self, checked):
         """'Tamamını İşle' checkbox'ına göre frame spin kutularını etkinleştir/devre dışı bırak."""
@@ -210,6 +350,14 @@ class ModePanel(QWidget):
         end_frame = self.end_frame_spin.value()
         process_full = self.process_full_checkbox.isChecked()
         detector_type = self.test_detector_combo.currentText()
+        self.stream_path = None
+        if self.stream_export_checkbox.isChecked():
+            file_name, _ = QFileDialog.getSaveFileName(
+                self, "Test Sonuçlarının Yazılacağı Dosya", "test_results.csv",
+                "CSV Dosyaları (*.csv);;Parquet Dosyaları (*.parquet)")
+            if not file_name:
+                return # Dosya seçilmedi, test başlatılmaz
+            self.stream_path = file_name
         # Doğrulama ekle? örn., tam değilse end_frame > start_frame
         self.start_test_button.setEnabled(False)
         self.cancel_test_button.setEnabled(True)
@@ -218,6 +366,16 @@ class ModePanel(QWidget):
         self.test_progress_bar.setValue(0)
         self.start_test_signal.emit(start_frame, end_frame, process_full, detector_type)
 
+    def _on_compare_presets(self):
+        self.start_test_button.setEnabled(False)
+        self.compare_presets_button.setEnabled(False)
+        self.cancel_test_button.setEnabled(True)
+        self.export_results_button.setEnabled(False)
+        self.test_status_label.setText("Durum: Karşılaştırma başlatılıyor...")
+        self.test_progress_bar.setValue(0)
+        self.compare_presets_signal.emit(self.start_frame_spin.value(), self.end_frame_spin.value(),
+                                         self.process_full_checkbox.isChecked())
+
     def _on_cancel_test(self):
         self.test_status_label.setText("Durum: İptal ediliyor...")
         self.cancel_test_button.setEnabled(False)
@@ -226,7 +384,8 @@ class ModePanel(QWidget):
     def _on_export_results(self):
         default_name = "test_results.csv"
         file_name, _ = QFileDialog.getSaveFileName(
-            self, "Test Sonuçlarını Kaydet", default_name, "CSV Dosyaları (*.csv)")
+            self, "Test Sonuçlarını Kaydet", default_name,
+            "CSV Dosyaları (*.csv);;İstatistik Raporu (*.html);;İstatistik Raporu JSON (*.json)")
         if file_name:
             self.export_results_signal.emit(file_name)
             self.test_status_label.setText(f"Durum: Sonuçlar şuraya aktarılıyor: {file_name}")
@@ -248,6 +407,7 @@ class ModePanel(QWidget):
     @pyqtSlot(bool) # Bitiş sinyalinin başarı/tamamlanma belirttiğini varsayalım
     def on_test_completed(self, completed_successfully):
         self.start_test_button.setEnabled(True)
+        self.compare_presets_button.setEnabled(True)
         self.cancel_test_button.setEnabled(False)
         self.export_results_button.setEnabled(completed_successfully) # Sadece başarılıysa export et
         # Optional: Reset progress bar/status if needed or show final status
@@ -23,6 +23,7 @@ class TimingPanel(QWidget):
             'avg_capture_time': "Kare Yakalama Süresi:",
             'avg_detection_time': "Tespit Süresi:",
             'avg_visualization_time': "Görselleştirme Süresi:",
+            'avg_debug_view_time': "Hata Ayıklama Görünümü Süresi:",
         }
         for key, label_text in metric_keys.items():
             value_label = QLabel("- ms")
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                            QPushButton, QProgressBar, QSpinBox, QCheckBox,
                            QFileDialog, QStyle)
-from PyQt5.QtCore import Qt, pyqtSignal, QEvent
+from PyQt5.QtCore import Qt, pyqtSignal, QEvent, QTimer
 from PyQt5.QtGui import QImage, QPixmap
+from balloon_detector.config import GUI_SETTINGS
+from balloon_detector.core.display_mailbox import DisplayMailbox
 
 class VideoPanel(QWidget):
     video_toggled = pyqtSignal(bool)
@@ -13,9 +15,14 @@ class VideoPanel(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        # İşlemciler gösterilecek kareleri bu kutuya bırakır, panel kendi hızında çeker
+        self.display_mailbox = DisplayMailbox()
         self._init_ui()
         self._is_user_changing_frame = False
         self._is_dragging_progress = False
+        self._display_timer = QTimer(self)
+        self._display_timer.timeout.connect(self._poll_display_mailbox)
+        self._display_timer.start(GUI_SETTINGS.get('DISPLAY_REFRESH_MS', 15))
     
     def _init_ui(self):
         layout = QVBoxLayout(self)
@@ -117,6 +124,16 @@ class VideoPanel(QWidget):
         
         layout.addLayout(mode_controls)
     
+    def _poll_display_mailbox(self):
+        item = self.display_mailbox.take()
+        if item is not None:
+            self.update_frame(*item)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # İşlemci kareyi bu boyuta indirip overlay'leri bu çözünürlükte çizer
+        self.display_mailbox.set_target_size(self.video_label.width(), self.video_label.height())
+
     def update_frame(self, frame, stats):
         # Frame'i görüntüle
         h, w, ch = frame.shape
@@ -142,6 +159,8 @@ class VideoPanel(QWidget):
             f"Kırmızı Balon: {stats.get('red_count', '?')}\n"
             f"Mod: {stats.get('mode', '?')} ({stats.get('control', '?')})\n"
         )
+        if stats.get('details'): # Moda özgü ek satır (örn. hibrit aday sayıları)
+            stats_text += f"{stats['details']}\n"
         self.stats_label.setText(stats_text)
 
     # Olay işleyiciler (Event Handlers)
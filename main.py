@@ -1,9 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication
-from balloon_detector.gui.main_window.py import BalloonDetectorGUI
+from balloon_detector.gui.main_window import BalloonDetectorGUI
+from balloon_detector.utils.telemetry import configure_logging
 
 
 def main():
+    configure_logging()
     app = QApplication(sys.argv)
     window = BalloonDetectorGUI()
     window.show()
@@ -0,0 +1,84 @@
+"""YOLO CPU ayarlarını (imgsz, thread, batch, arka uç) kullanıcının videosunda otomatik seçer.
+
+Örnek:
+    python -m balloon_detector.tools.autotune_yolo --video klip.mp4 --model best.pt --frames 120
+
+Her konfigürasyon aynı kareler üzerinde ölçülür; referans PyTorch, varsayılan
+imgsz, batch 1 çıktısıdır. Gecikme ve uyum sınırlarını geçenler arasında en
+hızlısı model + makine için profil dosyasına yazılır; YOLO modu açılırken bu
+profil otomatik uygulanır (YOLO_SETTINGS['AUTO_APPLY_PROFILE']).
+"""
+import sys
+import json
+import argparse
+
+from balloon_detector.config import YOLO_SETTINGS
+from balloon_detector.core.test_processor import YOLO_DEVICE_TEST
+from balloon_detector.core.yolo_autotune import run_autotune, make_profile, save_profile
+from balloon_detector.core.yolo_batching import read_frames
+from balloon_detector.utils.telemetry import configure_logging
+
+
+def _threads(value):
+    return None if value == 'auto' else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO CPU ayarlarını video üzerinde otomatik seçer.")
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--model', required=True, help="YOLO modeli (.pt)")
+    parser.add_argument('--frames', type=int, default=120, help="Ölçülecek kare sayısı")
+    parser.add_argument('--start-frame', type=int, default=0)
+    parser.add_argument('--imgsz', type=int, nargs='+', default=[320, 480, 640])
+    parser.add_argument('--threads', type=_threads, nargs='+', default=[None],
+                        help="Denenecek thread sayıları ('auto': kütüphane varsayılanı)")
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx'], choices=['torch', 'torchscript', 'onnx', 'onnx-int8'])
+    parser.add_argument('--max-latency-ms', type=float, default=YOLO_SETTINGS['AUTOTUNE_MAX_LATENCY_MS'],
+                        help="Kabul edilen en yüksek p95 batch gecikmesi")
+    parser.add_argument('--min-agreement', type=float, default=YOLO_SETTINGS['AUTOTUNE_MIN_AGREEMENT'],
+                        help="Referansla en düşük tespit uyumu (0-1)")
+    parser.add_argument('--no-save', action='store_true', help="Profili kaydetme, yalnızca raporla")
+    parser.add_argument('--json', help="Tüm ölçümlerin yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    configure_logging()
+    try:
+        frames = read_frames(args.video, args.start_frame, args.frames)
+    except IOError as e:
+        raise SystemExit(str(e))
+    if not frames:
+        raise SystemExit("Videodan kare okunamadı.")
+
+    def progress(idx, total, backend, imgsz, threads, batch_size):
+        print(f"[{idx + 1}/{total}] {backend} imgsz={imgsz} thread={threads or 'auto'} batch={batch_size}",
+              flush=True)
+
+    results, best = run_autotune(args.model, frames, imgsz_values=args.imgsz, thread_values=args.threads,
+                                 batch_values=args.batch, backends=args.backends,
+                                 max_latency_ms=args.max_latency_ms, min_agreement=args.min_agreement,
+                                 device=YOLO_DEVICE_TEST, progress=progress, calibration_video=args.video)
+
+    print(f"\n{'arka uç':<8} {'imgsz':>6} {'thread':>7} {'batch':>6} {'FPS':>8} {'ort ms':>8} "
+          f"{'p95 ms':>8} {'uyum':>6}")
+    for r in sorted(results, key=lambda r: r['fps'], reverse=True):
+        marker = ' *' if r is best else ''
+        print(f"{r['backend']:<8} {r['imgsz']:>6} {str(r['threads'] or 'auto'):>7} {r['batch_size']:>6} "
+              f"{r['fps']:>8.1f} {r['mean_latency_ms']:>8.2f} {r['p95_latency_ms']:>8.2f} "
+              f"{r['agreement']:>6.3f}{marker}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'video': args.video, 'model': args.model, 'results': results, 'best': best}, f, indent=2)
+
+    if best is None:
+        print("\nSınırları geçen konfigürasyon yok; profil kaydedilmedi.")
+        return 1
+    if not args.no_save:
+        save_profile(args.model, make_profile(best, args.video, len(frames)))
+        print(f"\nProfil kaydedildi: {YOLO_SETTINGS['PROFILE_FILE']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
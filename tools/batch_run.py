@@ -0,0 +1,88 @@
+"""Gece regresyonu için toplu test çalıştırıcısı.
+
+Örnekler:
+    python -m balloon_detector.tools.batch_run --videos a.mp4 b.mp4 --detector opencv --output-dir out
+    python -m balloon_detector.tools.batch_run --jobs jobs.json --output-dir out --workers 8
+
+jobs.json, her biri şu anahtarları içerebilen sözlüklerden oluşan bir listedir:
+    video (zorunlu), detector ("opencv" | "yolo" | "hybrid"), model, backend ("torch" | "torchscript" | "onnx" | "onnx-int8"),
+    preset, start_frame, end_frame
+"""
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from balloon_detector.config import DEFAULT_HSV_VALUES
+from balloon_detector.utils.preset_manager import PresetManager
+from balloon_detector.core.batch_processor import BatchProcessor
+from balloon_detector.utils.telemetry import configure_logging
+
+DETECTOR_TYPES = {"opencv": "OpenCV (HSV)", "yolo": "YOLO", "hybrid": "Hibrit (HSV + YOLO)"}
+
+
+def _build_jobs(entries, output_dir, preset_manager):
+    jobs = []
+    for idx, entry in enumerate(entries):
+        detector_key = entry.get('detector', 'opencv').lower()
+        hsv_values = DEFAULT_HSV_VALUES
+        if entry.get('preset'):
+            hsv_values = preset_manager.load_preset(entry['preset'])
+            if hsv_values is None:
+                raise SystemExit(f"Preset bulunamadı: {entry['preset']}")
+        use_full_video = 'start_frame' not in entry and 'end_frame' not in entry
+        output_name = f"{idx:03d}_{Path(entry['video']).stem}_{detector_key}.csv"
+        jobs.append({
+            'job_id': idx,
+            'video_path': entry['video'],
+            'detector_type': DETECTOR_TYPES[detector_key],
+            'yolo_model_path': entry.get('model'),
+            'backend': entry.get('backend', 'torch'),
+            'hsv_values': hsv_values,
+            'start_frame': entry.get('start_frame', 0),
+            'end_frame': entry.get('end_frame', 0),
+            'use_full_video': use_full_video,
+            'output_path': os.path.join(output_dir, output_name),
+        })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Birden fazla videoyu süreç havuzunda test eder.")
+    parser.add_argument('--jobs', help="İş listesini içeren JSON dosyası")
+    parser.add_argument('--videos', nargs='*', default=[], help="İşlenecek videolar")
+    parser.add_argument('--detector', choices=DETECTOR_TYPES.keys(), default='opencv')
+    parser.add_argument('--model', help="YOLO modeli (.pt)")
+    parser.add_argument('--backend', choices=['torch', 'torchscript', 'onnx', 'onnx-int8'], default='torch', help="YOLO çıkarım arka ucu")
+    parser.add_argument('--preset', help="presets.json içindeki HSV preset adı")
+    parser.add_argument('--output-dir', default='batch_results')
+    parser.add_argument('--workers', type=int, default=None, help="Süreç sayısı (varsayılan: çekirdek sayısı)")
+    args = parser.parse_args()
+
+    configure_logging()
+
+    entries = []
+    if args.jobs:
+        with open(args.jobs, 'r') as f:
+            entries.extend(json.load(f))
+    for video in args.videos:
+        entries.append({'video': video, 'detector': args.detector, 'model': args.model,
+                        'backend': args.backend, 'preset': args.preset})
+    if not entries:
+        parser.error("En az bir video veya --jobs dosyası verilmelidir.")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = _build_jobs(entries, args.output_dir, PresetManager())
+    report_path = os.path.join(args.output_dir, 'batch_report.json')
+
+    failed = 0
+    for summary in BatchProcessor(args.workers).run(jobs, report_path=report_path):
+        if summary['status'] != 'ok':
+            failed += 1
+    print(f"Rapor: {report_path} ({len(jobs) - failed}/{len(jobs)} iş başarılı)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""YOLO çıkarım arka uçlarını (PyTorch / ONNX Runtime) aynı klip üzerinde karşılaştırır.
+
+Örnek:
+    python -m balloon_detector.tools.benchmark_backends --video klip.mp4 --model best.pt --frames 200
+
+Kareler önce belleğe okunur, böylece ölçülen süre yalnızca çıkarım + sonuç
+ayrıştırmasıdır. İlk arka uç referans kabul edilir; diğerlerinin tespitleri
+IoU >= 0.5 eşleşmesiyle buna göre karşılaştırılır.
+"""
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from balloon_detector.config import YOLO_SETTINGS
+from balloon_detector.core.model_registry import get_model_registry
+from balloon_detector.core.test_processor import YOLO_DEVICE_TEST, yolo_result_to_rows
+from balloon_detector.core.yolo_results import predict_filter_kwargs, box_agreement
+from balloon_detector.core.yolo_batching import read_frames
+from balloon_detector.utils.telemetry import configure_logging
+
+
+def _boxes(rows):
+    return np.array([[r['bbox_x1'], r['bbox_y1'], r['bbox_x2'], r['bbox_y2']] for r in rows],
+                    dtype=np.float32).reshape(-1, 4)
+
+
+def _agreement(ref_rows, rows, iou_threshold=0.5):
+    """İki karedeki tespitlerin eşleşme oranı (eşleşen / en büyük tespit sayısı)."""
+    return box_agreement(_boxes(ref_rows), _boxes(rows), iou_threshold)
+
+
+def benchmark_backend(model_path, backend, frames, batch_size, calibration_video=None):
+    registry = get_model_registry()
+    model = registry.get(model_path, YOLO_DEVICE_TEST, backend=backend, calibration_video=calibration_video)
+    latencies = []
+    rows_per_frame = []
+    wall_start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        batch = frames[i:i + batch_size]
+        batch_start = time.perf_counter()
+        results = model(batch, device=model.device, verbose=False, **predict_filter_kwargs())
+        rows = [yolo_result_to_rows(i + k, result) for k, result in enumerate(results)]
+        elapsed = (time.perf_counter() - batch_start) * 1000
+        latencies.extend([elapsed / len(batch)] * len(batch))
+        rows_per_frame.extend(rows)
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+    latencies = np.array(latencies)
+    return {
+        'backend': backend,
+        'device': model.device,
+        'load_ms': round(model.load_ms, 3),
+        'warmup_ms': round(model.warmup_ms, 3),
+        'frames': len(frames),
+        'batch_size': batch_size,
+        'mean_ms': round(float(latencies.mean()), 3),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'fps': round(len(frames) * 1000.0 / wall_ms, 2) if wall_ms > 0 else 0.0,
+        'detections': sum(len(r) for r in rows_per_frame),
+    }, rows_per_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO arka uçlarını aynı klip üzerinde karşılaştırır.")
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--model', required=True, help="YOLO modeli (.pt)")
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx'], choices=['torch', 'torchscript', 'onnx', 'onnx-int8'])
+    parser.add_argument('--frames', type=int, default=200, help="Ölçülecek kare sayısı")
+    parser.add_argument('--start-frame', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=YOLO_SETTINGS['TEST_BATCH_SIZE'])
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    configure_logging()
+    try:
+        frames = read_frames(args.video, args.start_frame, args.frames)
+    except IOError as e:
+        raise SystemExit(str(e))
+    if not frames:
+        raise SystemExit("Videodan kare okunamadı.")
+
+    report = []
+    reference_rows = None
+    for backend in args.backends:
+        summary, rows = benchmark_backend(args.model, backend, frames, args.batch_size, args.video)
+        if reference_rows is None:
+            reference_rows = rows
+        summary['agreement'] = round(float(np.mean([_agreement(a, b) for a, b in zip(reference_rows, rows)])), 4)
+        report.append(summary)
+
+    print(f"{'arka uç':<8} {'yükleme':>9} {'ısınma':>9} {'ort ms':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'FPS':>8} {'tespit':>7} {'uyum':>6}")
+    for s in report:
+        print(f"{s['backend']:<8} {s['load_ms']:>9.1f} {s['warmup_ms']:>9.1f} {s['mean_ms']:>8.2f} "
+              f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['fps']:>8.1f} {s['detections']:>7} "
+              f"{s['agreement']:>6.3f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'video': args.video, 'model': args.model, 'results': report}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
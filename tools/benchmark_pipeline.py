@@ -0,0 +1,397 @@
+"""Tespit hattının aşamalarını sabit girişlerde ölçer ve hızlı yolların referans çıktıyla aynı olduğunu doğrular.
+
+Örnekler:
+    python -m balloon_detector.tools.benchmark_pipeline --frames 200 --json bench.json
+    python -m balloon_detector.tools.benchmark_pipeline --video klip.mp4 --frames 300 --model best.pt
+    python -m balloon_detector.tools.benchmark_pipeline --json yeni.json --baseline bench.json
+
+Video verilmezse kareler tohumdan üretilir (aynı tohum ve boyut, aynı
+kareler), böylece iki sürüm aynı girişlerle karşılaştırılabilir. Aşamalar:
+HSV dönüşümü, maskeler, konturlar, kontur başı işleme, NMS, görselleştirme,
+YOLO ayrıştırma ve uçtan uca kare/s. Her aşama kare başına ölçülür; ortalama
+ve yüzdelikler (REPORT_SETTINGS['PERCENTILES']) raporlanır. Eşdeğerlik
+kontrollerinden biri başarısızsa çıkış kodu 1'dir.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import platform
+import argparse
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from balloon_detector.config import DEFAULT_HSV_VALUES, EVALUATION_SETTINGS, YOLO_SETTINGS
+from balloon_detector.core.detector import BalloonDetector
+from balloon_detector.core.model_registry import get_model_registry
+from balloon_detector.core.onnx_backend import OnnxBoxes, OnnxResult
+from balloon_detector.core.results_store import ResultsStore, BBOX_COLUMNS, EXPORT_COLUMNS
+from balloon_detector.core.test_processor import YOLO_CLASS_MAP_TEST, YOLO_DEVICE_TEST, append_yolo_result, yolo_result_to_rows
+from balloon_detector.core.test_report import percentile_summary
+from balloon_detector.core.visualization import render_for_display, draw_ellipse_detections, draw_box_detections
+from balloon_detector.core.yolo_results import result_arrays, class_names, predict_filter_kwargs
+from balloon_detector.utils.telemetry import configure_logging
+
+OPENCV_STAGES = ['hsv', 'masks', 'contours', 'per_contour', 'nms', 'visualization']
+
+
+def _range_color(values):
+    """HSV aralığının ortasına (S/V üst çeyreğe) düşen BGR renk."""
+    hsv = np.uint8([[[(values['H Min'] + values['H Max']) // 2,
+                      (values['S Min'] + 3 * values['S Max']) // 4,
+                      (values['V Min'] + 3 * values['V Max']) // 4]]])
+    return tuple(int(c) for c in cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0, 0])
+
+
+def synthetic_frames(count, size, seed, hsv_values):
+    """Tohumdan tekrarlanabilir kareler: gürültülü arka planda hareket eden kırmızı/mavi balonlar.
+
+    Renkler hsv_values'un normal aralıklarından seçilir; alan filtresine
+    takılan küçük renk lekeleri de eklenir.
+    """
+    width, height = size
+    rng = np.random.default_rng(seed)
+    palette = [_range_color(hsv_values['normal_red1']), _range_color(hsv_values['normal_blue'])]
+    balloon_count = 6
+    colors = rng.integers(0, 2, balloon_count)
+    centers = rng.uniform((0, 0), (width, height), (balloon_count, 2))
+    velocities = rng.uniform(-6, 6, (balloon_count, 2))
+    minor = rng.uniform(14, 40, balloon_count)
+    axes = np.stack([minor, minor * rng.uniform(1.0, 1.3, balloon_count)], axis=1)
+    angles = rng.uniform(0, 180, balloon_count)
+    gradient = np.linspace(40, 90, width, dtype=np.float32)
+    background = np.stack([gradient, gradient + 10, gradient], axis=-1)[None].repeat(height, axis=0)
+
+    frames = []
+    for i in range(count):
+        noise = rng.integers(-8, 9, (height, width, 1), dtype=np.int16)
+        frame = np.clip(background + noise, 0, 255).astype(np.uint8)
+        positions = np.mod(centers + velocities * i, (width, height))
+        for (x, y), (a, b), angle, color in zip(positions, axes, angles, colors):
+            cv2.ellipse(frame, (int(x), int(y)), (int(a), int(b)), float(angle), 0, 360, palette[color], -1)
+        for x, y, radius, color in zip(rng.integers(0, width, 10), rng.integers(0, height, 10),
+                                       rng.integers(2, 5, 10), rng.integers(0, 2, 10)):
+            cv2.circle(frame, (int(x), int(y)), int(radius), palette[color], -1)
+        frames.append(frame)
+    return frames
+
+
+def read_video_frames(video_path, start_frame, count):
+    """Videodan en fazla count kareyi okur; (kareler, kare başı çözme süresi ms)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Video açılamadı: {video_path}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    frames, decode_ms = [], []
+    while len(frames) < count:
+        start = time.perf_counter()
+        ret, frame = cap.read()
+        if not ret:
+            break
+        decode_ms.append((time.perf_counter() - start) * 1000)
+        frames.append(frame)
+    cap.release()
+    return frames, decode_ms
+
+
+def bench_opencv(frames, hsv_values, repeats, warmup, display_size):
+    """OpenCV aşamalarını ve uçtan uca süreyi (detect + çizim) ölçer.
+
+    Aşama süreleri dedektörün stage_times kancasından okunur. Her tekrar yeni
+    dedektörle başlar (lazer modu geçmişi aynı). İlk tekrarın ölçümlü ve
+    ölçümsüz detect() çıktıları eşdeğerlik kontrolleri için döner.
+    """
+    samples = {stage: [] for stage in OPENCV_STAGES + ['opencv_end_to_end']}
+    counts = {'contours': [], 'candidates': [], 'detections': []}
+    timed_outputs = reference_outputs = None
+    warmup_detector = BalloonDetector()
+    for frame in frames[:warmup]: # Isınma: önbellekler, OpenCV thread havuzu, yazı tipi
+        detections, _ = warmup_detector.detect(frame, hsv_values)
+        render_for_display(frame.copy(), detections, display_size, draw_ellipse_detections)
+    for repeat in range(repeats):
+        timed, reference = BalloonDetector(), BalloonDetector()
+        timed.stage_times = {}
+        timed_run, reference_run = [], []
+        for frame in frames:
+            detections, _ = timed.detect(frame, hsv_values)
+            for stage, elapsed in timed.stage_times.items():
+                samples[stage].append(elapsed)
+            canvas = frame.copy()
+            start = time.perf_counter()
+            render_for_display(canvas, detections, display_size, draw_ellipse_detections)
+            samples['visualization'].append((time.perf_counter() - start) * 1000)
+            timed_run.append(detections)
+            if repeat == 0:
+                counts['contours'].append(len(timed.last_contours))
+                counts['candidates'].append(timed.last_candidate_count)
+                counts['detections'].append(len(detections))
+        for frame in frames:
+            canvas = frame.copy()
+            start = time.perf_counter()
+            detections, _ = reference.detect(frame, hsv_values)
+            render_for_display(canvas, detections, display_size, draw_ellipse_detections)
+            samples['opencv_end_to_end'].append((time.perf_counter() - start) * 1000)
+            reference_run.append(detections)
+        if repeat == 0:
+            timed_outputs, reference_outputs = timed_run, reference_run
+    return samples, counts, timed_outputs, reference_outputs
+
+
+def synthetic_yolo_results(detections_per_frame, frame_shape, seed):
+    """OpenCV çıktısından türetilmiş sabit YOLO sonuçları (model verilmediğinde ayrıştırma ölçümü için).
+
+    Kutular kesirli kaydırılır (int32'ye kırpma yolunu da sınar), güvenler tohumdan gelir.
+    """
+    rng = np.random.default_rng(seed)
+    class_ids = {color: cls for cls, color in EVALUATION_SETTINGS['LABEL_CLASSES'].items()}
+    results = []
+    for detections in detections_per_frame:
+        xyxy = np.array([d['bbox'] for d in detections], dtype=np.float32).reshape(-1, 4)
+        xyxy += rng.uniform(0, 1, xyxy.shape).astype(np.float32)
+        conf = rng.uniform(0.25, 1.0, len(detections)).astype(np.float32)
+        cls = np.array([class_ids.get(d['color'], 0) for d in detections], dtype=np.float32)
+        results.append(OnnxResult(OnnxBoxes(xyxy, conf, cls), EVALUATION_SETTINGS['LABEL_CLASSES'], frame_shape[:2]))
+    return results
+
+
+def bench_yolo_parse(results, repeats):
+    """Test modunun sütunlu YOLO ayrıştırmasını (append_yolo_result) kare başına ölçer."""
+    samples = []
+    for _ in range(repeats):
+        store = ResultsStore()
+        for frame_num, result in enumerate(results):
+            start = time.perf_counter()
+            append_yolo_result(store, frame_num, result)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples, store
+
+
+def bench_yolo(model, frames, batch_size, display_size):
+    """YOLO çıkarımı (batch süresi karelere bölünür) ve çıkarım + ayrıştırma + çizim süresi; sonuçlar da döner."""
+    samples = {'yolo_inference': [], 'yolo_end_to_end': []}
+    results = []
+    for i in range(0, len(frames), batch_size):
+        batch = frames[i:i + batch_size]
+        start = time.perf_counter()
+        batch_results = model(batch, device=model.device, verbose=False, **predict_filter_kwargs())
+        frame_ms = (time.perf_counter() - start) * 1000 / len(batch)
+        for frame, result in zip(batch, batch_results):
+            canvas = frame.copy()
+            start = time.perf_counter()
+            xyxy, conf, cls = result_arrays(result)
+            detections = [{'bbox': bbox, 'confidence': c, 'color': color}
+                          for bbox, c, color in zip(xyxy.tolist(), conf.tolist(), class_names(cls, YOLO_CLASS_MAP_TEST))]
+            render_for_display(canvas, detections, display_size, draw_box_detections)
+            samples['yolo_inference'].append(frame_ms)
+            samples['yolo_end_to_end'].append(frame_ms + (time.perf_counter() - start) * 1000)
+        results.extend(batch_results)
+    return samples, results
+
+
+def detections_frame(detections_per_frame):
+    """Detektör çıktısını (kare başı sözlük listeleri) test sonuç sütunlarıyla DataFrame'e çevirir (referans yol)."""
+    rows = [{'frame': frame_num, 'color': d['color'], 'confidence': d['confidence'], 'detector': 'opencv',
+             **dict(zip(BBOX_COLUMNS, d['bbox']))}
+            for frame_num, detections in enumerate(detections_per_frame) for d in detections]
+    return pd.DataFrame(rows, columns=EXPORT_COLUMNS)
+
+
+def _check(name, passed, detail):
+    return {'name': name, 'passed': bool(passed), 'detail': detail}
+
+
+def _first_difference(reference, candidate):
+    return next((i for i, (a, b) in enumerate(zip(reference, candidate)) if a != b), None)
+
+
+def _frames_equal(reference, candidate):
+    """Sütun sütun karşılaştırma (güven float32/float64 farkı için toleranslı); (eşit mi, ayrıntı)."""
+    if len(reference) != len(candidate):
+        return False, f"satır sayısı {len(reference)} / {len(candidate)}"
+    for column in EXPORT_COLUMNS:
+        a = reference[column].astype(str if column in ('color', 'detector') else np.float64).to_numpy()
+        b = candidate[column].astype(str if column in ('color', 'detector') else np.float64).to_numpy()
+        equal = np.allclose(a, b, rtol=1e-6, atol=0) if column == 'confidence' else np.array_equal(a, b)
+        if not equal:
+            return False, f"'{column}' sütunu farklı"
+    return True, f"{len(reference)} satır aynı"
+
+
+def equivalence_checks(frames, hsv_values, timed_outputs, reference_outputs, yolo_results, yolo_store):
+    """Hızlı / alternatif yolların referans çıktıyla aynı olduğunu doğrular."""
+    checks = []
+    diff = _first_difference(reference_outputs, timed_outputs)
+    checks.append(_check('timed_vs_detect', diff is None and len(timed_outputs) == len(reference_outputs),
+                         "aşama süresi ölçümü tespitleri değiştirmedi" if diff is None
+                         else f"{diff}. karede fark"))
+
+    shared = BalloonDetector() # Paylaşılan HSV (çoklu konfigürasyon taraması) yolu
+    shared_outputs = [shared.detect(frame, hsv_values, hsv=cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))[0]
+                      for frame in frames]
+    diff = _first_difference(reference_outputs, shared_outputs)
+    checks.append(_check('shared_hsv', diff is None, "hazır HSV ile detect() aynı" if diff is None
+                         else f"{diff}. karede fark"))
+
+    store = ResultsStore() # Sütunlu sonuç deposu / satır sözlükleri
+    for frame_num, detections in enumerate(reference_outputs):
+        store.append_detections(frame_num, detections)
+    passed, detail = _frames_equal(detections_frame(reference_outputs), store.to_dataframe(EXPORT_COLUMNS))
+    checks.append(_check('results_store', passed, detail))
+
+    rows = [row for frame_num, result in enumerate(yolo_results) for row in yolo_result_to_rows(frame_num, result)]
+    passed, detail = _frames_equal(pd.DataFrame(rows, columns=EXPORT_COLUMNS), yolo_store.to_dataframe(EXPORT_COLUMNS))
+    checks.append(_check('yolo_parse', passed, detail))
+    return checks
+
+
+def frames_digest(frames):
+    """Giriş karelerinin özeti (iki ölçümün aynı girişle yapıldığını doğrulamak için)."""
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(np.ascontiguousarray(frame).data)
+    return digest.hexdigest()
+
+
+def output_digest(detections_per_frame):
+    """Referans tespitlerin özeti; dedektör çıktısı değiştiyse farklıdır."""
+    csv = detections_frame(detections_per_frame).to_csv(index=False, float_format='%.6f')
+    return hashlib.sha1(csv.encode('utf-8')).hexdigest()
+
+
+def environment_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__,
+        'opencv_threads': cv2.getNumThreads(),
+        'opencv_optimized': cv2.useOptimized(),
+        'numpy': np.__version__,
+    }
+
+
+def compare_to_baseline(report, baseline):
+    """Aşama ortalamalarının önceki rapora göre değişimi (oran - 1); girişler farklıysa uyarı listesi."""
+    warnings = []
+    if baseline.get('inputs', {}).get('digest') != report['inputs']['digest']:
+        warnings.append("Giriş kareleri önceki ölçümden farklı; süreler doğrudan karşılaştırılamaz.")
+    elif baseline.get('output_digest') != report['output_digest']:
+        warnings.append("Aynı girişte tespit çıktısı önceki ölçümden farklı.")
+    changes = {}
+    for stage, stats in report['stages'].items():
+        old = baseline.get('stages', {}).get(stage, {})
+        if stats.get('count') and old.get('mean'):
+            changes[stage] = {'before_ms': old['mean'], 'after_ms': stats['mean'],
+                              'change': stats['mean'] / old['mean'] - 1}
+    return changes, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tespit hattının aşamalarını sabit girişlerde ölçer.")
+    parser.add_argument('--video', help="Ölçüm kareleri (verilmezse tohumdan üretilir)")
+    parser.add_argument('--start-frame', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=200, help="Ölçülecek kare sayısı")
+    parser.add_argument('--size', nargs=2, type=int, default=[1280, 720], metavar=('GENISLIK', 'YUKSEKLIK'),
+                        help="Üretilen karelerin boyutu")
+    parser.add_argument('--seed', type=int, default=0, help="Üretilen kareler ve YOLO sonuçları için tohum")
+    parser.add_argument('--repeats', type=int, default=3, help="Kare kümesinin kaç kez ölçüleceği")
+    parser.add_argument('--warmup', type=int, default=10, help="Ölçümden önce işlenen kare sayısı")
+    parser.add_argument('--display-size', nargs=2, type=int, default=[960, 540], metavar=('GENISLIK', 'YUKSEKLIK'),
+                        help="Görselleştirme hedef boyutu (0 0: küçültme yok)")
+    parser.add_argument('--model', help="YOLO modeli (verilirse çıkarım ve uçtan uca YOLO da ölçülür)")
+    parser.add_argument('--backend', default='torch', choices=['torch', 'torchscript', 'onnx', 'onnx-int8'])
+    parser.add_argument('--batch-size', type=int, default=YOLO_SETTINGS['TEST_BATCH_SIZE'])
+    parser.add_argument('--threads', type=int, help="OpenCV thread sayısı (tekrarlanabilirlik için sabitlenebilir)")
+    parser.add_argument('--json', help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki JSON raporu")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+    hsv_values = DEFAULT_HSV_VALUES
+    decode_ms = []
+    if args.video:
+        try:
+            frames, decode_ms = read_video_frames(args.video, args.start_frame, args.frames)
+        except IOError as e:
+            raise SystemExit(str(e))
+    else:
+        frames = synthetic_frames(args.frames, tuple(args.size), args.seed, hsv_values)
+    if not frames:
+        raise SystemExit("Ölçülecek kare yok.")
+    display_size = tuple(args.display_size)
+    repeats = max(1, args.repeats)
+
+    samples, counts, timed_outputs, reference_outputs = bench_opencv(frames, hsv_values, repeats, args.warmup,
+                                                                      display_size)
+    if decode_ms:
+        samples['decode'] = decode_ms
+    if args.model:
+        model = get_model_registry().get(args.model, YOLO_DEVICE_TEST, backend=args.backend,
+                                         calibration_video=args.video)
+        yolo_samples, yolo_results = bench_yolo(model, frames, max(1, args.batch_size), display_size)
+        samples.update(yolo_samples)
+    else:
+        yolo_results = synthetic_yolo_results(reference_outputs, frames[0].shape, args.seed)
+    samples['yolo_parse'], yolo_store = bench_yolo_parse(yolo_results, repeats)
+
+    stages = {stage: percentile_summary(values) for stage, values in samples.items()}
+    decode_mean = stages['decode']['mean'] if decode_ms else 0.0
+    fps = {name: 1000.0 / (stages[stage]['mean'] + decode_mean) for name, stage in
+           (('opencv', 'opencv_end_to_end'), ('yolo', 'yolo_end_to_end')) if stage in stages}
+    checks = equivalence_checks(frames, hsv_values, timed_outputs, reference_outputs, yolo_results, yolo_store)
+    report = {
+        'inputs': {
+            'source': 'video' if args.video else 'synthetic',
+            'video': args.video,
+            'start_frame': args.start_frame if args.video else None,
+            'seed': None if args.video else args.seed,
+            'frames': len(frames),
+            'size': [int(frames[0].shape[1]), int(frames[0].shape[0])],
+            'display_size': list(display_size),
+            'repeats': repeats,
+            'warmup': args.warmup,
+            'model': args.model,
+            'backend': args.backend if args.model else None,
+            'digest': frames_digest(frames),
+        },
+        'environment': environment_info(),
+        'stages': stages,
+        'fps': fps, # Uçtan uca (video verildiyse çözme dahil)
+        'per_frame': {name: float(np.mean(values)) for name, values in counts.items()},
+        'checks': checks,
+        'output_digest': output_digest(reference_outputs),
+    }
+
+    print(f"{'aşama':<18} {'ort ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'en fazla':>9}")
+    for stage, stats in stages.items():
+        print(f"{stage:<18} {stats['mean']:>8.3f} {stats.get('p50', float('nan')):>8.3f} "
+              f"{stats.get('p95', float('nan')):>8.3f} {stats.get('p99', float('nan')):>8.3f} {stats['max']:>9.3f}")
+    print(', '.join(f"{name}: {value:.1f} kare/s" for name, value in fps.items()))
+    print(f"Kare başı: {report['per_frame']['contours']:.1f} kontur, {report['per_frame']['candidates']:.1f} aday, "
+          f"{report['per_frame']['detections']:.1f} tespit")
+    for check in checks:
+        print(f"[{'OK' if check['passed'] else 'HATA'}] {check['name']}: {check['detail']}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            changes, warnings = compare_to_baseline(report, json.load(f))
+        report['baseline'] = {'path': args.baseline, 'changes': changes, 'warnings': warnings}
+        for warning in warnings:
+            print(f"Uyarı: {warning}")
+        for stage, change in changes.items():
+            print(f"{stage:<18} {change['before_ms']:>8.3f} -> {change['after_ms']:>8.3f} ms ({change['change'] * 100:+.1f}%)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Rapor yazıldı: {args.json}")
+    return 0 if all(check['passed'] for check in checks) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Test sonuçlarını etiketlerle karşılaştırır (kesinlik, duyarlılık, F1, karışıklık, mAP).
+
+Örnekler:
+    python -m balloon_detector.tools.evaluate --detections test_results.csv --ground-truth etiketler.csv
+    python -m balloon_detector.tools.evaluate --detections sonuc.parquet --ground-truth labels/ --video klip.mp4
+    python -m balloon_detector.tools.evaluate --detections test_results.csv --ground-truth etiketler.csv --iou 0.3 --json rapor.json
+
+Etiket CSV'si: frame, color, bbox_x1, bbox_y1, bbox_x2, bbox_y2 (renk/kutusu boş satır: balonsuz etiketli kare).
+YOLO etiket klasörü: kare başına '<ad>_<kare_no>.txt' dosyaları ('sınıf cx cy w h', normalize).
+"""
+import sys
+import json
+import time
+import argparse
+
+from balloon_detector.config import EVALUATION_SETTINGS
+from balloon_detector.core.evaluation import evaluate, format_report, load_ground_truth, report_to_dict, video_size
+from balloon_detector.utils.telemetry import configure_logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test sonuçlarını etiketlerle karşılaştırır.")
+    parser.add_argument('--detections', required=True, help="Dışa aktarılmış test sonuçları (CSV veya Parquet)")
+    parser.add_argument('--ground-truth', required=True, help="Etiket CSV'si veya YOLO etiket klasörü")
+    parser.add_argument('--video', help="YOLO etiketleri için görüntü boyutunun okunacağı video")
+    parser.add_argument('--size', nargs=2, type=int, metavar=('GENISLIK', 'YUKSEKLIK'), help="Görüntü boyutu (--video yerine)")
+    parser.add_argument('--label-classes', nargs='*', help="YOLO sınıf indekslerinin sırasıyla renkleri (örn. red blue)")
+    parser.add_argument('--iou', type=float, default=EVALUATION_SETTINGS['IOU_THRESHOLD'], help="Eşleşme IoU eşiği")
+    parser.add_argument('--confidence', type=float, default=EVALUATION_SETTINGS['CONFIDENCE_THRESHOLD'],
+                        help="Kesinlik/duyarlılık için en düşük güven")
+    parser.add_argument('--all-frames', action='store_true',
+                        help="Etiketlenmemiş karelerdeki tespitleri de say (varsayılan: yalnızca etiketli kareler)")
+    parser.add_argument('--json', help="Raporun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+    configure_logging()
+
+    image_size = tuple(args.size) if args.size else (video_size(args.video) if args.video else None)
+    label_classes = dict(enumerate(args.label_classes)) if args.label_classes else None
+    t0 = time.perf_counter()
+    ground_truth, frames = load_ground_truth(args.ground_truth, image_size, label_classes)
+    reports = evaluate(args.detections, ground_truth, None if args.all_frames else frames,
+                       iou_threshold=args.iou, confidence_threshold=args.confidence)
+    elapsed = time.perf_counter() - t0
+
+    for detector, report in reports.items():
+        print(format_report(detector, report))
+        print()
+    print(f"Değerlendirme süresi: {elapsed:.2f} s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({detector: report_to_dict(report) for detector, report in reports.items()}, f, indent=2)
+        print(f"Rapor yazıldı: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Kare başına sonuç önbelleğini inceler ve temizler.
+
+Örnekler:
+    python -m balloon_detector.tools.result_cache inspect
+    python -m balloon_detector.tools.result_cache purge --video klip.mp4
+    python -m balloon_detector.tools.result_cache purge --older-than-days 7
+    python -m balloon_detector.tools.result_cache purge --all
+    python -m balloon_detector.tools.result_cache evict --max-mb 100
+"""
+import sys
+import json
+import time
+import argparse
+
+from balloon_detector.config import RESULT_CACHE_SETTINGS
+from balloon_detector.core.result_cache import ResultCache
+from balloon_detector.utils.telemetry import configure_logging
+
+
+def _inspect(cache, args):
+    entries = cache.summary()
+    if args.json:
+        print(json.dumps(entries, indent=2, default=str))
+        return 0
+    print(f"Önbellek: {cache.path} ({cache.total_bytes() / 1e6:.1f} / {cache.max_bytes / 1e6:.0f} MB)")
+    if not entries:
+        print("Önbellek boş.")
+        return 0
+    print(f"\n{'anahtar':<12} {'dedektör':<22} {'kare':>7} {'aralık':>15} {'MB':>8} {'son kullanım':>17}  video")
+    for entry in entries:
+        last_used = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['last_used'])) if entry['last_used'] else '-'
+        frame_range = f"{entry['first_frame']}-{entry['last_frame']}" if entry['frames'] else '-'
+        print(f"{entry['config_key'][:12]:<12} {entry['detector_type'] or '-':<22} {entry['frames']:>7} "
+              f"{frame_range:>15} {entry['bytes'] / 1e6:>8.2f} {last_used:>17}  {entry['video_path']}")
+    return 0
+
+
+def _purge(cache, args):
+    if not (args.all or args.video or args.key or args.older_than_days is not None):
+        raise SystemExit("Silinecekleri seçin: --all, --video, --key veya --older-than-days")
+    older_than_s = args.older_than_days * 86400 if args.older_than_days is not None else None
+    count = cache.purge(config_key=args.key, video_path=args.video, older_than_s=older_than_s)
+    print(f"{count} kare silindi.")
+    return 0
+
+
+def _evict(cache, args):
+    removed = cache.evict(int(args.max_mb * 1e6) if args.max_mb is not None else None)
+    print(f"{removed / 1e6:.1f} MB silindi.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kare başına sonuç önbelleğini inceler ve temizler.")
+    parser.add_argument('--path', default=RESULT_CACHE_SETTINGS['PATH'], help="Önbellek dosyası")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    inspect_parser = commands.add_parser('inspect', help="Yapılandırma başına kare sayısı ve boyut")
+    inspect_parser.add_argument('--json', action='store_true', help="Tüm ayrıntıları JSON olarak yaz")
+    inspect_parser.set_defaults(handler=_inspect)
+
+    purge_parser = commands.add_parser('purge', help="Seçilen kareleri sil")
+    purge_parser.add_argument('--all', action='store_true', help="Tüm önbelleği sil")
+    purge_parser.add_argument('--video', help="Bu videonun kareleri")
+    purge_parser.add_argument('--key', help="Bu anahtarla (veya önekle) başlayan yapılandırma")
+    purge_parser.add_argument('--older-than-days', type=float, help="Bu kadar gündür kullanılmayan kareler")
+    purge_parser.set_defaults(handler=_purge)
+
+    evict_parser = commands.add_parser('evict', help="Boyut sınırına inene kadar en eski kareleri sil")
+    evict_parser.add_argument('--max-mb', type=float, help="Sınır (varsayılan: MAX_BYTES)")
+    evict_parser.set_defaults(handler=_evict)
+
+    args = parser.parse_args()
+    configure_logging()
+    cache = ResultCache(args.path)
+    try:
+        return args.handler(cache, args)
+    finally:
+        cache.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
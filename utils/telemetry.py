@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+from balloon_detector.config import TELEMETRY_SETTINGS
+
+_log_listener = None
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def configure_logging(level=logging.INFO):
+    """Uygulama genelinde loglamayı bir kez kurar.
+
+    Kök logger'a bir QueueHandler bağlanır; asıl yazma işini arka plandaki
+    QueueListener yapar, böylece işlem thread'leri log G/Ç'sini beklemez.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+
+def user_log_directory():
+    """Kullanıcıya özel log dizini (Windows: %LOCALAPPDATA%, diğerleri: XDG_STATE_HOME veya ~/.local/state)."""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'balloon_detector', 'logs')
+
+
+def telemetry_path():
+    """TELEMETRY_SETTINGS'ten telemetri dosyasının mutlak yolu."""
+    directory = TELEMETRY_SETTINGS.get('DIRECTORY') or user_log_directory()
+    return os.path.abspath(os.path.join(directory, TELEMETRY_SETTINGS['FILE']))
+
+
+class TelemetryChannel:
+    """Sıcak yoldan gelen yapılandırılmış kayıtları arka planda diske yazar.
+
+    record() sadece sayaç/zaman kontrolü yapıp kaydı sınırlı bir kuyruğa koyar;
+    metin biçimlendirme ve dosya yazma arka plan thread'inde olur. Kuyruk
+    doluysa kayıt beklemeden atılır ve sayılır. Birden çok thread kayıt
+    yapabildiği için sayaçlar ve jeton kovaları küçük bir kilitle korunur.
+    Dosya max_bytes'a ulaşınca '.1' uzantısıyla döndürülür (önceki .1 silinir);
+    diskte en fazla iki dosya kalır.
+    """
+
+    def __init__(self, path, max_events_per_sec=30, sample_every=1, queue_size=4096, max_bytes=0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_events_per_sec = max_events_per_sec
+        self.sample_every = max(1, sample_every)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._event_counters = {}   # olay -> görülen kayıt sayısı (örnekleme için)
+        self._event_buckets = {}    # olay -> [jeton, son_zaman] (hız sınırı için)
+        self.dropped = 0
+        self._lock = threading.Lock() # Sayaçlar, jeton kovaları ve dropped için
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='TelemetryWriter', daemon=True)
+        self._writer.start()
+
+    def record(self, event, **fields):
+        """Bir olayı kaydeder; örnekleme, hız sınırı veya dolu kuyruk nedeniyle atlanabilir."""
+        if self._closed:
+            return False
+        with self._lock:
+            count = self._event_counters.get(event, 0) + 1
+            self._event_counters[event] = count
+            if count % self.sample_every:
+                return False
+            if not self._take_token(event):
+                self.dropped += 1
+                return False
+        try:
+            self._queue.put_nowait((time.time(), event, fields))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _take_token(self, event):
+        """Olay başına jeton kovası; saniyede en fazla max_events_per_sec kayıt (kilit altında çağrılır)."""
+        if not self.max_events_per_sec:
+            return True
+        now = time.perf_counter()
+        bucket = self._event_buckets.get(event)
+        if bucket is None:
+            bucket = [float(self.max_events_per_sec), now]
+            self._event_buckets[event] = bucket
+        bucket[0] = min(self.max_events_per_sec, bucket[0] + (now - bucket[1]) * self.max_events_per_sec)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def _write_loop(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open(self.path, 'a')
+        try:
+            size = f.tell()
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                timestamp, event, fields = item
+                # Dosyayı küçük tutmak için ondalıkları kısalt
+                record = {k: round(v, 3) if isinstance(v, float) else v for k, v in fields.items()}
+                record['t'] = round(timestamp, 4)
+                record['ev'] = event
+                line = json.dumps(record, separators=(',', ':'), default=float) + '\n'
+                f.write(line)
+                size += len(line)
+                if self.max_bytes and size >= self.max_bytes:
+                    f = self._rotate(f)
+                    size = 0
+                elif self._queue.empty():
+                    f.flush()
+            if self.dropped:
+                f.write(json.dumps({'t': round(time.time(), 4), 'ev': 'telemetry_dropped',
+                                    'count': self.dropped}, separators=(',', ':')))
+                f.write('\n')
+        finally:
+            f.close()
+
+    def _rotate(self, f):
+        """Dolan dosyayı .1 olarak taşır ve yeni bir dosya açar."""
+        f.close()
+        os.replace(self.path, self.path + '.1')
+        return open(self.path, 'a')
+
+    def close(self, timeout=2.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+
+class _NullTelemetry:
+    """Telemetri kapalıyken kullanılan, hiçbir şey yapmayan kanal."""
+    dropped = 0
+
+    def record(self, event, **fields):
+        return False
+
+    def close(self, timeout=2.0):
+        pass
+
+
+def get_telemetry():
+    """Süreç genelinde paylaşılan telemetri kanalını döndürür (ilk çağrıda oluşturulur)."""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            if TELEMETRY_SETTINGS.get('ENABLED') and TELEMETRY_SETTINGS.get('FILE'):
+                _telemetry = TelemetryChannel(
+                    telemetry_path(),
+                    max_events_per_sec=TELEMETRY_SETTINGS.get('MAX_EVENTS_PER_SEC', 30),
+                    sample_every=TELEMETRY_SETTINGS.get('SAMPLE_EVERY', 1),
+                    queue_size=TELEMETRY_SETTINGS.get('QUEUE_SIZE', 4096),
+                    max_bytes=TELEMETRY_SETTINGS.get('MAX_BYTES', 0))
+                atexit.register(_telemetry.close)
+            else:
+                _telemetry = _NullTelemetry()
+        return _telemetry